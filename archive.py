@@ -0,0 +1,107 @@
+# ------------------------------------------
+# Name:     archive
+# Purpose:  The cold segment: completed tasks moved out of the task list into a compressed file that only
+#           the commands that ask for them read.
+#
+# Author:   Robin Siebler
+# Created:  10/18/26
+# ------------------------------------------
+__author__ = 'Robin Siebler'
+__date__ = '10/18/26'
+
+import cStringIO
+import os
+import time
+import zlib
+
+try:
+	import cPickle as pickle
+except ImportError:
+	import pickle
+
+import storage
+import util
+from tasklist import find_class
+
+DAY = 24 * 60 * 60
+ARCHIVE_DAYS = 30  # completed tasks are archived automatically once they are this many days old
+CHECK_INTERVAL = DAY  # how often the automatic archiving looks for them
+
+
+def archive_file(task_file):
+	"""Return the archive that goes with a task file."""
+
+	return os.path.splitext(task_file)[0] + '.archive'
+
+
+def archivable(tasks, older_than, now=None):
+	"""Return the completed tasks that are old enough to archive.
+
+	Tasks don't remember when they were completed, so a task's age is counted from its due date, or from when
+	it was created if that is later or it has no due date.
+
+	:param tasks:      an iterable of Task objects
+	:param older_than: the number of days old a task has to be
+	:param now:        the current time as a Unix timestamp
+	"""
+
+	cutoff = (now or time.time()) - older_than * DAY
+	return [task for task in tasks if task.completed and max(task.created_epoch, task.due_epoch or 0) <= cutoff]
+
+
+class Archive:
+	"""A file of archived tasks.
+
+	Every archive run appends one record to the file: the tasks it moved, pickled and compressed with zlib. The
+	file is never rewritten, so a crash can only cut the last record short, and a record cut short is ignored
+	like one at the end of a journal. The tasks are archived before they are deleted from the task list, so
+	a crash in between leaves them in both; since task ids are never reused, the copy in the task list wins.
+	"""
+
+	def __init__(self, task_file):
+		self.path = archive_file(task_file)
+
+	def exists(self):
+		return os.path.exists(self.path)
+
+	def append(self, tasks):
+		"""Add tasks to the archive."""
+
+		record = zlib.compress(pickle.dumps(list(tasks), pickle.HIGHEST_PROTOCOL))
+		with storage.locked(self.path, exclusive=True):
+			with open(self.path, 'ab') as fh:
+				pickle.dump(record, fh, pickle.HIGHEST_PROTOCOL)
+				fh.flush()
+				os.fsync(fh.fileno())
+
+	def load(self, live=None):
+		"""Return the archived tasks in ID order.
+
+		:param live: the task list, whose tasks are left out if they are in the archive as well
+		"""
+
+		if not self.exists():
+			return []
+		tasks = {}
+		with storage.locked(self.path):
+			for record in storage.read_records(self.path):
+				for task in util.unpickler(cStringIO.StringIO(zlib.decompress(record)), find_class).load():
+					tasks[task.id] = task
+		return [tasks[task_id] for task_id in sorted(tasks)
+		        if live is None or live.find_task(task_id) is None]
+
+	def check_due(self):
+		"""Return True if the automatic archiving is due, and note that it has been done.
+
+		The modification time of the archive is when it was last done; a new archive starts out empty.
+		"""
+
+		try:
+			if time.time() - os.path.getmtime(self.path) < CHECK_INTERVAL:
+				return False
+		except OSError:
+			pass
+		with open(self.path, 'ab'):
+			os.utime(self.path, None)
+		return True
+
@@ -0,0 +1,12 @@
+# ------------------------------------------
+# Name:     benchmarks
+# Purpose:  Timing scripts for the task list. Run them from the top of the repository, e.g.
+#           python -m benchmarks.bench_find_task
+#           benchmarks.suite times the main operations on task lists made by benchmarks.generate and saves
+#           the results in benchmarks/results/<commit>.json; benchmarks.compare compares two of them.
+#
+# Author:   Robin Siebler
+# Created:  10/18/26
+# ------------------------------------------
+__author__ = 'Robin Siebler'
+__date__ = '10/18/26'
@@ -0,0 +1,73 @@
+# ------------------------------------------
+# Name:     bench_columnar
+# Purpose:  Time opening a large task list and running the read-only commands on it, from the column file
+#           and from the pickle.
+#
+# Author:   Robin Siebler
+# Created:  10/18/26
+# ------------------------------------------
+__author__ = 'Robin Siebler'
+__date__ = '10/18/26'
+
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+import columnar
+import storage
+import util
+from tasklist import Task, TaskList
+
+
+def make_tasks(count):
+	"""Yield count tasks, half of them with a due date and a third with tags."""
+
+	for task_id in xrange(1, count + 1):
+		created = 1767225600 + task_id * 60
+		fields = dict(id=task_id, task='Task {}'.format(task_id), priority=random.choice('LMH '), note=None,
+		              completed=random.random() < 0.2, tags=random.choice(['', '', 'home', 'work, ops']),
+		              creation_date='01/01/2026 12:00:00 AM -08:00', created_epoch=created)
+		if task_id % 2:
+			fields.update(due_date='2/1/2026 11:59 PM -0800', due_date_format='M/D/YYYY h:mm A Z',
+			              due_epoch=created + 30 * 24 * 60 * 60)
+		yield Task.restore(**fields)
+
+
+def timed(name, function):
+	start = time.time()
+	result = function()
+	print('  {:28} {:10.3f} s'.format(name, time.time() - start))
+	return result
+
+
+def run(name, store, count):
+	print(name)
+	tasklist = timed('open', lambda: store.load())
+	timed('display <id>', lambda: tasklist.find_task(random.randint(1, count)).note)
+	timed('show --offset=N/2 --limit=20', lambda: list(tasklist.page(count // 2, 20)))
+	timed('priority --top=20', lambda: list(tasklist.by_priority(20)))
+	timed('search "task 12345"', lambda: tasklist.search('task 12345'))
+	timed('tag work', lambda: tasklist.find_by_tags('work'))
+
+
+def main(count=1000000):
+	directory = tempfile.mkdtemp()
+	try:
+		column_file = os.path.join(directory, 'tasks.tcol')
+		task_file = os.path.join(directory, 'tasks.tsk')
+		columnar.write(column_file, make_tasks(count))
+		util.save({'version': TaskList.SNAPSHOT_VERSION, 'seq': 0, 'tasklist': TaskList(list(make_tasks(count)))},
+		          task_file)
+		print('{} tasks: {:.1f} MB of columns, {:.1f} MB of pickle'.format(
+			count, os.path.getsize(column_file) / 1e6, os.path.getsize(task_file) / 1e6))
+		run('column file', columnar.ColumnarStore(column_file), count)
+		run('pickle', storage.JournalStore(task_file), count)
+	finally:
+		shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+	main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,55 @@
+# ------------------------------------------
+# Name:     bench_find_task
+# Purpose:  Time looking up every task of the priority view by id, with a linear scan (the old
+#           TaskList.find_task) and with the id index.
+#
+# Author:   Robin Siebler
+# Created:  10/18/26
+# ------------------------------------------
+__author__ = 'Robin Siebler'
+__date__ = '10/18/26'
+
+import random
+import sys
+import timeit
+
+from tasklist import Task, TaskList
+
+
+def linear_find_task(tasks, task_id):
+	"""TaskList.find_task before the id index."""
+
+	for task in tasks:
+		if str(task.id) == str(task_id):
+			return task
+	return None
+
+
+def make_tasklist(count):
+	"""Build a task list with count tasks without printing a line for each one."""
+
+	tasks = []
+	for task_id in range(1, count + 1):
+		tasks.append(Task.restore(id=task_id, task='Task {}'.format(task_id), priority=random.choice('LMH '),
+		                          due_date=None, tags=None, note=None, completed=random.random() < 0.2,
+		                          creation_date='10/18/2026 8:00:00 AM -07:00', created_epoch=1792335600))
+	return TaskList(tasks)
+
+
+def main(count=100000, sample=200):
+	tasklist = make_tasklist(count)
+	# the ids in the order the priority view used to look them up; a sample is enough for the linear scan
+	ids = [task.id for task in sorted(tasklist.tasks, key=lambda task: (task.completed, task.priority))]
+	sampled = random.sample(ids, sample)
+
+	linear = timeit.timeit(lambda: [linear_find_task(tasklist.tasks, task_id) for task_id in sampled], number=1)
+	indexed = timeit.timeit(lambda: [tasklist.find_task(task_id) for task_id in ids], number=1)
+	print('{} tasks, one find_task per row of the priority view'.format(count))
+	print('  linear scan: {:10.3f} s (extrapolated from {} lookups)'.format(linear * count / sample, sample))
+	print('  id index:    {:10.3f} s'.format(indexed))
+	print('  str ids:     {:10.3f} s'.format(
+		timeit.timeit(lambda: [tasklist.find_task(str(task_id)) for task_id in ids], number=1)))
+
+
+if __name__ == '__main__':
+	main(*[int(arg) for arg in sys.argv[1:]])
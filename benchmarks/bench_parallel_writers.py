@@ -0,0 +1,67 @@
+# ------------------------------------------
+# Name:     bench_parallel_writers
+# Purpose:  Measure how many commits a second get through when N processes add tasks to the same task file
+#           at once, each one loading, adding a task and committing like tasks.py does. The total number of
+#           commits stays the same as N grows, so the task file grows to the same size.
+#
+# Author:   Robin Siebler
+# Created:  10/18/26
+# ------------------------------------------
+__author__ = 'Robin Siebler'
+__date__ = '10/18/26'
+
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import storage
+from tasklist import Task
+
+
+def add_tasks(task_file, writer, count):
+	sys.stdout = open(os.devnull, 'w')  # Task() prints a line for each task
+	store = storage.JournalStore(task_file)
+	for number in range(count):
+		tasklist = store.load()
+		Task.last_id = tasklist.last_id
+		tasklist.add_task('Writer {} task {}'.format(writer, number))
+		store.commit(tasklist)
+	store.compact(wait=True)
+
+
+def run(writers, count):
+	"""Return the number of commits a second made by writers processes adding count tasks between them."""
+
+	directory = tempfile.mkdtemp()
+	try:
+		task_file = os.path.join(directory, 'tasks.tsk')
+		processes = [multiprocessing.Process(target=add_tasks, args=(task_file, writer, count // writers))
+		             for writer in range(writers)]
+		start = time.time()
+		for process in processes:
+			process.start()
+		for process in processes:
+			process.join()
+		elapsed = time.time() - start
+		saved = len(storage.JournalStore(task_file).load())
+		if saved != count:
+			print('  lost {} of {} tasks!'.format(count - saved, count))
+		return count / elapsed
+	finally:
+		shutil.rmtree(directory)
+
+
+def main(count=1600, max_writers=16):
+	print('{} commits'.format(count))
+	print('  writers   commits/second')
+	writers = 1
+	while writers <= max_writers:
+		print('  {:7} {:16.0f}'.format(writers, run(writers, count)))
+		writers *= 2
+
+
+if __name__ == '__main__':
+	main(*[int(arg) for arg in sys.argv[1:]])
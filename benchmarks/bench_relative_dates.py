@@ -0,0 +1,68 @@
+# ------------------------------------------
+# Name:     bench_relative_dates
+# Purpose:  Time working out the due status and the relative due and created dates of every task, one task
+#           at a time with arrow and in batches with relative_dates, with and without NumPy.
+#
+# Author:   Robin Siebler
+# Created:  10/18/26
+# ------------------------------------------
+__author__ = 'Robin Siebler'
+__date__ = '10/18/26'
+
+import sys
+import time
+
+import arrow
+
+import relative_dates
+from benchmarks.generate import make_tasks
+
+
+def per_task(tasks, now):
+	"""The way the rows were made before: an arrow humanize() for each date."""
+
+	arrow_now = arrow.Arrow.utcfromtimestamp(now)
+	rows = []
+	for task in tasks:
+		due = None
+		if task.due_epoch is not None:
+			left = task.due_epoch - int(now)
+			due = (arrow.Arrow.utcfromtimestamp(task.due_epoch).humanize(arrow_now),
+			       relative_dates.UPCOMING if left > relative_dates.DAY else relative_dates.DUE if left >= 0
+			       else relative_dates.OVERDUE)
+		rows.append((due, arrow.Arrow.utcfromtimestamp(task.created_epoch).humanize(arrow_now)))
+	return rows
+
+
+def batched(tasks, now):
+	rows = []
+	for batch in relative_dates.batches(tasks):
+		due_epochs = [task.due_epoch for task in batch]
+		rows.extend(zip(relative_dates.humanize(due_epochs, now), relative_dates.due_statuses(due_epochs, now),
+		                relative_dates.humanize([task.created_epoch for task in batch], now)))
+	return rows
+
+
+def timed(name, function):
+	start = time.time()
+	function()
+	elapsed = time.time() - start
+	print('  {:24} {:10.3f} s'.format(name, elapsed))
+	return elapsed
+
+
+def main(count=100000):
+	tasks = make_tasks(count)
+	now = time.time()
+	print('{} tasks'.format(count))
+	timed('arrow, task by task', lambda: per_task(tasks, now))
+	if relative_dates.numpy():
+		timed('batches with NumPy', lambda: batched(tasks, now))
+	else:
+		print('  (NumPy is not installed)')
+	relative_dates._numpy = False
+	timed('batches in pure Python', lambda: batched(tasks, now))
+
+
+if __name__ == '__main__':
+	main(*[int(arg) for arg in sys.argv[1:]])
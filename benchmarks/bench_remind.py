@@ -0,0 +1,65 @@
+# ------------------------------------------
+# Name:     bench_remind
+# Purpose:  Measure what tasks.py remind costs with many scheduled tasks: loading the tasks and building the
+#           heap, picking up a change made by another command, and the CPU it uses while it waits.
+#
+# Author:   Robin Siebler
+# Created:  10/18/26
+# ------------------------------------------
+__author__ = 'Robin Siebler'
+__date__ = '10/18/26'
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import remind
+import storage
+import util
+from benchmarks.generate import make_tasks
+from instrument import cpu_time
+from tasklist import TaskList
+
+
+def run(size, idle):
+	"""Return the CPU seconds taken to start, to follow one change and to wait idle seconds with size tasks."""
+
+	directory = tempfile.mkdtemp()
+	try:
+		task_file = os.path.join(directory, 'tasks.tsk')
+		# every task is due in the future, so every one of them is scheduled
+		tasks = make_tasks(size, due_days=365, due_ratio=1.0, completed_ratio=0.0, now=time.time() + 400 * 86400)
+		util.save({'version': TaskList.SNAPSHOT_VERSION, 'seq': 0, 'tasklist': TaskList(tasks)}, task_file)
+
+		start = cpu_time()
+		watcher = remind.Watcher(task_file)
+		reminders = remind.Reminders(watcher.tasklist, time.time())
+		started = cpu_time() - start
+
+		store = storage.JournalStore(task_file)
+		tasklist = store.load()
+		tasklist.modify_task(size // 2, completed=True)
+		store.commit(tasklist)
+		start = cpu_time()
+		for task_id in watcher.changes():
+			reminders.update(task_id, watcher.tasklist.find_task(task_id), time.time())
+		changed = cpu_time() - start
+
+		start = cpu_time()
+		remind.run(watcher, reminders, lambda task: None, time.time(), until=time.time() + idle)
+		return len(reminders), started, changed, cpu_time() - start
+	finally:
+		shutil.rmtree(directory)
+
+
+def main(idle=5):
+	print('CPU seconds, waiting {} seconds'.format(idle))
+	print('  scheduled     start    change      wait')
+	for size in [1000, 10000, 100000]:
+		print('  {:9} {:9.3f} {:9.4f} {:9.3f}'.format(*run(size, idle)))
+
+
+if __name__ == '__main__':
+	main(*[int(arg) for arg in sys.argv[1:]])
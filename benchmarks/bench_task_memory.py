@@ -0,0 +1,93 @@
+# ------------------------------------------
+# Name:     bench_task_memory
+# Purpose:  Measure the memory and pickle size of a task: the slotted Task against the instance dict Task
+#           used to have.
+#
+# Author:   Robin Siebler
+# Created:  10/18/26
+# ------------------------------------------
+__author__ = 'Robin Siebler'
+__date__ = '10/18/26'
+
+import cPickle
+import random
+import sys
+
+from tasklist import CREATION_DATE_FORMAT, Task, format_date
+
+PACIFIC = -8 * 60 * 60
+
+
+class DictTask:
+	"""A task the way it was kept before Task had slots: an old-style instance with every field in its dict."""
+
+	def __init__(self, task):
+		self.task = task.task
+		self.priority = task.priority
+		self.tags = set(task.tags)
+		self.note = task.note
+		self.completed = task.completed
+		# every task had its own copy of each date string
+		self.creation_date = ''.join(task.creation_date)
+		self.created_epoch = task.created_epoch
+		self.due_date = task.due_date and ''.join(task.due_date)
+		if task.due_date:
+			self.due_date_format = ''.join(task.due_date_format)
+		self.due_epoch = task.due_epoch
+		self.id = task.id
+
+
+def make_tasks(count):
+	"""Make count tasks, half of them with a due date and a third with tags."""
+
+	tasks = []
+	for task_id in range(1, count + 1):
+		created = 1767225600 + task_id * 60
+		fields = dict(id=task_id, task='Task {}'.format(task_id), priority=random.choice('LMH '), note=None,
+		              completed=random.random() < 0.2, tags=random.choice(['', '', 'home', 'work, ops']),
+		              created_epoch=created, creation_date=format_date(created, (CREATION_DATE_FORMAT, PACIFIC)))
+		if task_id % 2:
+			due = created + 30 * 24 * 60 * 60
+			fields.update(due_date=format_date(due, ('M/D/YYYY h:mm A Z', PACIFIC)), due_date_format='M/D/YYYY h:mm A Z',
+			              due_epoch=due)
+		tasks.append(Task.restore(**fields))
+	return tasks
+
+
+def deep_size(objects):
+	"""Return the number of bytes used by the objects and everything they refer to, counting shared objects
+	(None, small ints, the shared date zones) once."""
+
+	seen = set()
+	size = 0
+	stack = list(objects)
+	while stack:
+		obj = stack.pop()
+		if id(obj) in seen:
+			continue
+		seen.add(id(obj))
+		size += sys.getsizeof(obj)
+		if isinstance(obj, dict):
+			stack.extend(obj.keys())
+			stack.extend(obj.values())
+		elif isinstance(obj, (list, tuple, set, frozenset)):
+			stack.extend(obj)
+		elif hasattr(obj, '__dict__'):
+			stack.append(obj.__dict__)
+		elif hasattr(obj, '__slots__'):
+			stack.extend(getattr(obj, name) for name in obj.__slots__)
+	return size
+
+
+def main(count=100000):
+	tasks = make_tasks(count)
+	dict_tasks = [DictTask(task) for task in tasks]
+	print('{} tasks'.format(count))
+	print('                  memory/task   pickle/task')
+	for name, objects in [('instance dict', dict_tasks), ('slots', tasks)]:
+		print('  {:14} {:10.0f} B  {:10.0f} B'.format(name, float(deep_size(objects)) / count,
+		                                            float(len(cPickle.dumps(objects, 2))) / count))
+
+
+if __name__ == '__main__':
+	main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,72 @@
+# ------------------------------------------
+# Name:     compare
+# Purpose:  Compare two result files saved by benchmarks.suite, e.g. from the commit before a change and
+#           the commit after it.
+#
+# Author:   Robin Siebler
+# Created:  10/18/26
+# ------------------------------------------
+
+"""
+Usage: benchmarks.compare <Before> <After> [--threshold=<Percent>] [--min-time=<Seconds>]
+
+	Run it from the top of the repository with python -m benchmarks.compare.
+
+	Print the time of each operation in both files and how much it changed. Exits with 1 if anything got
+	slower by more than the threshold.
+
+    Options:
+        --threshold <Percent>  How much slower an operation can get before it counts as a regression [default: 10]
+        --min-time <Seconds>   Operations this fast in both files are too noisy to count [default: 0.001]
+"""
+
+__author__ = 'Robin Siebler'
+__date__ = '10/18/26'
+
+import json
+import sys
+
+
+def load_results(result_file):
+	"""Return the commit of a result file and a dict of (size, operation) -> seconds."""
+
+	with open(result_file) as fh:
+		results = json.load(fh)
+	return results['commit'], dict(((result['size'], result['operation']), result['seconds'])
+	                               for result in results['results'])
+
+
+def compare(before, after, threshold, min_time=0.0):
+	"""Print the operations timed in both result dicts.
+
+	:param threshold: how much slower (in percent) an operation can get before it counts as a regression
+	:param min_time:  operations that took less than this many seconds in both dicts don't count
+	:return: the (size, operation) keys that got slower by more than threshold percent
+	"""
+
+	regressions = []
+	for key in sorted(set(before) & set(after)):
+		change = (after[key] - before[key]) / before[key] * 100 if before[key] else 0.0
+		flag = ''
+		if change > threshold and max(before[key], after[key]) >= min_time:
+			regressions.append(key)
+			flag = '  SLOWER'
+		print('{:>8} {:32} {:10.4f} s {:10.4f} s {:+7.1f}%{}'.format(key[0], key[1], before[key], after[key], change,
+		                                                          flag))
+	return regressions
+
+
+def main():
+	from docopt import docopt
+	args = docopt(__doc__)
+	before_commit, before = load_results(args['<Before>'])
+	after_commit, after = load_results(args['<After>'])
+	print('{:>8} {:32} {:>12} {:>12}'.format('tasks', 'operation', before_commit, after_commit))
+	regressions = compare(before, after, float(args['--threshold']), float(args['--min-time']))
+	if regressions:
+		print('{} operations got slower by more than {}%'.format(len(regressions), args['--threshold']))
+		return 1
+
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -0,0 +1,103 @@
+# ------------------------------------------
+# Name:     generate
+# Purpose:  Make realistic task lists of any size for the benchmarks, and write them to task files.
+#
+# Author:   Robin Siebler
+# Created:  10/18/26
+# ------------------------------------------
+
+"""
+Usage: benchmarks.generate <Count> <Task_File> [options]
+
+	Run it from the top of the repository with python -m benchmarks.generate.
+
+	Write Count synthetic tasks to a task file. The extension picks the backend like tasks.py does: .tsk for
+	the pickle snapshot + journal, .db for SQLite, .tcol for the column file.
+
+    Options:
+        --note-length <N>      The average length of a note; a third of the tasks have one [default: 80]
+        --tags <N>             The number of different tags [default: 50]
+        --due-days <N>         Due dates are spread over N days either side of now [default: 60]
+        --due-ratio <R>        The share of the tasks with a due date [default: 0.5]
+        --completed-ratio <R>  The share of the tasks that are completed [default: 0.2]
+        --seed <N>             The seed of the random numbers, so the same options make the same tasks [default: 0]
+"""
+
+__author__ = 'Robin Siebler'
+__date__ = '10/18/26'
+
+import random
+import sys
+import time
+
+import storage
+from tasklist import CREATION_DATE_FORMAT, PRIORITIES, Task, format_date
+
+DAY = 24 * 60 * 60
+DUE_DATE_FORMAT = 'M/D/YYYY h:mm A Z'
+WORDS = ('call email buy fix write review plan book pay clean read send check order update cancel renew file '
+         'print sign schedule return meet ask water walk pack move sort test ship draft submit backup repair').split()
+OBJECTS = ('mom bank report car taxes invoice garden dentist tickets lunch slides budget lease server laptop '
+           'plumber roof groceries passport insurance newsletter contract receipts blog printer').split()
+
+
+def make_tasks(count, note_length=80, tags=50, due_days=60, due_ratio=0.5, completed_ratio=0.2, seed=0,
+               now=None):
+	"""Return count tasks that look like the ones people keep, numbered from 1.
+
+	:param note_length:     the average length of a note; a third of the tasks have one
+	:param tags:            the number of different tags; a few are used a lot and most of them rarely
+	:param due_days:        due dates are spread over this many days either side of now
+	:param due_ratio:       the share of the tasks with a due date
+	:param completed_ratio: the share of the tasks that are completed
+	:param seed:            the seed of the random numbers, so the same arguments make the same tasks
+	:param now:             the timestamp the tasks are made up to (the current time by default)
+	"""
+
+	rand = random.Random(seed)
+	now = int(now or time.time())
+	offset = -time.altzone if time.daylight and time.localtime(now).tm_isdst else -time.timezone
+	vocabulary = ['tag{}'.format(number) for number in range(tags)]
+	tasks = []
+	for task_id in range(1, count + 1):
+		created = now - (count - task_id) * 60  # a task a minute, the last one just now
+		fields = dict(id=task_id, task='{} {} {}'.format(rand.choice(WORDS), rand.choice(OBJECTS), task_id),
+		              priority=rand.choice(PRIORITIES), completed=rand.random() < completed_ratio,
+		              created_epoch=created, creation_date=format_date(created, (CREATION_DATE_FORMAT, offset)))
+		if rand.random() < 1.0 / 3:
+			fields['note'] = ' '.join(rand.choice(WORDS + OBJECTS)
+			                          for _ in range(max(1, int(rand.expovariate(6.0 / note_length)))))
+		if vocabulary:
+			# paretovariate picks the first tags much more often than the rest
+			fields['tags'] = set(vocabulary[min(int(rand.paretovariate(1.2)) - 1, tags - 1)]
+			                     for _ in range(rand.randint(0, 3)))
+		if rand.random() < due_ratio:
+			due = now + rand.randint(-due_days, due_days) * DAY
+			fields.update(due_date=format_date(due, (DUE_DATE_FORMAT, offset)), due_date_format=DUE_DATE_FORMAT,
+			              due_epoch=due)
+		tasks.append(Task.restore(**fields))
+	return tasks
+
+
+def write(task_file, tasks):
+	"""Save tasks to a new task file with the backend its extension picks."""
+
+	store = storage.open_store(task_file)
+	tasklist = store.load()
+	tasklist.insert_tasks(tasks)
+	store.commit(tasklist)
+	if isinstance(store, storage.JournalStore):
+		store.compact(wait=True)
+
+
+def main():
+	from docopt import docopt
+	args = docopt(__doc__)
+	tasks = make_tasks(int(args['<Count>']), int(args['--note-length']), int(args['--tags']), int(args['--due-days']),
+	                   float(args['--due-ratio']), float(args['--completed-ratio']), int(args['--seed']))
+	write(args['<Task_File>'], tasks)
+	print('Wrote {} tasks to {}'.format(len(tasks), args['<Task_File>']))
+
+
+if __name__ == '__main__':
+	sys.exit(main())
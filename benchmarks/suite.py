@@ -0,0 +1,159 @@
+# ------------------------------------------
+# Name:     suite
+# Purpose:  Time the main task list operations on generated task lists of growing size, and save the results
+#           to a JSON file that benchmarks.compare can check against the results of another commit.
+#
+# Author:   Robin Siebler
+# Created:  10/18/26
+# ------------------------------------------
+
+"""
+Usage: benchmarks.suite [--sizes=<Sizes>] [--output=<File>] [options]
+
+	Run it from the top of the repository with python -m benchmarks.suite.
+
+    Options:
+        --sizes <Sizes>        The numbers of tasks to time, separated by commas [default: 1000,10000,100000,1000000]
+        --output <File>        Where to save the results (benchmarks/results/<commit>.json by default)
+        --repeat <N>           Run each operation N times and keep the fastest [default: 3]
+        --note-length <N>      The average length of a note [default: 80]
+        --tags <N>             The number of different tags [default: 50]
+        --due-days <N>         Due dates are spread over N days either side of now [default: 60]
+        --due-ratio <R>        The share of the tasks with a due date [default: 0.5]
+        --completed-ratio <R>  The share of the tasks that are completed [default: 0.2]
+        --seed <N>             The seed of the random numbers [default: 0]
+"""
+
+__author__ = 'Robin Siebler'
+__date__ = '10/18/26'
+
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import util
+from benchmarks.generate import make_tasks
+from task_functions import Functions
+from tasklist import TaskList
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+LOOKUPS = 1000  # find_task calls timed together
+DELETES = 100  # delete_task calls timed together
+
+
+def best_time(function, repeat):
+	"""Return the fastest of repeat runs of function, in seconds."""
+
+	times = []
+	for _ in range(repeat):
+		start = time.time()
+		function()
+		times.append(time.time() - start)
+	return min(times)
+
+
+def quietly(function):
+	"""Wrap a function that prints, sending its output to /dev/null."""
+
+	def run():
+		stdout = sys.stdout
+		sys.stdout = open(os.devnull, 'w')
+		try:
+			function()
+		finally:
+			sys.stdout.close()
+			sys.stdout = stdout
+	return run
+
+
+def time_operations(tasklist, repeat, directory):
+	"""Time each operation on a task list.
+
+	:return: a list of (operation, seconds) tuples
+	"""
+
+	rand = random.Random(0)
+	task_file = os.path.join(directory, 'tasks.tsk')
+	snapshot = {'version': TaskList.SNAPSHOT_VERSION, 'seq': 0, 'tasklist': tasklist}
+	ids = [rand.randint(1, len(tasklist)) for _ in range(LOOKUPS)]
+	functions = Functions()
+	functions.tasklist = tasklist
+	now = int(time.time())
+
+	doomed = rand.sample(xrange(1, len(tasklist) + 1), min(DELETES * repeat, len(tasklist)))
+
+	def delete_tasks():
+		for task_id in doomed[-DELETES:]:
+			tasklist.delete_task(task_id)
+		del doomed[-DELETES:]
+
+	results = [('util.save', best_time(lambda: util.save(snapshot, task_file), repeat)),
+	           ('util.load', best_time(lambda: util.load(task_file), repeat)),
+	           ('search (common word)', best_time(lambda: tasklist.search('report'), repeat)),
+	           ('search (rare string)', best_time(lambda: tasklist.search('xyzzy'), repeat)),
+	           ('fuzzy_search (typo) --top=20', best_time(lambda: tasklist.fuzzy_search('reprt', 20), repeat)),
+	           ('due_between (next 3 days)', best_time(lambda: tasklist.due_between(now, now + 3 * 24 * 60 * 60),
+	                                                   repeat)),
+	           ('find_task x{}'.format(LOOKUPS), best_time(lambda: [tasklist.find_task(task_id) for task_id in ids],
+	                                                       repeat)),
+	           ('show_tasks', best_time(quietly(functions.show_tasks), repeat)),
+	           ('show_tasks_by_priority', best_time(quietly(functions.show_tasks_by_priority), repeat)),
+	           ('show_tasks_by_priority --top=20', best_time(quietly(lambda: functions.show_tasks_by_priority(top=20)),
+	                                                        repeat)),
+	           ('delete_task x{}'.format(DELETES), best_time(delete_tasks, repeat))]
+	tasklist.pop_changes()
+	return results
+
+
+def commit_id():
+	"""Return the git commit the code is at (with + if there are uncommitted changes), or None."""
+
+	directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+	try:
+		commit = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=directory).strip()
+		changed = subprocess.check_output(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=directory)
+	except (OSError, subprocess.CalledProcessError):
+		return None
+	return commit + ('+' if changed.strip() else '')
+
+
+def main():
+	from docopt import docopt
+	args = docopt(__doc__)
+	sizes = [int(size) for size in args['--sizes'].split(',')]
+	repeat = int(args['--repeat'])
+	options = dict(note_length=int(args['--note-length']), tags=int(args['--tags']), due_days=int(args['--due-days']),
+	               due_ratio=float(args['--due-ratio']), completed_ratio=float(args['--completed-ratio']),
+	               seed=int(args['--seed']))
+	commit = commit_id()
+	output = args['--output'] or os.path.join(RESULTS_DIR, '{}.json'.format(commit or int(time.time())))
+
+	results = []
+	directory = tempfile.mkdtemp()
+	try:
+		for size in sizes:
+			tasklist = TaskList(make_tasks(size, **options))
+			print('{} tasks'.format(size))
+			for operation, seconds in time_operations(tasklist, repeat, directory):
+				print('  {:32} {:10.4f} s'.format(operation, seconds))
+				results.append({'size': size, 'operation': operation, 'seconds': seconds})
+	finally:
+		shutil.rmtree(directory)
+
+	if not os.path.isdir(os.path.dirname(os.path.abspath(output))):
+		os.makedirs(os.path.dirname(os.path.abspath(output)))
+	with open(output, 'w') as fh:
+		json.dump({'commit': commit, 'date': time.strftime('%Y-%m-%dT%H:%M:%S'), 'python': platform.python_version(),
+		           'platform': platform.platform(), 'repeat': repeat, 'generator': options, 'results': results},
+		          fh, indent=1, sort_keys=True)
+	print('Saved the results to ' + output)
+
+
+if __name__ == '__main__':
+	sys.exit(main())
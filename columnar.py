@@ -0,0 +1,687 @@
+# ------------------------------------------
+# Name:     columnar
+# Purpose:  A TaskList kept in a memory-mapped file of fixed-width columns, read without unpickling it.
+#
+# Author:   Robin Siebler
+# Created:  10/18/26
+# ------------------------------------------
+__author__ = 'Robin Siebler'
+__date__ = '10/18/26'
+
+import bisect
+import copy
+import heapq
+import itertools
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+import tempfile
+from array import array
+
+import storage
+from tasklist import NO_DUE_DATE, Task, _task, _zone, format_tags, identity_key, parse_tags, priority_key
+
+MAGIC = 'TCOL'
+VERSION = 2
+# magic, version, number of rows, size of the string heap, size of the zone table
+HEADER = struct.Struct('<4sIIQI')
+# the highest task id ever given out, after the header since version 2 (8 bytes, to keep the columns aligned)
+LAST_ID = struct.Struct('<Q')
+# (name, array typecode) of each column in the order they are stored, the widest first so every column is
+# aligned. text holds the offset in the heap where each row's strings end; they start where the row
+# before ends.
+COLUMNS = (('created_epoch', 'd'), ('due_epoch', 'd'), ('id', 'i'), ('text', 'I'), ('created_zone', 'H'),
+           ('due_zone', 'H'), ('priority_code', 'B'), ('completed', 'B'))
+NO_DATE = NO_DUE_DATE  # stored for a missing date, so the due_epoch column sorts like priority_key()
+NO_ZONE = 0xFFFF
+SEPARATOR = '\0'  # ends each of the task, note and tags of a row in the heap, so none of them may contain one
+BIG_ENDIAN = sys.byteorder == 'big'  # the columns are stored little-endian
+
+
+def _epoch(value):
+	return None if value == NO_DATE else int(value)
+
+
+def _check_text(*texts):
+	"""Raise ValueError if any of the texts (strings or iterables of them, or None) contains a SEPARATOR, which
+	would run into the next field of the heap."""
+
+	for text in texts:
+		for part in [text] if isinstance(text, basestring) else text or ():
+			if SEPARATOR in part:
+				raise ValueError('a task can not contain a NUL character')
+
+
+class ColumnFile:
+	"""A read-only view of a column file.
+
+	The file is laid out as a header, the columns (each one a packed array with a value for every row), the
+	string heap and a JSON table of the (date format, UTC offset) zones the zone columns point into. Single
+	values are read straight out of the mapping; a whole column is only copied into an array when a scan
+	needs it.
+	"""
+
+	def __init__(self, column_file):
+		with open(column_file, 'rb') as fh:
+			self.mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+		magic, version, self.rows, heap_size, zones_size = HEADER.unpack_from(self.mm)
+		if magic != MAGIC or version > VERSION:
+			self.mm.close()
+			raise ValueError(column_file + ' is not a task column file')
+
+		offset = HEADER.size
+		if version >= 2:
+			self.last_id = LAST_ID.unpack_from(self.mm, offset)[0]
+			offset += LAST_ID.size
+		self.offsets = {}
+		for name, typecode in COLUMNS:
+			self.offsets[name] = offset
+			offset += self.rows * array(typecode).itemsize
+		self.heap_start, self.heap_end = offset, offset + heap_size
+		self.zones = [_zone(str(date_format), utc_offset)
+		              for date_format, utc_offset in json.loads(self.mm[self.heap_end:self.heap_end + zones_size])]
+		self._formats = dict((name, struct.Struct('<' + typecode)) for name, typecode in COLUMNS)
+		self._arrays = {}
+		if version < 2:
+			self.last_id = self.value('id', self.rows - 1) if self.rows else 0
+
+	def close(self):
+		self.mm.close()
+
+	def value(self, name, row):
+		"""Return the value of one row of a column."""
+
+		fmt = self._formats[name]
+		return fmt.unpack_from(self.mm, self.offsets[name] + row * fmt.size)[0]
+
+	def column(self, name):
+		"""Return a whole column as an array."""
+
+		if name not in self._arrays:
+			values = array(dict(COLUMNS)[name])
+			values.fromstring(self.mm[self.offsets[name]:self.offsets[name] + self.rows * values.itemsize])
+			if BIG_ENDIAN:
+				values.byteswap()
+			self._arrays[name] = values
+		return self._arrays[name]
+
+	def text_start(self, row):
+		"""Return the offset in the heap where the strings of a row start."""
+
+		return self.value('text', row - 1) if row else 0
+
+	def heap(self, start=0, end=None):
+		"""Return (a copy of) part of the string heap."""
+
+		if end is None:
+			end = self.heap_end - self.heap_start
+		return self.mm[self.heap_start + start:self.heap_start + end]
+
+	def text(self, row):
+		"""Return the task, note and tags strings of a row."""
+
+		return self.heap(self.text_start(row), self.value('text', row)).split(SEPARATOR)[:3]
+
+	def find_id(self, task_id):
+		"""Return the row of the task with the given id (the ids are stored in order), or None."""
+
+		low, high = 0, self.rows
+		while low < high:
+			middle = (low + high) // 2
+			if self.value('id', middle) < task_id:
+				low = middle + 1
+			else:
+				high = middle
+		if low < self.rows and self.value('id', low) == task_id:
+			return low
+		return None
+
+	def task(self, row, task_id):
+		"""Make a Task out of a row.
+
+		:param task_id: the id the task has now, which is not the stored one if the tasks have been renumbered
+		"""
+
+		task, note, tags = self.text(row)
+		created_zone, due_zone = self.value('created_zone', row), self.value('due_zone', row)
+		return _task(task_id, task, self.value('priority_code', row), tags.split(), note or None,
+		             bool(self.value('completed', row)), _epoch(self.value('created_epoch', row)),
+		             None if created_zone == NO_ZONE else self.zones[created_zone],
+		             _epoch(self.value('due_epoch', row)), None if due_zone == NO_ZONE else self.zones[due_zone])
+
+
+def write(column_file, segments, base=None, last_id=0):
+	"""Write a column file.
+
+	:param column_file: the file to write
+	:param segments:    an iterable of Task objects and (start, end, first id) tuples, each standing for the
+	                    rows start to end - 1 of base, numbered from first id (or keeping their ids if it is
+	                    None)
+	:param base:        the ColumnFile the rows come from
+	:param last_id:     the highest task id ever given out, if it is higher than the last id written
+	"""
+
+	columns = dict((name, array(typecode)) for name, typecode in COLUMNS)
+	heap = []
+	heap_size = 0
+	# the zones of base keep their places, so its zone columns can be copied as they are
+	zones = list(base.zones) if base else []
+	zone_index = dict((zone, index) for index, zone in enumerate(zones))
+
+	def index(zone):
+		if zone is None:
+			return NO_ZONE
+		if zone not in zone_index:
+			zone_index[zone] = len(zones)
+			zones.append(zone)
+		return zone_index[zone]
+
+	for segment in segments:
+		if isinstance(segment, Task):
+			task = segment
+			text = SEPARATOR.join([task.task, task.note or '', format_tags(task.tags), ''])
+			heap.append(text)
+			heap_size += len(text)
+			for name, value in [('created_epoch', task.created_epoch), ('due_epoch', task.due_epoch)]:
+				columns[name].append(NO_DATE if value is None else value)
+			columns['id'].append(task.id)
+			columns['text'].append(heap_size)
+			columns['created_zone'].append(index(task.created_zone))
+			columns['due_zone'].append(index(task.due_zone))
+			columns['priority_code'].append(task.priority_code)
+			columns['completed'].append(task.completed)
+			continue
+
+		start, end, first_id = segment
+		for name in ['created_epoch', 'due_epoch', 'created_zone', 'due_zone', 'priority_code', 'completed']:
+			columns[name].extend(base.column(name)[start:end])
+		if first_id is None:
+			columns['id'].extend(base.column('id')[start:end])
+		else:
+			columns['id'].extend(array('i', xrange(first_id, first_id + end - start)))
+		text_start, ends = base.text_start(start), base.column('text')[start:end]
+		heap.append(base.heap(text_start, ends[-1]))
+		shift = heap_size - text_start
+		columns['text'].extend(ends if shift == 0 else array('I', [offset + shift for offset in ends]))
+		heap_size += ends[-1] - text_start
+
+	zone_table = json.dumps([list(zone) for zone in zones])
+	with open(column_file, 'wb') as fh:
+		fh.write(HEADER.pack(MAGIC, VERSION, len(columns['id']), heap_size, len(zone_table)))
+		fh.write(LAST_ID.pack(max([last_id] + columns['id'][-1:].tolist())))
+		for name, typecode in COLUMNS:
+			if BIG_ENDIAN:
+				columns[name].byteswap()
+			columns[name].tofile(fh)
+		for text in heap:
+			fh.write(text)
+		fh.write(zone_table)
+
+
+class ColumnarTaskList:
+	"""The TaskList API on top of a ColumnFile.
+
+	Opening the file costs the same for ten tasks as for a million: nothing is read until it is asked for.
+	Searches and sorts scan the columns and the string heap, and a Task object is only made for a row that
+	is returned. Changes are kept apart from the file (the deleted rows, the changed rows as Task objects and
+	the added tasks) until ColumnarStore.commit() writes a new file.
+	"""
+
+	def __init__(self, columns=None):
+		self.reset(columns)
+
+	def reset(self, columns):
+		"""Start over on a (new) column file, forgetting the changes."""
+
+		self.columns = columns
+		self.rows = columns.rows if columns else 0
+		self.deleted = set()  # rows of the file
+		self.changed = {}  # row of the file -> Task
+		self.added = []
+		self._added_by_id = {}
+		self.numbering = None  # the rows deleted as of the last renumber_tasks(), in order, once it was called
+		self.last_id = columns.last_id if columns else 0  # the highest id ever given out
+		self.dirty = False
+
+	def __len__(self):
+		return self.rows - len(self.deleted) + len(self.added)
+
+	def modified(self):
+		"""Return True if there are changes that have not been saved yet."""
+
+		return self.dirty
+
+	def __iter__(self):
+		return self.page()
+
+	def page(self, offset=None, limit=None):
+		"""Return the tasks in ID order, only making Task objects for the ones on the page.
+
+		:param offset: the number of tasks to skip
+		:param limit:  the number of tasks to return
+		"""
+
+		start = offset or 0
+		entries = itertools.islice(self._entries(), start, None if limit is None else start + limit)
+		return (self._task(entry) for entry in entries)
+
+	def add_task(self, task, priority='', due_date=None, tags=None, note=None):
+		"""Add a new task to the task list.
+
+		:param task:        a string containing the task
+		:param priority:    the priority of the task (low, medium, high)
+		:param tags:        any desired tags for the task
+		:param note:        a lengthier description of the task
+		"""
+
+		self.insert_tasks([Task(task, priority, due_date, tags, note)])
+
+	def insert_tasks(self, tasks):
+		"""Add tasks that were made elsewhere (imported ones), keeping their ids.
+
+		:param tasks: an iterable of Task objects
+		:raise ValueError: if a task contains a NUL character
+		"""
+
+		for task in tasks:
+			_check_text(task.task, task.note, task.tags)
+			self.added.append(task)
+			self._added_by_id[task.id] = task
+			self.last_id = max(self.last_id, task.id)
+			self.dirty = True
+
+	def delete_task(self, task_id):
+		"""Delete the given task.
+
+		:param task_id: id of the task to delete
+		"""
+
+		task = self.find_task(task_id)
+		if task:
+			row = self._row(task.id)
+			if row is None:
+				self.added.remove(task)
+				del self._added_by_id[task.id]
+			else:
+				self.deleted.add(row)
+				self.changed.pop(row, None)
+			self.dirty = True
+
+	def modify_task(self, task_id, **fields):
+		"""Update the given fields of a task.
+
+		:param task_id: id of the task to modify
+		:param fields:  the attributes to change and their new values
+		:raise ValueError: if the new task, note or tags contain a NUL character
+		"""
+
+		task = self.find_task(task_id)
+		if task:
+			if 'tags' in fields:
+				fields = dict(fields, tags=parse_tags(fields['tags']))
+			_check_text(fields.get('task'), fields.get('note'), fields.get('tags'))
+			row = self._row(task.id)
+			task.update(**fields)
+			if row is not None:
+				self.changed[row] = task
+			self.dirty = True
+
+	def search(self, search_string):
+		"""Return all task that match the given search string
+
+		:param search_string: search string
+		:return: task list
+		"""
+
+		rows = set()
+		if self.columns:
+			heap, ends = self.columns.heap().lower(), self.columns.column('text')
+			found = heap.find(search_string)
+			while 0 <= found < len(heap):
+				row = bisect.bisect_right(ends, found)
+				rows.add(row)
+				found = heap.find(search_string, ends[row])
+		return self._found(rows, lambda task: task.match(search_string))
+
+	def find_task(self, task_id):
+		"""Find a task by task.id
+
+		:param task_id: The task.id for the task to find, as an int or a string.
+		:return: a task object if found, otherwise None
+		"""
+
+		try:
+			task_id = int(task_id)
+		except ValueError:
+			return None
+		row = self._row(task_id)
+		if row is None:
+			return self._added_by_id.get(task_id)
+		return self.changed.get(row) or self.columns.task(row, task_id)
+
+	def find_by_tags(self, tags, match_all=True):
+		"""Return the tasks that have all (or any) of the given tags.
+
+		:param tags:      the tags to look for
+		:param match_all: if True the tasks need every tag, otherwise any one of them
+		:return: task list
+		"""
+
+		tags = parse_tags(tags)
+		if not tags:
+			return []
+		combine = set.intersection if match_all else set.union
+		rows = set()
+		if self.columns:
+			heap, ends = self.columns.heap(), self.columns.column('text')
+			rows = combine(*[self._tagged_rows(heap, ends, tag) for tag in tags])
+		if match_all:
+			return self._found(rows, lambda task: tags <= task.tags)
+		return self._found(rows, lambda task: tags & task.tags)
+
+	def due_between(self, low=None, high=None):
+		"""Return the tasks due at or after low and before high, in due date order.
+
+		:param low:  a Unix timestamp, or None for no lower limit
+		:param high: a Unix timestamp, or None for no upper limit
+		:return: task list
+		"""
+
+		in_range = lambda due: due is not None and (low is None or due >= low) and (high is None or due < high)
+		rows = set()
+		if self.columns:
+			rows = set(row for row, due in enumerate(self.columns.column('due_epoch')) if in_range(_epoch(due)))
+		tasks = self._found(rows, lambda task: in_range(task.due_epoch))
+		return sorted(tasks, key=lambda task: task.due_epoch)  # a stable sort, so the ids stay in order
+
+	def by_priority(self, top=None):
+		"""Return the tasks in the order of the priority view.
+
+		:param top: only return this many tasks from the top of the order
+		:return: an iterator over the tasks
+		"""
+
+		keys = self._priority_keys()
+		keys = sorted(keys) if top is None else heapq.nsmallest(top, keys)
+		return (self._task(key[-1]) for key in keys)
+
+	def renumber_tasks(self):
+		"""Number the tasks from 1 again, giving out the ids of the deleted tasks again."""
+
+		self.numbering = sorted(self.deleted)
+		for row, task in self.changed.items():
+			task.id = self._base_id(row)
+		first_id = self.rows - len(self.deleted) + 1
+		for task_id, task in enumerate(self.added, first_id):
+			task.id = task_id
+		self._added_by_id = dict((task.id, task) for task in self.added)
+		self.dirty = True
+		self.last_id = Task.last_id = len(self)  # new tasks carry on from the last task
+
+	def merge(self, older):
+		"""Make the changes made to an older copy of the task list, which another process has changed since.
+		Like TaskList.merge(), the tasks are found by identity_key() rather than by id, added tasks get the next
+		unused ids and a change to a task that has been deleted is dropped.
+
+		:param older: the ColumnarTaskList with the changes, whose file is still open
+		"""
+
+		stored = lambda row: older.columns.task(row, older.columns.value('id', row))
+		for row in sorted(older.deleted):
+			task = self._find_same(stored(row))
+			if task:
+				self.delete_task(task.id)
+		for row, changed in sorted(older.changed.items()):
+			task = self._find_same(stored(row))
+			if task:
+				self._replace(task, changed)
+		if older.numbering is not None:
+			self.renumber_tasks()
+		for task in older.added:
+			task = copy.copy(task)
+			task.id = self.last_id + 1
+			self.insert_tasks([task])
+		Task.last_id = self.last_id
+
+	def segments(self):
+		"""Return the tasks as write() takes them: runs of unchanged rows of the file and Task objects."""
+
+		start = 0
+		for row in sorted(self.deleted.union(self.changed)) + [self.rows]:
+			if start < row:
+				yield start, row, None if self.numbering is None else self._base_id(start)
+			if row in self.changed:
+				yield self.changed[row]
+			start = row + 1
+		for task in self.added:
+			yield task
+
+	def _find_same(self, original):
+		"""Return the task that was original when it was loaded, or None if it is gone (see
+		TaskList._find_same())."""
+
+		task = self.find_task(original.id)
+		if task and identity_key(task) == identity_key(original):
+			return task
+		candidates = [task for task in self if task.created_epoch == original.created_epoch and
+		              (task.task == original.task or task.id == original.id)]
+		candidates.sort(key=lambda task: (task.task != original.task, task.id != original.id))
+		return candidates[0] if candidates else None
+
+	def _replace(self, task, changed):
+		"""Put a copy of a changed task in the place of task, keeping task's id."""
+
+		changed = copy.copy(changed)
+		changed.id = task.id
+		row = self._row(task.id)
+		if row is None:
+			self.added[self.added.index(task)] = changed
+			self._added_by_id[task.id] = changed
+		else:
+			self.changed[row] = changed
+		self.dirty = True
+
+	def _base_id(self, row):
+		"""Return the id of a row of the file: the stored one, or its place since the tasks were renumbered."""
+
+		if self.numbering is None:
+			return self.columns.value('id', row)
+		return row - bisect.bisect_left(self.numbering, row) + 1
+
+	def _row(self, task_id):
+		"""Return the row of the file the task with the given id is in, or None if it isn't in the file."""
+
+		if self.numbering is None:
+			row = self.columns.find_id(task_id) if self.columns else None
+		else:
+			# the first row with task_id - 1 rows before it that were not deleted at the renumbering
+			row = task_id - 1
+			while True:
+				moved = task_id - 1 + bisect.bisect_right(self.numbering, row)
+				if moved == row:
+					break
+				row = moved
+		if row is None or not 0 <= row < self.rows or row in self.deleted:
+			return None
+		return row
+
+	def _priority_keys(self):
+		"""Return the priority_key() of each task followed by its entry (see _entries())."""
+
+		if not self.columns:
+			return (priority_key(task) + (task,) for task in self.added)
+		completed, priority, due = [self.columns.column(name) for name in ['completed', 'priority_code', 'due_epoch']]
+		if self._unchanged():
+			# the keys of the rows are put together in C: only the rank of the completed tasks needs a loop
+			ranks = array('B', priority)
+			for row, done in enumerate(completed):
+				if done:
+					ranks[row] = 0
+			return itertools.chain(itertools.izip(completed, ranks, due, self.columns.column('id'), self._entries()),
+			                       (priority_key(task) + (task,) for task in self.added))
+		return self._changed_priority_keys(completed, priority, due)
+
+	def _changed_priority_keys(self, completed, priority, due):
+		for entry in self._entries():
+			if isinstance(entry, Task):
+				yield priority_key(entry) + (entry,)
+			else:
+				row, task_id = entry
+				done = completed[row]
+				yield done, 0 if done else priority[row], due[row], task_id, entry
+
+	def _unchanged(self):
+		"""Return True if the rows of the file are all still there, with the ids they were stored with."""
+
+		return not self.deleted and not self.changed and self.numbering is None
+
+	def _entries(self):
+		"""Return an iterator of a (row, id) tuple for each unchanged row of the file and a Task for each changed
+		or added task, in ID order."""
+
+		if not self.columns:
+			return iter(self.added)
+		if self._unchanged():
+			return itertools.chain(itertools.izip(xrange(self.rows), self.columns.column('id')), self.added)
+		return self._changed_entries()
+
+	def _changed_entries(self):
+		ids = self.columns.column('id') if self.numbering is None else None
+		numbering = self.numbering or []
+		skipped = 0  # the number of rows before this one that were deleted at the renumbering
+		for row in xrange(self.rows):
+			while skipped < len(numbering) and numbering[skipped] < row:
+				skipped += 1
+			if row in self.deleted:
+				continue
+			if row in self.changed:
+				yield self.changed[row]
+			else:
+				yield row, ids[row] if ids is not None else row - skipped + 1
+		for task in self.added:
+			yield task
+
+	def _task(self, entry):
+		"""Turn an entry yielded by _entries() into a Task."""
+
+		if isinstance(entry, Task):
+			return entry
+		return self.columns.task(*entry)
+
+	def _tagged_rows(self, heap, ends, tag):
+		"""Return the rows of the file whose tags include tag."""
+
+		rows = set()
+		# every whole word that is the tag, in the task, note or tags of a row...
+		for match in re.finditer('(?<=[ \0])' + re.escape(tag) + '(?=[ \0])', heap):
+			# ...is in the tags if the next separator is the one at the end of the row
+			end = heap.find(SEPARATOR, match.end())
+			row = bisect.bisect_right(ends, end)
+			if ends[row] == end + 1:
+				rows.add(row)
+		return rows
+
+	def _found(self, rows, match):
+		"""Return the tasks in the given rows of the file, plus the changed and added tasks that match, in ID
+		order."""
+
+		tasks = [self.columns.task(row, self._base_id(row)) for row in rows
+		         if row not in self.deleted and row not in self.changed]
+		tasks.extend(task for task in self.changed.values() + self.added if match(task))
+		return sorted(tasks, key=lambda task: task.id)
+
+
+class ColumnarStore:
+	"""Open and commit a ColumnarTaskList. Has the same interface as storage.JournalStore.
+
+	A commit writes a new column file next to the old one and renames it over it. Runs of rows that did not
+	change are copied column by column, so it costs about as much as copying the file.
+
+	Like JournalStore, the file is read under a shared lock and replaced under an exclusive one. If it was
+	replaced since the task list was loaded, another process has saved in the meantime, and the changes are
+	made to what it saved (see ColumnarTaskList.merge()) instead of writing over it.
+	"""
+
+	def __init__(self, column_file):
+		self.column_file = column_file
+		self.columns = None
+		self.state = None  # the state of the column file after the last load or commit
+
+	def exists(self):
+		"""Return True if there is anything to load."""
+
+		return os.path.exists(self.column_file) or storage.exists(_pickle_file(self.column_file))
+
+	def load(self):
+		"""Open the column file, migrating the pickled task file the first time.
+
+		:return: a ColumnarTaskList
+		"""
+
+		if not os.path.exists(self.column_file) and storage.exists(_pickle_file(self.column_file)):
+			migrate(_pickle_file(self.column_file), self.column_file)
+		with storage.locked(self.column_file):
+			self.columns = self._open()
+		return ColumnarTaskList(self.columns)
+
+	def commit(self, tasklist):
+		"""Write the changes made to the task list. Nothing is written if there are none.
+
+		:param tasklist: the ColumnarTaskList returned by load()
+		"""
+
+		if not tasklist.dirty:
+			return
+
+		with storage.locked(self.column_file, exclusive=True):
+			latest = tasklist
+			if storage.file_state(self.column_file) != self.state:
+				latest = ColumnarTaskList(self._open())
+				latest.merge(tasklist)
+
+			# every process writes its own temporary file, in case the lock isn't available (on Windows)
+			fd, temp_file = tempfile.mkstemp(suffix='.tmp', prefix=os.path.basename(self.column_file) + '.',
+			                                 dir=os.path.dirname(os.path.abspath(self.column_file)))
+			os.close(fd)
+			try:
+				write(temp_file, latest.segments(), latest.columns, latest.last_id)
+			except BaseException:
+				os.remove(temp_file)
+				raise
+			for columns in set([self.columns, tasklist.columns, latest.columns]) - set([None]):
+				columns.close()
+			storage.replace(temp_file, self.column_file)
+			self.columns = self._open()
+		tasklist.reset(self.columns)
+
+	def close(self):
+		"""Close the column file opened by load(). The task list it returned can't be used after this."""
+
+		if self.columns:
+			self.columns.close()
+			self.columns = None
+
+	def _open(self):
+		"""Open the column file, if there is one, and note its state."""
+
+		self.state = storage.file_state(self.column_file)
+		return ColumnFile(self.column_file) if self.state is not None else None
+
+
+def _pickle_file(column_file):
+	return os.path.splitext(column_file)[0] + '.tsk'
+
+
+def migrate(task_file, column_file):
+	"""Copy the tasks in a pickled task file into a new column file.
+
+	:param task_file:   the pickled task file
+	:param column_file: the column file to create
+	"""
+
+	tasklist = storage.JournalStore(task_file).load()
+	write(column_file, iter(tasklist), last_id=tasklist.last_id)
+	print('Copied {} tasks from {} to {}'.format(len(tasklist), task_file, column_file))
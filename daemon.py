@@ -0,0 +1,217 @@
+# ------------------------------------------
+# Name:     daemon
+# Purpose:  Keep the task list in memory and run the commands sent to it by tasks.py over a Unix socket.
+#
+# Author:   Robin Siebler
+# Created:  10/18/26
+# ------------------------------------------
+__author__ = 'Robin Siebler'
+__date__ = '10/18/26'
+
+import errno
+import os
+import pickle
+import shutil
+import signal
+import socket
+import StringIO
+import sys
+import time
+import traceback
+
+SAVE_DELAY = 1.0  # seconds to wait for more changes before saving them all at once
+STOP = None  # the request that stops the daemon
+SAVE = 'save'  # the request that saves the changes now, for a command that reads the task file itself
+CHUNK = 64 * 1024  # bytes of the input sent to the daemon at a time
+
+
+def socket_file(task_file):
+	"""Return the socket a daemon serving task_file listens on."""
+
+	return task_file + '.sock'
+
+
+def _connect(task_file):
+	"""Connect to the daemon serving task_file.
+
+	:return: a connected socket, or None if no daemon is running
+	"""
+
+	if not hasattr(socket, 'AF_UNIX'):
+		return None
+	sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+	try:
+		sock.connect(socket_file(task_file))
+	except socket.error as e:
+		sock.close()
+		if e.errno in (errno.ENOENT, errno.ECONNREFUSED):
+			return None
+		raise
+	return sock
+
+
+def running(task_file):
+	"""Return True if a daemon is serving task_file."""
+
+	sock = _connect(task_file)
+	if sock is None:
+		return False
+	sock.close()
+	return True
+
+
+def send(task_file, argv, stdin=None):
+	"""Send a command to the daemon serving task_file.
+
+	:param task_file: the task file the daemon was started for
+	:param argv:      the command line arguments of the command, STOP or SAVE
+	:param stdin:     the input of the command, a file, for the commands that read stdin. It is copied to the
+	                  daemon a chunk at a time as the command reads it, so it is never held in memory.
+	:return: a tuple of (exit status, output), or None if no daemon is running
+	"""
+
+	sock = _connect(task_file)
+	if sock is None:
+		return None
+	try:
+		fh = sock.makefile('rwb')
+		pickle.dump((argv, stdin is not None), fh, pickle.HIGHEST_PROTOCOL)
+		if stdin is not None:
+			shutil.copyfileobj(stdin, fh, CHUNK)
+		fh.flush()
+		sock.shutdown(socket.SHUT_WR)  # the end of the input
+		return pickle.load(fh)
+	finally:
+		sock.close()
+
+
+class Daemon:
+	"""Run commands against a task list that is loaded once and kept in memory.
+
+	Requests are handled one at a time, in the order they arrive. Each command's output is captured and sent
+	back to the client, which prints it. The changes are not saved while the client waits: the daemon saves
+	once no command has come in for save_delay seconds (or when it stops), so a burst of commands is written
+	with one commit.
+	"""
+
+	def __init__(self, task_file, tasks, handler, save_delay=SAVE_DELAY):
+		"""
+		:param task_file:  the task file to serve
+		:param tasks:      a Functions object with the task file loaded
+		:param handler:    a function(tasks, argv) that runs one command, reading any input from sys.stdin
+		:param save_delay: seconds to wait for more changes before saving
+		"""
+
+		self.task_file = task_file
+		self.tasks = tasks
+		self.handler = handler
+		self.save_delay = save_delay
+		self.unsaved_since = None  # when the first change that has not been saved was made
+		self.server = None
+
+	def serve(self):
+		"""Handle requests until STOP is received or the process is terminated."""
+
+		path = socket_file(self.task_file)
+		if os.path.exists(path):
+			os.remove(path)  # left behind by a daemon that was killed
+		self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+		umask = os.umask(0o077)  # only the owner of the tasks may send commands
+		try:
+			self.server.bind(path)
+		finally:
+			os.umask(umask)
+		self.server.listen(16)
+		signal.signal(signal.SIGTERM, _terminate)
+
+		try:
+			running = True
+			while running:
+				self.server.settimeout(self._time_to_save())
+				try:
+					connection, _ = self.server.accept()
+				except socket.timeout:
+					self.save()
+					continue
+				try:
+					running = self.handle(connection)
+				finally:
+					connection.close()
+		finally:
+			self.server.close()
+			os.remove(path)
+			self.save()
+
+	def handle(self, connection):
+		"""Run the command sent over a connection and send back its output.
+
+		:return: False if the daemon was asked to stop
+		"""
+
+		fh = connection.makefile('rwb')
+		try:
+			argv, streamed = pickle.load(fh)
+		except EOFError:
+			return True  # running() checking that the daemon is up
+		if argv is STOP:
+			status, output = 0, ''
+		elif argv == SAVE:
+			self.save()
+			status, output = 0, ''
+		else:
+			# the command reads its input straight from the connection, as the client sends it
+			status, output = self.run(argv, fh if streamed else None)
+			if self.unsaved_since is None:
+				self.unsaved_since = time.time()
+		pickle.dump((status, output), fh, pickle.HIGHEST_PROTOCOL)
+		fh.flush()
+		return argv is not STOP
+
+	def run(self, argv, stdin=None):
+		"""Run one command with its input given and its output captured.
+
+		:param stdin: a file to read the input of the command from, or None if it has none
+		:return: a tuple of (exit status, output)
+		"""
+
+		status = 0
+		stdout, sys.stdout = sys.stdout, StringIO.StringIO()
+		sys.stdin = stdin if stdin is not None else StringIO.StringIO()
+		try:
+			self.handler(self.tasks, argv)
+		except SystemExit as e:
+			if isinstance(e.code, basestring):
+				print e.code
+				status = 1
+			else:
+				status = e.code or 0
+		except Exception:
+			# a broken command should not take the daemon (and the unsaved changes) down with it
+			traceback.print_exc(file=sys.stdout)
+			status = 1
+		finally:
+			output, sys.stdout = sys.stdout.getvalue(), stdout
+			sys.stdin = sys.__stdin__
+		if stdin is not None:
+			# the client sends all of the input before it reads the reply, even if the command stopped early
+			while stdin.read(CHUNK):
+				pass
+		return status, output
+
+	def save(self):
+		"""Save the changes made by the commands since the last save."""
+
+		if self.unsaved_since is not None:
+			self.tasks.save_tasks(self.task_file)
+			self.unsaved_since = None
+
+	def _time_to_save(self):
+		"""Return the number of seconds to wait for a request before saving, or None if nothing is unsaved."""
+
+		if self.unsaved_since is None:
+			return None
+		return max(0, self.unsaved_since + self.save_delay - time.time())
+
+
+def _terminate(signum, frame):
+	sys.exit(0)
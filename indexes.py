@@ -0,0 +1,318 @@
+# ------------------------------------------
+# Name:     indexes
+# Purpose:  Indexes kept up to date by TaskList so that queries don't have to look at every task.
+#
+# Author:   Robin Siebler
+# Created:  10/18/26
+# ------------------------------------------
+__author__ = 'Robin Siebler'
+__date__ = '10/18/26'
+
+import bisect
+import re
+
+WORD = re.compile(r'\w+')
+ENOUGH_CANDIDATES = 1000  # few enough tasks to check them one by one
+SIMILARITY = 0.3  # the share of their trigrams two words need to have in common to count as alike
+
+
+def _bounded(word, search_string):
+	"""Return True if a word of the search string has a separator on both sides."""
+
+	return word.start() > 0 and word.end() < len(search_string)
+
+
+def _tokens(task):
+	"""Return the set of lowercase words in the task, its note and its tags."""
+
+	tokens = set(WORD.findall(task.task.lower()))
+	if task.note:
+		tokens.update(WORD.findall(task.note.lower()))
+	for tag in task.tags:
+		tokens.update(WORD.findall(tag))
+	return tokens
+
+
+class TokenIndex:
+	"""An inverted index from each lowercase word to the ids of the tasks containing it.
+
+	A search string can only be found in a field if every word in it is found in that field's words: a word
+	with a separator on both sides in the search string has to be a whole word of the field, the first one
+	has to end a word, the last one has to start a word, and a search string that is a single word only has
+	to be inside a word. That gives a set of candidates that is guaranteed to hold every match.
+	"""
+
+	def __init__(self):
+		self.postings = {}  # word -> set of task ids
+
+	def add(self, task):
+		for token in _tokens(task):
+			self.postings.setdefault(token, set()).add(task.id)
+
+	def remove(self, task):
+		for token in _tokens(task):
+			ids = self.postings.get(token)
+			if ids:
+				ids.discard(task.id)
+				if not ids:
+					del self.postings[token]
+
+	def renumber(self, new_ids):
+		"""Replace the task ids after the tasks were renumbered.
+
+		:param new_ids: a dict of old id -> new id
+		"""
+
+		for token, ids in self.postings.items():
+			self.postings[token] = set(new_ids[task_id] for task_id in ids)
+
+	def candidates(self, search_string):
+		"""Return the ids of the tasks that might contain search_string.
+
+		:param search_string: a lowercase search string
+		:return: a set of task ids and True if every one of them is known to contain the search string, or
+		         None if the search string has no words to look up
+		"""
+
+		words = list(WORD.finditer(search_string))
+		if not words:
+			return None
+
+		if len(words) == 1 and words[0].group() == search_string:
+			# a single word is in a field exactly when it is inside one of the field's words
+			return self._lookup(words[0], search_string), True
+
+		result = None
+		# whole words are the cheapest and most selective lookups, then the longest words
+		for word in sorted(words, key=lambda word: (not _bounded(word, search_string), -len(word.group()))):
+			ids = self._lookup(word, search_string)
+			result = ids if result is None else result & ids
+			if len(result) < ENOUGH_CANDIDATES:
+				break  # the rest of the words cost more to look up than checking the candidates
+		return result, False
+
+	def _lookup(self, word, search_string):
+		"""Return the ids of the tasks with a word that could hold this part of the search string."""
+
+		text = word.group()
+		if _bounded(word, search_string):
+			return set(self.postings.get(text, ()))
+
+		if word.start() > 0:
+			match = lambda token: token.startswith(text)
+		elif word.end() < len(search_string):
+			match = lambda token: token.endswith(text)
+		else:
+			match = lambda token: text in token
+
+		ids = set()
+		for token, token_ids in self.postings.iteritems():
+			if match(token):
+				ids.update(token_ids)
+		return ids
+
+
+class TagIndex:
+	"""An index from each tag to the ids of the tasks that have it."""
+
+	def __init__(self):
+		self.tasks = {}  # tag -> set of task ids
+
+	def add(self, task):
+		for tag in task.tags:
+			self.tasks.setdefault(tag, set()).add(task.id)
+
+	def remove(self, task):
+		for tag in task.tags:
+			ids = self.tasks.get(tag)
+			if ids:
+				ids.discard(task.id)
+				if not ids:
+					del self.tasks[tag]
+
+	def renumber(self, new_ids):
+		"""Replace the task ids after the tasks were renumbered.
+
+		:param new_ids: a dict of old id -> new id
+		"""
+
+		for tag, ids in self.tasks.items():
+			self.tasks[tag] = set(new_ids[task_id] for task_id in ids)
+
+	def find(self, tags, match_all=True):
+		"""Return the ids of the tasks with all (or any) of the tags.
+
+		:param tags:      a set of tags
+		:param match_all: if True a task needs every tag, otherwise any one of them
+		:return: a set of task ids
+		"""
+
+		found = sorted((self.tasks.get(tag, set()) for tag in tags), key=len)
+		if not found:
+			return set()
+		if match_all:
+			# set.intersection walks the smallest set, so this costs no more than the rarest tag
+			return found[0].intersection(*found[1:])
+		return set().union(*found)
+
+
+class FieldIndex:
+	"""An index from each value of a Task attribute (priority_code, completed) to the ids of the tasks that
+	have it."""
+
+	def __init__(self, attribute):
+		self.attribute = attribute
+		self.tasks = {}  # value -> set of task ids
+
+	def add(self, task):
+		self.tasks.setdefault(getattr(task, self.attribute), set()).add(task.id)
+
+	def remove(self, task):
+		ids = self.tasks.get(getattr(task, self.attribute))
+		if ids:
+			ids.discard(task.id)
+
+	def renumber(self, new_ids):
+		"""Replace the task ids after the tasks were renumbered.
+
+		:param new_ids: a dict of old id -> new id
+		"""
+
+		for value, ids in self.tasks.items():
+			self.tasks[value] = set(new_ids[task_id] for task_id in ids)
+
+	def find(self, values):
+		"""Return the ids of the tasks with any of the values."""
+
+		return set().union(*[self.tasks.get(value, set()) for value in values])
+
+
+class DueIndex:
+	"""The (due timestamp, id) of every task that has a due date, kept sorted with bisect, so that the tasks due
+	in a range of time are found in O(log n + k)."""
+
+	def __init__(self, tasks=()):
+		# sorted once, which is much faster than inserting the tasks of a whole task list one at a time
+		self.keys = sorted((task.due_epoch, task.id) for task in tasks if task.due_epoch is not None)
+
+	def add(self, task):
+		if task.due_epoch is not None:
+			bisect.insort(self.keys, (task.due_epoch, task.id))
+
+	def remove(self, task):
+		if task.due_epoch is not None:
+			key = task.due_epoch, task.id
+			position = bisect.bisect_left(self.keys, key)
+			if position < len(self.keys) and self.keys[position] == key:
+				del self.keys[position]
+
+	def renumber(self, new_ids):
+		"""Replace the task ids after the tasks were renumbered.
+
+		:param new_ids: a dict of old id -> new id
+		"""
+
+		self.keys = sorted((due, new_ids[task_id]) for due, task_id in self.keys)
+
+	def find(self, low=None, high=None):
+		"""Return the ids of the tasks due at or after low and before high, in due date order.
+
+		:param low:  a Unix timestamp, or None for no lower limit
+		:param high: a Unix timestamp, or None for no upper limit
+		"""
+
+		start = 0 if low is None else bisect.bisect_left(self.keys, (low,))
+		end = len(self.keys) if high is None else bisect.bisect_left(self.keys, (high,))
+		return [task_id for due, task_id in self.keys[start:end]]
+
+
+def trigrams(word):
+	"""Return the set of the three letter pieces of a word, with $ marking its start and end."""
+
+	word = '$' + word + '$'
+	return set(word[start:start + 3] for start in xrange(len(word) - 2))
+
+
+class FuzzyIndex:
+	"""A trigram index of every word in the tasks, for finding the words that look like a misspelled one, and the
+	words of the descriptions and the tags, so that a match in them can count for more than one in a note.
+
+	The words of the notes are looked up in the TokenIndex, which has them already.
+	"""
+
+	def __init__(self):
+		self.titles = {}  # word -> set of the ids of the tasks with it in their description
+		self.tags = {}  # word -> set of the ids of the tasks with it in their tags
+		self.counts = {}  # word -> the number of tasks it is in
+		self.trigrams = {}  # trigram -> set of words
+
+	def add(self, task):
+		title_words, tag_words = self._words(task)
+		for word in title_words:
+			self.titles.setdefault(word, set()).add(task.id)
+		for word in tag_words:
+			self.tags.setdefault(word, set()).add(task.id)
+		for word in _tokens(task):
+			count = self.counts.get(word, 0)
+			self.counts[word] = count + 1
+			if not count:
+				for trigram in trigrams(word):
+					self.trigrams.setdefault(trigram, set()).add(word)
+
+	def remove(self, task):
+		title_words, tag_words = self._words(task)
+		for postings, words in ((self.titles, title_words), (self.tags, tag_words)):
+			for word in words:
+				ids = postings.get(word)
+				if ids:
+					ids.discard(task.id)
+					if not ids:
+						del postings[word]
+		for word in _tokens(task):
+			count = self.counts.get(word, 0) - 1
+			if count > 0:
+				self.counts[word] = count
+			elif count == 0:
+				del self.counts[word]
+				for trigram in trigrams(word):
+					words = self.trigrams[trigram]
+					words.discard(word)
+					if not words:
+						del self.trigrams[trigram]
+
+	def renumber(self, new_ids):
+		"""Replace the task ids after the tasks were renumbered.
+
+		:param new_ids: a dict of old id -> new id
+		"""
+
+		for postings in (self.titles, self.tags):
+			for word, ids in postings.items():
+				postings[word] = set(new_ids[task_id] for task_id in ids)
+
+	def similar(self, word):
+		"""Return a dict of the words in the tasks that look like word -> how alike they are, from SIMILARITY
+		(that share of their trigrams in common) to 1.0 (the word itself)."""
+
+		wanted = trigrams(word)
+		shared = {}
+		for trigram in wanted:
+			for other in self.trigrams.get(trigram, ()):
+				shared[other] = shared.get(other, 0) + 1
+
+		similar = {}
+		for other, count in shared.iteritems():
+			# a word has no more trigrams than letters, so most of the words are ruled out without counting them
+			if count >= SIMILARITY * (len(wanted) + len(other) - count):
+				similarity = float(count) / (len(wanted) + len(trigrams(other)) - count)
+				if similarity >= SIMILARITY:
+					similar[other] = similarity
+		return similar
+
+	def _words(self, task):
+		"""Return the sets of the words of the description and of the tags of a task."""
+
+		tag_words = set()
+		for tag in task.tags:
+			tag_words.update(WORD.findall(tag))
+		return set(WORD.findall(task.task.lower())), tag_words
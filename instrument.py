@@ -0,0 +1,207 @@
+# ------------------------------------------
+# Name:     instrument
+# Purpose:  Time the phases of a command and count the expensive calls it makes, for tasks.py --profile and
+#           the TASKS_TRACE environment variable.
+#
+# Author:   Robin Siebler
+# Created:  10/18/26
+# ------------------------------------------
+__author__ = 'Robin Siebler'
+__date__ = '10/18/26'
+
+import functools
+import importlib
+import os
+import sys
+import time
+
+try:
+	import resource
+except ImportError:
+	resource = None  # Windows: no peak memory
+
+
+def cpu_time():
+	"""Return the CPU time (user + system) used by the process so far, in seconds."""
+
+	times = os.times()
+	return times[0] + times[1]
+
+
+STARTED = time.time(), cpu_time()  # tasks.py imports this module first, so the imports after it are timed
+
+enabled = False
+phases = []  # (depth, name, wall seconds, CPU seconds, peak memory in MB) in the order the phases started
+counts = {}  # name -> calls
+_depth = 0
+_profiler = None
+_stats_file = None
+
+
+class NoPhase(object):
+	"""What phase() returns when profiling is off: entering and leaving it does nothing."""
+
+	def __enter__(self):
+		pass
+
+	def __exit__(self, *exc_info):
+		pass
+
+
+NO_PHASE = NoPhase()
+
+
+class Phase(object):
+	"""A timed phase. Phases entered while another one is running are reported under it."""
+
+	def __init__(self, name):
+		self.name = name
+
+	def __enter__(self):
+		global _depth
+		self.index = len(phases)
+		phases.append(None)  # keeps the place of the phase until it ends
+		self.depth = _depth
+		_depth += 1
+		self.started = time.time(), cpu_time()
+
+	def __exit__(self, *exc_info):
+		global _depth
+		_depth -= 1
+		phases[self.index] = (self.depth, self.name, time.time() - self.started[0], cpu_time() - self.started[1],
+		                      peak_memory())
+
+
+def phase(name):
+	"""Return a context manager that times a phase of the command, or one that does nothing if profiling is off.
+
+	with instrument.phase('load'):
+		tasks.load_tasks(task_file)
+	"""
+
+	return Phase(name) if enabled else NO_PHASE
+
+
+def peak_memory():
+	"""Return the most memory the process has used so far in MB, or None if it can't be found out.
+
+	Python 2 has no tracemalloc, so this is the peak resident set size from getrusage: it includes the
+	interpreter itself, and it can only grow.
+	"""
+
+	if resource is None:
+		return None
+	rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	return rss / (1024.0 * 1024.0) if sys.platform == 'darwin' else rss / 1024.0  # bytes on OS X, KB elsewhere
+
+
+def counted(name, function):
+	"""Wrap a function so that its calls are counted under name."""
+
+	@functools.wraps(function)
+	def wrapper(*args, **kwargs):
+		counts[name] = counts.get(name, 0) + 1
+		return function(*args, **kwargs)
+	return wrapper
+
+
+def count_method(class_name, method, name):
+	"""Return a patch that counts the calls of a method of a class in a module."""
+
+	def patch(module):
+		cls = getattr(module, class_name)
+		setattr(cls, method, counted(name, getattr(cls, method)))
+	return patch
+
+
+# the calls that are counted, wrapped only when profiling is on so they cost nothing otherwise
+PATCHES = {
+	'arrow': lambda module: setattr(module, 'get', counted('arrow.get', module.get)),
+	'tasklist': count_method('TaskList', 'find_task', 'find_task'),
+	'sqlite_tasklist': count_method('SQLiteTaskList', 'find_task', 'find_task'),
+	'columnar': count_method('ColumnarTaskList', 'find_task', 'find_task'),
+}
+
+
+class PatchOnImport(object):
+	"""An import hook (PEP 302) that patches modules when they are imported.
+
+	arrow and the other backends are only imported by the commands that use them, and importing them up front to
+	patch them would make every command slower (and the profile wrong).
+	"""
+
+	def __init__(self, patches):
+		self.patches = patches
+
+	def find_module(self, fullname, path=None):
+		return self if fullname in self.patches else None
+
+	def load_module(self, fullname):
+		if fullname in sys.modules:
+			return sys.modules[fullname]
+		patch = self.patches.pop(fullname)  # so the import below doesn't come back here
+		module = importlib.import_module(fullname)
+		patch(module)
+		return module
+
+
+def profile_setting(argv, trace=None):
+	"""Take --profile out of the arguments.
+
+	:param argv:  the command-line arguments
+	:param trace: the value of TASKS_TRACE
+	:return: the arguments without --profile, and None if profiling is off, '' to print the profile, or the
+	         name of a file to save cProfile stats to as well
+	"""
+
+	setting = None if trace in (None, '', '0') else trace
+	rest = []
+	for arg in argv:
+		if arg == '--profile':
+			setting = setting or '1'
+		elif arg.startswith('--profile='):
+			setting = arg[len('--profile='):] or '1'
+		else:
+			rest.append(arg)
+	return rest, (None if setting is None else '' if setting == '1' else setting)
+
+
+def enable(stats_file=None):
+	"""Start profiling: count the calls in PATCHES, and run cProfile if stats_file is given."""
+
+	global enabled, _profiler, _stats_file
+	if enabled:
+		return
+	enabled = True
+	phases.append((0, 'imports', time.time() - STARTED[0], cpu_time() - STARTED[1], peak_memory()))
+	patches = dict(PATCHES)
+	for name in list(patches):
+		if name in sys.modules:
+			patches.pop(name)(sys.modules[name])
+	sys.meta_path.insert(0, PatchOnImport(patches))
+	if stats_file:
+		import cProfile
+		_stats_file = stats_file
+		_profiler = cProfile.Profile()
+		_profiler.enable()
+
+
+def report(out=None):
+	"""Write the time and memory of each phase and the call counts to out (stderr by default)."""
+
+	if not enabled:
+		return
+	if _profiler:
+		_profiler.disable()
+		_profiler.dump_stats(_stats_file)
+	out = out or sys.stderr
+	out.write('\n{:28} {:>10} {:>10} {:>10}\n'.format('phase', 'wall ms', 'CPU ms', 'peak MB'))
+	for depth, name, wall, cpu, memory in (entry for entry in phases if entry):
+		out.write('{:28} {:10.1f} {:10.1f} {:>10}\n'.format('  ' * depth + name, wall * 1000, cpu * 1000,
+		                                                     '-' if memory is None else '{:.1f}'.format(memory)))
+	out.write('{:28} {:10.1f} {:10.1f}\n'.format('total', (time.time() - STARTED[0]) * 1000,
+	                                             (cpu_time() - STARTED[1]) * 1000))
+	out.write('calls: {}\n'.format(', '.join('{} {}'.format(name, counts.get(name, 0))
+	                                         for name in ('arrow.get', 'find_task'))))
+	if _profiler:
+		out.write('cProfile stats saved to {} (python -m pstats {})\n'.format(_stats_file, _stats_file))
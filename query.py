@@ -0,0 +1,325 @@
+# ------------------------------------------
+# Name:     query
+# Purpose:  Parse the expressions of tasks.py query (pri:H and due<7d and not done and tag:ops) and plan how
+#           to find the tasks that match one: look up the most selective term in an index, then filter.
+#
+# Author:   Robin Siebler
+# Created:  10/18/26
+# ------------------------------------------
+__author__ = 'Robin Siebler'
+__date__ = '10/18/26'
+
+import re
+import time
+
+from tasklist import NO_PRIORITY, PRIORITY_RANK
+
+DAY = 24 * 60 * 60
+TOKEN = re.compile(r'\(|\)|"[^"]*"|[^\s()]+')
+DUE = re.compile(r'^due(<=|>=|<|>)(-?\d+[hdw])$')
+DURATION = re.compile(r'^(-?\d+)([hdw])$')
+UNITS = {'h': 60 * 60, 'd': DAY, 'w': 7 * DAY}
+KEYWORDS = ('and', 'or', 'not')
+
+
+class QueryError(ValueError):
+	"""A query expression that can't be parsed."""
+
+
+def duration(text):
+	"""Return the number of seconds in a duration such as 3d, 12h or -2w.
+
+	:raises QueryError: if text isn't a duration
+	"""
+
+	match = DURATION.match(text.lower())
+	if not match:
+		raise QueryError('"{}" is not a duration: use a number of h, d or w, e.g. 3d.'.format(text))
+	count, unit = match.groups()
+	return int(count) * UNITS[unit]
+
+
+class Term:
+	"""A term of a query.
+
+	match(task) tells whether a task matches it, and candidates(tasklist) returns the ids of the tasks that
+	might match it, looked up in an index of the task list, or None if there is no index for it.
+	"""
+
+	field = None  # the field of TaskList.candidates() that is looked up for the term
+
+	def __init__(self, text, value):
+		self.text = text
+		self.value = value
+
+	def __str__(self):
+		return self.text
+
+	def candidates(self, tasklist):
+		lookup = getattr(tasklist, 'candidates', None)  # only the pickled task list has the indexes
+		return lookup(self.field, self.value) if lookup and self.field else None
+
+
+class Priority(Term):
+	field = 'priority'
+
+	def match(self, task):
+		return task.priority_code in self.value
+
+
+class Completed(Term):
+	field = 'completed'
+
+	def match(self, task):
+		return task.completed == self.value
+
+
+class Tag(Term):
+	field = 'tag'
+
+	def match(self, task):
+		return self.value in task.tags
+
+
+class Text(Term):
+	field = 'text'
+
+	def match(self, task):
+		return task.match(self.value)
+
+
+class Due(Term):
+	"""A due date before or after a time: the value is the range [low, high) of due timestamps, either end of
+	which can be None. A term without a range (due:none) matches the tasks with no due date."""
+
+	field = 'due'
+
+	def match(self, task):
+		if self.value is None:
+			return task.due_epoch is None
+		low, high = self.value
+		return task.due_epoch is not None and (low is None or task.due_epoch >= low) and \
+			(high is None or task.due_epoch < high)
+
+	def candidates(self, tasklist):
+		return Term.candidates(self, tasklist) if self.value else None
+
+
+class Not:
+	def __init__(self, term):
+		self.term = term
+
+	def __str__(self):
+		return 'not ' + str(self.term)
+
+	def match(self, task):
+		return not self.term.match(task)
+
+	def candidates(self, tasklist):
+		return None
+
+
+class And:
+	def __init__(self, terms):
+		self.terms = terms
+
+	def __str__(self):
+		return '(' + ' and '.join(str(term) for term in self.terms) + ')'
+
+	def match(self, task):
+		return all(term.match(task) for term in self.terms)
+
+	def candidates(self, tasklist):
+		found = [ids for ids in (term.candidates(tasklist) for term in self.terms) if ids is not None]
+		return found[0].intersection(*found[1:]) if found else None
+
+
+class Or:
+	def __init__(self, terms):
+		self.terms = terms
+
+	def __str__(self):
+		return '(' + ' or '.join(str(term) for term in self.terms) + ')'
+
+	def match(self, task):
+		return any(term.match(task) for term in self.terms)
+
+	def candidates(self, tasklist):
+		found = []
+		for term in self.terms:
+			ids = term.candidates(tasklist)
+			if ids is None:
+				return None  # the tasks matching this term could be anywhere
+			found.append(ids)
+		return set().union(*found)
+
+
+def parse(expression, now=None):
+	"""Parse a query expression.
+
+	Terms are joined with and (which can be left out), or and not, and grouped with parentheses:
+		pri:H,M     priority H or M (pri:none: no priority)
+		done        completed (not done: not completed)
+		tag:ops     tagged ops
+		due<7d      due in less than 7 days, overdue included (<, <=, >, >= and h, d or w; due:none: no due date)
+		text:milk   milk in the task, the note or the tags, as does a bare word or a "quoted phrase"
+
+	:param now: the time due dates are counted from, as a Unix timestamp
+	:return: the parsed query, with match(task) and candidates(tasklist)
+	:raises QueryError: if the expression isn't valid
+	"""
+
+	tokens = TOKEN.findall(expression)
+	if not tokens:
+		raise QueryError('The query is empty.')
+	parser = _Parser(tokens, int(now or time.time()))
+	query = parser.parse_or()
+	if parser.position < len(tokens):
+		raise QueryError('Unexpected "{}" in the query.'.format(tokens[parser.position]))
+	return query
+
+
+class _Parser:
+	def __init__(self, tokens, now):
+		self.tokens = tokens
+		self.position = 0
+		self.now = now
+
+	def peek(self):
+		if self.position < len(self.tokens):
+			return self.tokens[self.position]
+		return None
+
+	def keyword(self, word):
+		token = self.peek()
+		if token is not None and token.lower() == word:
+			self.position += 1
+			return True
+		return False
+
+	def parse_or(self):
+		terms = [self.parse_and()]
+		while self.keyword('or'):
+			terms.append(self.parse_and())
+		return terms[0] if len(terms) == 1 else Or(terms)
+
+	def parse_and(self):
+		terms = [self.parse_not()]
+		while self.peek() not in (None, ')') and self.peek().lower() != 'or':
+			self.keyword('and')
+			terms.append(self.parse_not())
+		return terms[0] if len(terms) == 1 else And(terms)
+
+	def parse_not(self):
+		if self.keyword('not'):
+			term = self.parse_not()
+			if isinstance(term, Completed):
+				return Completed('not ' + term.text, not term.value)  # so that it can be looked up too
+			return Not(term)
+		return self.parse_term()
+
+	def parse_term(self):
+		token = self.peek()
+		if token is None:
+			raise QueryError('The query ends too soon.')
+		if token.lower() in KEYWORDS or token == ')':
+			raise QueryError('Expected a term instead of "{}" in the query.'.format(token))
+		self.position += 1
+		if token == '(':
+			query = self.parse_or()
+			if not self.keyword(')'):
+				raise QueryError('A "(" in the query is not closed.')
+			return query
+		return self.term(token)
+
+	def term(self, token):
+		if token.startswith('"'):
+			if len(token) < 2 or not token.endswith('"'):
+				raise QueryError('Unterminated phrase in the query.')
+			if len(token) < 3:
+				raise QueryError('Empty phrase in the query.')
+			return Text(token, token[1:-1].lower())
+
+		word = token.lower()
+		if word in ('done', 'completed'):
+			return Completed(token, True)
+		if word == 'due:none':
+			return Due(token, None)
+		due = DUE.match(word)
+		if due:
+			operator, offset = due.groups()
+			limit = self.now + duration(offset)
+			low, high = {'<': (None, limit), '<=': (None, limit + 1), '>': (limit + 1, None),
+			             '>=': (limit, None)}[operator]
+			return Due(token, (low, high))
+
+		field, _, value = word.partition(':')
+		if not value:
+			if word.startswith(('due<', 'due>')) or ':' in word:
+				raise QueryError('"{}" is not a valid term.'.format(token))
+			return Text(token, word)
+		if field == 'pri':
+			codes = set()
+			for priority in value.upper().split(','):
+				if priority == 'NONE':
+					codes.add(NO_PRIORITY)
+				elif priority in PRIORITY_RANK:
+					codes.add(PRIORITY_RANK[priority])
+				else:
+					raise QueryError('"{}" is not a priority: use H, M, L or none.'.format(priority))
+			return Priority(token, sorted(codes))
+		if field == 'tag':
+			return Tag(token, value)
+		if field == 'text':
+			return Text(token, value)
+		raise QueryError('"{}" is not a valid term.'.format(token))
+
+
+class Plan:
+	"""How to find the tasks that match a query.
+
+	Every term that has to match (each one joined with and at the top of the query) is looked up in the task
+	list's indexes, and the term with the fewest candidates is used: only its candidates are checked against
+	the whole query. Without any index the whole task list is scanned.
+	"""
+
+	def __init__(self, query, tasklist):
+		self.query = query
+		self.tasklist = tasklist
+		conjuncts = query.terms if isinstance(query, And) else [query]
+		self.lookups = [(term, term.candidates(tasklist)) for term in conjuncts]
+		indexed = [(len(ids), index) for index, (term, ids) in enumerate(self.lookups) if ids is not None]
+		self.chosen = min(indexed)[1] if indexed else None
+
+	def tasks(self):
+		"""Yield the tasks that match the query, in ID order."""
+
+		if self.chosen is None:
+			tasks = iter(self.tasklist)
+		else:
+			ids = self.lookups[self.chosen][1]
+			tasks = (self.tasklist.find_task(task_id) for task_id in sorted(ids))
+		return (task for task in tasks if task is not None and self.query.match(task))
+
+	def explain(self, found):
+		"""Return the lines that describe the plan.
+
+		:param found: the number of tasks that matched
+		"""
+
+		width = max(len(str(term)) for term, ids in self.lookups)
+		lines = ['Query: ' + ' and '.join(str(term) for term, ids in self.lookups), 'Indexes:']
+		for index, (term, ids) in enumerate(self.lookups):
+			if ids is None:
+				found_by = '{:>8} no index'.format('-')
+			else:
+				found_by = '{:8} candidates{}'.format(len(ids), ' (chosen)' if index == self.chosen else '')
+			lines.append('  {:{}}  {}'.format(str(term), width, found_by))
+		if self.chosen is None:
+			lines.append('Plan: scan all {} tasks, filter with the query: {} found'.format(len(self.tasklist),
+			                                                                                found))
+		else:
+			term, ids = self.lookups[self.chosen]
+			lines.append('Plan: look up the {} candidates of {}, filter with the query: {} found'.format(
+				len(ids), term, found))
+		return lines
@@ -0,0 +1,199 @@
+# ------------------------------------------
+# Name:     relative_dates
+# Purpose:  Work out the due status and the relative description ("in 2 days", "an hour ago") of many dates
+#           at once, against one "now", with NumPy if it is installed.
+#
+# Author:   Robin Siebler
+# Created:  10/18/26
+# ------------------------------------------
+__author__ = 'Robin Siebler'
+__date__ = '10/18/26'
+
+import bisect
+import calendar
+import itertools
+import time
+
+DAY = 24 * 60 * 60
+BATCH_SIZE = 8192  # rows worked out together
+NUMPY_MIN_ROWS = 2048  # fewer rows are done sooner in pure Python than it takes to import NumPy
+
+# the due status codes, and the renderer style of each one
+NO_DUE_DATE, UPCOMING, DUE, OVERDUE = range(4)
+STATUS_STYLES = (None, 'upcoming', 'due', 'overdue')
+
+# how arrow's humanize() describes a time difference: the upper limit (in seconds) of each bucket but the
+# last, the English phrase of each bucket and the unit its number is counted in. The numbers are never less
+# than 2, and the months are calendar months, in the time zone of the date.
+LIMITS = (10, 45, 90, 2700, 5400, 79200, 129600, 2160000, 3888000, 29808000, 47260800)
+PHRASES = ('just now', 'seconds', 'a minute', '{} minutes', 'an hour', '{} hours', 'a day', '{} days', 'a month',
+           '{} months', 'a year', '{} years')
+MONTHS = 9  # the bucket counted in calendar months
+UNITS = (1, 1, 1, 60, 1, 3600, 1, DAY, 1, 1, 1, 365 * DAY)
+COUNTED = frozenset([3, 5, 7, MONTHS, 11])  # the buckets with a number in their phrase
+
+_numpy = None
+
+
+def numpy():
+	"""Return the numpy module, or None if it isn't installed. It is only imported the first time it is needed."""
+
+	global _numpy
+	if _numpy is None:
+		try:
+			import numpy as np
+			_numpy = np
+		except ImportError:
+			_numpy = False
+	return _numpy or None
+
+
+def batches(iterable, size=BATCH_SIZE):
+	"""Yield lists of up to size items from an iterable."""
+
+	iterator = iter(iterable)
+	while True:
+		batch = list(itertools.islice(iterator, size))
+		if not batch:
+			return
+		yield batch
+
+
+def phrase(bucket, count, past):
+	"""Return the description of a time difference in a bucket, e.g. "in 3 days" or "a month ago"."""
+
+	if bucket == 0:
+		return PHRASES[0]
+	text = PHRASES[bucket].format(count)
+	return text + ' ago' if past else 'in ' + text
+
+
+def month(epoch, offset=None):
+	"""Return the number of the calendar month of a timestamp, counting from year 0.
+
+	:param offset: the UTC offset (in seconds) of the time zone to count in, or None for local time
+	"""
+
+	date = time.localtime(epoch) if offset is None else time.gmtime(epoch + offset)
+	return date.tm_year * 12 + date.tm_mon
+
+
+def local_offset(epoch):
+	"""Return the UTC offset (in seconds) of local time at a timestamp."""
+
+	epoch = int(epoch)
+	return calendar.timegm(time.localtime(epoch)) - epoch
+
+
+def due_statuses(epochs, now):
+	"""Return the due status of each due date: UPCOMING if it is more than a day away, DUE until it has passed,
+	then OVERDUE, and NO_DUE_DATE for None.
+
+	:param epochs: the due dates as Unix timestamps
+	:param now:    the current time as a Unix timestamp
+	"""
+
+	now = int(now)
+	np = numpy() if len(epochs) >= NUMPY_MIN_ROWS else None
+	if np:
+		missing, values = _array(np, epochs)
+		left = values - now
+		return np.select([missing, left > DAY, left >= 0], [NO_DUE_DATE, UPCOMING, DUE], OVERDUE).tolist()
+	return [NO_DUE_DATE if epoch is None else UPCOMING if epoch - now > DAY else DUE if epoch >= now else OVERDUE
+	        for epoch in epochs]
+
+
+def humanize(epochs, now, offsets=None):
+	"""Describe timestamps relative to now, the way arrow's humanize() does in English.
+
+	Only one description is made for each distinct (bucket, number, past) combination; the rest are looked up.
+
+	:param epochs:  Unix timestamps
+	:param now:     the current time as a Unix timestamp
+	:param offsets: the UTC offset (in seconds) of the time zone each date was given in, which its calendar
+	                months are counted in like arrow does, or None (for all of them or for one) for local time
+	:return: the list of descriptions, with None for None
+	"""
+
+	if offsets is None:
+		offsets = [None] * len(epochs)
+	np = numpy() if len(epochs) >= NUMPY_MIN_ROWS else None
+	if np:
+		return _humanize_numpy(np, epochs, now, offsets)
+
+	now_months = {}  # the month of now in each time zone
+	phrases = {}
+	descriptions = []
+	for epoch, offset in itertools.izip(epochs, offsets):
+		if epoch is None:
+			descriptions.append(None)
+			continue
+		delta = int(epoch - now)
+		diff = abs(delta)
+		bucket = bisect.bisect_right(LIMITS, diff)
+		if bucket == MONTHS:
+			if offset not in now_months:
+				now_months[offset] = month(now, offset)
+			count = max(abs(month(epoch, offset) - now_months[offset]), 2)
+		elif bucket in COUNTED:
+			count = max(diff // UNITS[bucket], 2)
+		else:
+			count = 1
+		key = (bucket, count, delta < 0)
+		description = phrases.get(key)
+		if description is None:
+			description = phrases[key] = phrase(*key)
+		descriptions.append(description)
+	return descriptions
+
+
+def _array(np, epochs):
+	"""Return a mask of the missing timestamps and an array of the timestamps (0 where they are missing)."""
+
+	values = np.fromiter((np.nan if epoch is None else epoch for epoch in epochs), np.float64, len(epochs))
+	missing = np.isnan(values)
+	values[missing] = 0
+	return missing, values
+
+
+def _months(np, values):
+	"""Return the number of the calendar month (UTC) of each timestamp in an array, counting from 1970. Add the
+	UTC offset of a time zone to the timestamps first to count in it."""
+
+	return np.floor(values).astype(np.int64).astype('datetime64[s]').astype('datetime64[M]').astype(np.int64)
+
+
+def _shifts(np, values, offsets, now):
+	"""Return arrays of the UTC offsets to count the months of the timestamps in, and those to count the
+	months of now in, for each of them."""
+
+	if None not in offsets:
+		shifts = np.array(offsets, dtype=np.int64)
+		return shifts, shifts
+	now_offset = local_offset(now)
+	shifts = [local_offset(value) if offset is None else offset for value, offset in itertools.izip(values, offsets)]
+	return np.array(shifts, dtype=np.int64), np.array([now_offset if offset is None else offset for offset in offsets],
+	                                                  dtype=np.int64)
+
+
+def _humanize_numpy(np, epochs, now, offsets):
+	missing, values = _array(np, epochs)
+	delta = np.trunc(values - now).astype(np.int64)
+	diff = np.abs(delta)
+	bucket = np.searchsorted(np.array(LIMITS), diff, side='right')
+	counted = np.array([index in COUNTED for index in range(len(PHRASES))])[bucket]
+	count = np.where(counted, np.maximum(diff // np.array(UNITS)[bucket], 2), 1)
+	in_months = bucket == MONTHS
+	if in_months.any():
+		picked = [offset for offset, wanted in itertools.izip(offsets, in_months.tolist()) if wanted]
+		shifts, now_shifts = _shifts(np, values[in_months].tolist(), picked, now)
+		months = _months(np, values[in_months] + shifts) - _months(np, now + now_shifts)
+		count[in_months] = np.maximum(np.abs(months), 2)
+
+	# one code for each (bucket, number, past) combination: describe the distinct ones and look up the rest
+	codes = (count * len(PHRASES) + bucket) * 2 + (delta < 0)
+	codes[missing] = -1
+	distinct, inverse = np.unique(codes, return_inverse=True)
+	phrases = np.array([None if code < 0 else phrase(code // 2 % len(PHRASES), code // 2 // len(PHRASES), code % 2)
+	                    for code in distinct.tolist()], dtype=object)
+	return phrases[inverse].tolist()
@@ -0,0 +1,200 @@
+# ------------------------------------------
+# Name:     remind
+# Purpose:  tasks.py remind: wait for the due dates of the tasks and run a hook (or print a line) for each one,
+#           following the changes other commands make to the task file.
+#
+# Author:   Robin Siebler
+# Created:  10/18/26
+# ------------------------------------------
+__author__ = 'Robin Siebler'
+__date__ = '10/18/26'
+
+import heapq
+import os
+import subprocess
+import sys
+import time
+
+import storage
+
+POLL_INTERVAL = 1.0  # seconds between looks at the task file
+COMPACT_MIN = 1024  # the stale heap entries are never swept out while there are fewer than this
+
+
+class Reminders:
+	"""The times the tasks are to be reminded of, in a min-heap.
+
+	A task whose due date changes gets a new heap entry; the old one is left where it is and skipped when it
+	comes to the top, since it no longer matches times. That makes every change O(log n), and the heap is only
+	rebuilt when the stale entries outnumber the live ones.
+	"""
+
+	def __init__(self, tasks, now, ahead=0):
+		"""
+		:param tasks: the tasks to remind of, an iterable of Task objects
+		:param now:   the current time as a Unix timestamp: tasks due before it are not reminded of
+		:param ahead: how many seconds before the due date to remind of a task
+		"""
+
+		self.ahead = ahead
+		self.times = {}  # task id -> the time of its reminder
+		for task in tasks:
+			when = self._time(task)
+			if when is not None and when > now:
+				self.times[task.id] = when
+		self.heap = [(when, task_id) for task_id, when in self.times.iteritems()]
+		heapq.heapify(self.heap)
+
+	def __len__(self):
+		return len(self.times)
+
+	def update(self, task_id, task, now):
+		"""Reschedule the reminder of a task after it was added, changed or deleted.
+
+		:param task: the task, or None if it was deleted
+		"""
+
+		when = self._time(task) if task is not None else None
+		if when is None or when <= now:
+			self.times.pop(task_id, None)
+		elif self.times.get(task_id) != when:
+			self.times[task_id] = when
+			heapq.heappush(self.heap, (when, task_id))
+		if len(self.heap) > 2 * len(self.times) + COMPACT_MIN:
+			self.heap = [(when, task_id) for task_id, when in self.times.iteritems()]
+			heapq.heapify(self.heap)
+
+	def next_time(self):
+		"""Return the time of the next reminder, or None if there is none."""
+
+		while self.heap and self.times.get(self.heap[0][1]) != self.heap[0][0]:
+			heapq.heappop(self.heap)
+		return self.heap[0][0] if self.heap else None
+
+	def pop_due(self, now):
+		"""Return the ids of the tasks whose reminder time has come, the earliest first."""
+
+		due = []
+		while True:
+			when = self.next_time()
+			if when is None or when > now:
+				return due
+			task_id = heapq.heappop(self.heap)[1]
+			del self.times[task_id]
+			due.append(task_id)
+
+	def _time(self, task):
+		if task.completed or task.due_epoch is None:
+			return None
+		return task.due_epoch - self.ahead
+
+
+class Watcher:
+	"""Follows a task file: keeps the task list loaded and finds out which tasks other commands change.
+
+	The pickled task file is followed by reading the new records at the end of its journal. The other backends
+	(and a pickled task file whose journal was folded into a new snapshot) are loaded again by the same store,
+	which is closed first so that no database connection or mapping of the old file is left open, and the
+	tasks are compared with the reminders.
+	"""
+
+	def __init__(self, task_file):
+		self.task_file = task_file
+		self.store = storage.open_store(task_file)
+		self.tasklist = self.store.load()
+		self.state = self._state()
+
+	def changes(self):
+		"""Return the ids of the tasks that were added, changed or deleted since the last call, or None if the
+		task list was loaded again, so that any of them may have changed."""
+
+		if isinstance(self.store, storage.JournalStore):
+			changes = self.store.follow(self.tasklist)
+			if changes is not None:
+				ids = set()
+				for change in changes:
+					if change[0] == 'renumber':
+						return None  # journals written by older versions
+					ids.add(change[1].id if change[0] == 'add' else change[1])
+				return ids
+		else:
+			state = self._state()
+			if state == self.state:
+				return set()
+			self.state = state
+		self.store.close()
+		self.tasklist = self.store.load()
+		return None
+
+	def _state(self):
+		try:
+			stat = os.stat(self.task_file)
+		except OSError:
+			return None
+		return stat.st_ino, stat.st_size, stat.st_mtime
+
+
+def print_reminder(task):
+	"""The default hook: print a line for the task."""
+
+	print('{}  Task {} is due: {}'.format(task.due_date, task.id, task.task))
+	sys.stdout.flush()
+
+
+def command_hook(command):
+	"""Return a hook that runs a shell command for a task, with the task in TASK_ID, TASK, TASK_DUE and
+	TASK_PRIORITY."""
+
+	def run(task):
+		env = dict(os.environ, TASK_ID=str(task.id), TASK=task.task, TASK_DUE=task.due_date or '',
+		           TASK_PRIORITY=task.priority or '')
+		status = subprocess.call(command, shell=True, env=env)
+		if status:
+			print('The reminder command for task {} exited with {}'.format(task.id, status))
+			sys.stdout.flush()
+	return run
+
+
+def remind(task_file, hook=print_reminder, ahead=0, poll_interval=POLL_INTERVAL, until=None):
+	"""Call hook with each task when its due date comes, until interrupted.
+
+	:param hook:  a function called with the Task
+	:param ahead: how many seconds before the due date to call it
+	:param until: stop at this time (a Unix timestamp); for the tests
+	"""
+
+	watcher = Watcher(task_file)
+	now = time.time()
+	run(watcher, Reminders(watcher.tasklist, now, ahead), hook, now, poll_interval, until)
+
+
+def run(watcher, reminders, hook, checked, poll_interval=POLL_INTERVAL, until=None):
+	"""Give the reminders as they come due, and keep them up to date with the changes to the task file.
+
+	Between reminders the process sleeps, waking up every poll_interval seconds to see whether the task file has
+	changed, so it uses next to no CPU however many tasks are scheduled.
+
+	:param checked: the time up to which the reminders have been given
+	"""
+
+	while until is None or time.time() < until:
+		next_time = reminders.next_time()
+		delay = poll_interval if next_time is None else min(max(next_time - time.time(), 0), poll_interval)
+		time.sleep(delay)
+
+		# a task changed while sleeping keeps a reminder that came due in the meantime
+		changed = watcher.changes()
+		if changed is None:
+			loaded = set()
+			for task in watcher.tasklist:
+				reminders.update(task.id, task, checked)
+				loaded.add(task.id)
+			changed = set(reminders.times) - loaded
+		for task_id in changed:
+			reminders.update(task_id, watcher.tasklist.find_task(task_id), checked)
+
+		checked = time.time()
+		for task_id in reminders.pop_due(checked):
+			task = watcher.tasklist.find_task(task_id)
+			if task is not None:
+				hook(task)
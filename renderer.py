@@ -0,0 +1,122 @@
+# ------------------------------------------
+# Name:     renderer
+# Purpose:  Buffered output of task tables, with paging and an optional pager.
+#
+# Author:   Robin Siebler
+# Created:  10/18/26
+# ------------------------------------------
+__author__ = 'Robin Siebler'
+__date__ = '10/18/26'
+
+import errno
+import itertools
+import os
+import shlex
+import subprocess
+import sys
+
+from colorama import Fore, Back, Style
+
+import instrument
+
+CHUNK_SIZE = 256  # lines collected before they are written out
+
+# the escape codes for each style, put together once instead of for every row
+RESET = Fore.RESET + Style.NORMAL
+STYLES = {
+	'L': Fore.YELLOW + Style.BRIGHT,
+	'M': Fore.BLUE + Style.BRIGHT,
+	'H': Fore.RED + Style.BRIGHT,
+	'upcoming': Fore.CYAN + Style.BRIGHT,
+	'due': Fore.BLUE + Style.BRIGHT,
+	'overdue': Fore.RED + Style.BRIGHT,
+	'completed': Fore.WHITE + Style.BRIGHT + Back.WHITE,
+}
+COMPLETED_RESET = RESET + Back.RESET
+
+
+def paint(style, text):
+	"""Wrap text in the escape codes of a style."""
+
+	return STYLES[style] + text + RESET
+
+
+def page(rows, offset=None, limit=None):
+	"""Return the rows of one page without looking at the rows after it.
+
+	:param rows:   an iterable of rows
+	:param offset: the number of rows to skip
+	:param limit:  the number of rows to return
+	"""
+
+	if not offset and limit is None:
+		return rows
+	start = offset or 0
+	return itertools.islice(rows, start, None if limit is None else start + limit)
+
+
+class Output:
+	"""A buffered writer for table output.
+
+	Lines are collected and written CHUNK_SIZE at a time, either to stdout or to the stdin of a pager. The
+	first chunk is written as soon as it is full, so a long listing starts right away and only one chunk is
+	ever held in memory. If the reader goes away (the pager is quit, or the pipe is closed) the rest of the
+	output is dropped quietly.
+	"""
+
+	def __init__(self, pager=False, chunk_size=CHUNK_SIZE):
+		self.chunk_size = chunk_size
+		self.lines = []
+		self.closed = False
+		self.pager = None
+		if pager and sys.stdout.isatty():
+			command = os.environ.get('PAGER', 'less -R')
+			try:
+				self.pager = subprocess.Popen(shlex.split(command), stdin=subprocess.PIPE)
+			except OSError:
+				pass  # no pager, write to stdout instead
+		self.out = self.pager.stdin if self.pager else sys.stdout
+
+	def __enter__(self):
+		self.phase = instrument.phase('render')
+		self.phase.__enter__()
+		return self
+
+	def __exit__(self, *exc_info):
+		self.close()
+		self.phase.__exit__(*exc_info)
+
+	def write(self, line):
+		"""Write one line (without the newline)."""
+
+		self.lines.append(line)
+		if len(self.lines) >= self.chunk_size:
+			self.flush()
+
+	def write_lines(self, lines):
+		"""Write all of the lines from an iterable."""
+
+		for line in lines:
+			self.write(line)
+			if self.closed:
+				return
+
+	def flush(self):
+		if self.lines and not self.closed:
+			try:
+				self.out.write('\n'.join(self.lines) + '\n')
+				self.out.flush()
+			except IOError as e:
+				if e.errno != errno.EPIPE:
+					raise
+				self.closed = True
+		del self.lines[:]
+
+	def close(self):
+		self.flush()
+		if self.pager:
+			try:
+				self.pager.stdin.close()
+			except IOError:
+				pass
+			self.pager.wait()
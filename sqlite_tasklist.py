@@ -0,0 +1,333 @@
+# ------------------------------------------
+# Name:     sqlite_tasklist
+# Purpose:  A TaskList kept in an SQLite database instead of a pickle.
+#
+# Author:   Robin Siebler
+# Created:  10/18/26
+# ------------------------------------------
+__author__ = 'Robin Siebler'
+__date__ = '10/18/26'
+
+import os
+import sqlite3
+
+import storage
+from tasklist import CREATION_DATE_FORMAT, PRIORITY_RANK, Task, format_tags, parse_tags, timestamp
+
+COLUMNS = ('id', 'task', 'priority', 'due_date', 'due_date_format', 'tags', 'note', 'completed', 'creation_date',
+           'due_ts', 'created_ts')
+# the Task attribute stored in each column
+ATTRIBUTES = COLUMNS[:-2] + ('due_epoch', 'created_epoch')
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS tasks (
+	id              INTEGER PRIMARY KEY,
+	task            TEXT NOT NULL,
+	priority        TEXT,
+	due_date        TEXT,
+	due_date_format TEXT,
+	due_ts          INTEGER,
+	created_ts      INTEGER,
+	tags            TEXT,
+	note            TEXT,
+	completed       INTEGER NOT NULL DEFAULT 0,
+	creation_date   TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_priority ON tasks (priority);
+CREATE INDEX IF NOT EXISTS idx_tasks_completed ON tasks (completed);
+CREATE INDEX IF NOT EXISTS idx_tasks_due ON tasks (due_ts);
+CREATE TABLE IF NOT EXISTS task_tags (
+	task_id         INTEGER NOT NULL REFERENCES tasks (id) ON DELETE CASCADE ON UPDATE CASCADE,
+	tag             TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_task_tags_tag ON task_tags (tag);
+CREATE INDEX IF NOT EXISTS idx_task_tags_task ON task_tags (task_id);
+CREATE TABLE IF NOT EXISTS counters (
+	name            TEXT PRIMARY KEY,
+	value           INTEGER NOT NULL
+);
+'''
+
+# open tasks by priority and then by due date (tasks without one last), completed tasks at the end
+PRIORITY_ORDER = 'completed, CASE WHEN completed THEN 0 {} ELSE {} END, due_ts IS NULL, due_ts, id'.format(
+	' '.join("WHEN priority = '{}' THEN {}".format(pri, rank) for pri, rank in sorted(PRIORITY_RANK.items())),
+	len(PRIORITY_RANK))
+
+
+def _like(search_string):
+	"""Turn a search string into a LIKE pattern that matches it anywhere."""
+
+	return '%' + search_string.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+
+
+class SQLiteTaskList:
+	"""The TaskList API on top of an SQLite database.
+
+	Tasks are only turned into Task objects when they are fetched, so a command only pays for the rows it
+	looks at. Changes are made in the current transaction; SQLiteStore.commit() makes them permanent.
+	"""
+
+	def __init__(self, connection):
+		self.db = connection
+		self.saved_changes = connection.total_changes  # the rows changed as of the last commit
+
+	def modified(self):
+		"""Return True if there are changes that have not been committed yet."""
+
+		return self.db.total_changes != self.saved_changes
+
+	def __len__(self):
+		return self.db.execute('SELECT COUNT(*) FROM tasks').fetchone()[0]
+
+	def __iter__(self):
+		return self._select('ORDER BY id')
+
+	@property
+	def last_id(self):
+		"""The highest id ever given out: the highest one in use, or the one of a deleted task above it."""
+
+		return self.db.execute("SELECT MAX(COALESCE((SELECT value FROM counters WHERE name = 'last_id'), 0), "
+		                       "COALESCE((SELECT MAX(id) FROM tasks), 0))").fetchone()[0]
+
+	def save_last_id(self, last_id):
+		"""Record the highest id given out, for when the task that has it is deleted."""
+
+		self.db.execute("INSERT OR REPLACE INTO counters (name, value) VALUES ('last_id', ?)", (last_id,))
+
+	def page(self, offset=None, limit=None):
+		"""Return the tasks in ID order, only fetching the ones on the page.
+
+		:param offset: the number of tasks to skip
+		:param limit:  the number of tasks to return
+		"""
+
+		return self._select('ORDER BY id LIMIT ? OFFSET ?', (-1 if limit is None else limit, offset or 0))
+
+	def add_task(self, task, priority='', due_date=None, tags=None, note=None):
+		"""Add a new task to the task list.
+
+		:param task:        a string containing the task
+		:param priority:    the priority of the task (low, medium, high)
+		:param tags:        any desired tags for the task
+		:param note:        a lengthier description of the task
+		"""
+
+		self._insert(Task(task, priority, due_date, tags, note))
+
+	def insert_tasks(self, tasks):
+		"""Add tasks that were made elsewhere (imported ones), keeping their ids.
+
+		:param tasks: an iterable of Task objects
+		"""
+
+		tasks = list(tasks)
+		self.db.executemany('INSERT INTO tasks ({}) VALUES ({})'.format(', '.join(COLUMNS), ', '.join('?' * len(COLUMNS))),
+		                    [self._values(task) for task in tasks])
+		self.db.executemany('INSERT INTO task_tags (task_id, tag) VALUES (?, ?)',
+		                    [(task.id, tag) for task in tasks for tag in task.tags])
+
+	def delete_task(self, task_id):
+		"""Delete the given task.
+
+		:param task_id: id of the task to delete
+		"""
+
+		self.save_last_id(self.last_id)  # so the id isn't given out again if it was the highest one
+		self.db.execute('DELETE FROM tasks WHERE id = ?', (int(task_id),))
+
+	def modify_task(self, task_id, **fields):
+		"""Update the given fields of a task.
+
+		:param task_id: id of the task to modify
+		:param fields:  the attributes to change and their new values
+		"""
+
+		task = self.find_task(task_id)
+		if task:
+			if 'tags' in fields:
+				fields = dict(fields, tags=parse_tags(fields['tags']))
+			task.update(**fields)
+			self.db.execute('UPDATE tasks SET {} WHERE id = ?'.format(
+				', '.join(name + ' = ?' for name in COLUMNS[1:])), self._values(task)[1:] + [task.id])
+			if 'tags' in fields:
+				self.db.execute('DELETE FROM task_tags WHERE task_id = ?', (task.id,))
+				self._insert_tags(task)
+
+	def search(self, search_string):
+		"""Return all task that match the given search string
+
+		:param search_string: search string
+		:return: task list
+		"""
+
+		pattern = _like(search_string)
+		return list(self._select("WHERE task LIKE ? ESCAPE '\\' OR note LIKE ? ESCAPE '\\' OR tags LIKE ? ESCAPE '\\' "
+		                         "ORDER BY id", (pattern, pattern, pattern)))
+
+	def find_task(self, task_id):
+		"""Find a task by task.id
+
+		:param task_id: The task.id for the task to find.
+		:return: a task object if found, otherwise None
+		"""
+
+		for task in self._select('WHERE id = ?', (int(task_id),)):
+			return task
+		return None
+
+	def find_by_tags(self, tags, match_all=True):
+		"""Return the tasks that have all (or any) of the given tags.
+
+		:param tags:      the tags to look for
+		:param match_all: if True the tasks need every tag, otherwise any one of them
+		:return: task list
+		"""
+
+		tags = sorted(parse_tags(tags))
+		if not tags:
+			return []
+		having = 'HAVING COUNT(*) = {}'.format(len(tags)) if match_all else ''
+		return list(self._select('WHERE id IN (SELECT task_id FROM task_tags WHERE tag IN ({}) GROUP BY task_id {}) '
+		                         'ORDER BY id'.format(', '.join('?' * len(tags)), having), tags))
+
+	def due_between(self, low=None, high=None):
+		"""Return the tasks due at or after low and before high, in due date order.
+
+		:param low:  a Unix timestamp, or None for no lower limit
+		:param high: a Unix timestamp, or None for no upper limit
+		:return: task list
+		"""
+
+		return list(self._select('WHERE due_ts >= ? AND due_ts < ? ORDER BY due_ts, id',
+		                         (-2 ** 63 if low is None else low, 2 ** 63 - 1 if high is None else high)))
+
+	def by_priority(self, top=None):
+		"""Return the tasks in the order of the priority view.
+
+		:param top: only return this many tasks from the top of the order
+		:return: an iterator over the tasks
+		"""
+
+		if top is None:
+			return self._select('ORDER BY ' + PRIORITY_ORDER)
+		return self._select('ORDER BY {} LIMIT ?'.format(PRIORITY_ORDER), (top,))
+
+	def renumber_tasks(self):
+		"""Number the tasks from 1 again, giving out the ids of the deleted tasks again."""
+
+		ids = [row[0] for row in self.db.execute('SELECT id FROM tasks ORDER BY id')]
+		# going up, a task's new id always belongs to a task that was deleted or has already moved down;
+		# task_tags follows along through ON UPDATE CASCADE
+		self.db.executemany('UPDATE tasks SET id = ? WHERE id = ?',
+		                    [(new_id, old_id) for new_id, old_id in enumerate(ids, 1) if new_id != old_id])
+		Task.last_id = len(ids)
+		self.save_last_id(Task.last_id)
+
+	def _insert(self, task):
+		self.db.execute('INSERT INTO tasks ({}) VALUES ({})'.format(', '.join(COLUMNS), ', '.join('?' * len(COLUMNS))),
+		                self._values(task))
+		self._insert_tags(task)
+
+	def _insert_tags(self, task):
+		self.db.executemany('INSERT INTO task_tags (task_id, tag) VALUES (?, ?)', [(task.id, tag) for tag in task.tags])
+
+	def _values(self, task):
+		"""Return the column values of a task."""
+
+		values = [getattr(task, name, None) for name in ATTRIBUTES]
+		values[COLUMNS.index('tags')] = format_tags(task.tags)
+		return values
+
+	def _select(self, clause, params=()):
+		"""Yield a Task for each row selected by the given WHERE/ORDER BY clause."""
+
+		for row in self.db.execute('SELECT {} FROM tasks {}'.format(', '.join(COLUMNS), clause), params):
+			fields = dict(zip(ATTRIBUTES, row))
+			fields['completed'] = bool(fields['completed'])
+			fields['tags'] = parse_tags(fields['tags'])
+			yield Task.restore(**fields)
+
+
+class SQLiteStore:
+	"""Open and commit an SQLiteTaskList. Has the same interface as storage.JournalStore."""
+
+	def __init__(self, db_file):
+		self.db_file = db_file
+		self.db = None
+
+	def exists(self):
+		"""Return True if there is anything to load."""
+
+		return os.path.exists(self.db_file) or storage.exists(_pickle_file(self.db_file))
+
+	def load(self):
+		"""Open the database, migrating the pickled task file the first time.
+
+		:return: an SQLiteTaskList
+		"""
+
+		if not os.path.exists(self.db_file) and storage.exists(_pickle_file(self.db_file)):
+			migrate(_pickle_file(self.db_file), self.db_file)
+		self.db = _connect(self.db_file)
+		return SQLiteTaskList(self.db)
+
+	def commit(self, tasklist):
+		"""Commit the changes made to the task list.
+
+		:param tasklist: the SQLiteTaskList returned by load()
+		"""
+
+		tasklist.db.commit()
+		tasklist.saved_changes = tasklist.db.total_changes
+
+	def close(self):
+		"""Close the database opened by load(), throwing away any changes that were not committed."""
+
+		if self.db is not None:
+			self.db.close()
+			self.db = None
+
+
+def _pickle_file(db_file):
+	return os.path.splitext(db_file)[0] + '.tsk'
+
+
+def _connect(db_file):
+	db = sqlite3.connect(db_file)
+	db.text_factory = str
+	db.execute('PRAGMA foreign_keys = ON')
+	had_tags = db.execute("SELECT COUNT(*) FROM sqlite_master WHERE name = 'task_tags'").fetchone()[0]
+	db.executescript(SCHEMA)
+	if 'created_ts' not in [row[1] for row in db.execute('PRAGMA table_info(tasks)')]:
+		# databases created before the creation date was kept as a timestamp
+		with db:
+			db.execute('ALTER TABLE tasks ADD COLUMN created_ts INTEGER')
+			db.executemany('UPDATE tasks SET created_ts = ? WHERE id = ?',
+			               [(timestamp(creation_date, CREATION_DATE_FORMAT), task_id)
+			                for task_id, creation_date in db.execute('SELECT id, creation_date FROM tasks').fetchall()])
+	if not had_tags:
+		# databases created before task_tags existed hold the tags as the user typed them
+		with db:
+			for task_id, tags in db.execute('SELECT id, tags FROM tasks').fetchall():
+				tags = parse_tags(tags)
+				db.execute('UPDATE tasks SET tags = ? WHERE id = ?', (format_tags(tags), task_id))
+				db.executemany('INSERT INTO task_tags (task_id, tag) VALUES (?, ?)', [(task_id, tag) for tag in tags])
+	return db
+
+
+def migrate(task_file, db_file):
+	"""Copy the tasks in a pickled task file into a new SQLite database.
+
+	:param task_file: the pickled task file
+	:param db_file:   the database to create
+	"""
+
+	tasklist = storage.JournalStore(task_file).load()
+	db = _connect(db_file)
+	with db:
+		sqlite_tasklist = SQLiteTaskList(db)
+		for task in tasklist:
+			sqlite_tasklist._insert(task)
+		sqlite_tasklist.save_last_id(tasklist.last_id)
+	db.close()
+	print('Copied {} tasks from {} to {}'.format(len(tasklist), task_file, db_file))
@@ -0,0 +1,301 @@
+# ------------------------------------------
+# Name:     storage
+# Purpose:  Snapshot + append-only journal persistence for the task list.
+#
+# Author:   Robin Siebler
+# Created:  10/18/26
+# ------------------------------------------
+__author__ = 'Robin Siebler'
+__date__ = '10/18/26'
+
+import contextlib
+import os
+import threading
+
+try:
+	import cPickle as pickle
+except ImportError:
+	import pickle
+
+try:
+	import fcntl
+except ImportError:
+	fcntl = None  # Windows: the task file is not locked
+
+import util
+from tasklist import TaskList, find_class
+
+COMPACT_THRESHOLD = 256 * 1024  # journal size (in bytes) that triggers a new snapshot
+
+
+def open_store(task_file):
+	"""Return the store for a task file: SQLite for a .db file, columns for a .tcol file, otherwise a pickle
+	snapshot + journal."""
+
+	if task_file.endswith('.db'):
+		from sqlite_tasklist import SQLiteStore
+		return SQLiteStore(task_file)
+	if task_file.endswith('.tcol'):
+		from columnar import ColumnarStore
+		return ColumnarStore(task_file)
+	return JournalStore(task_file)
+
+
+def exists(task_file):
+	"""Return True if there are tasks stored in task_file."""
+
+	return open_store(task_file).exists()
+
+
+@contextlib.contextmanager
+def locked(task_file, exclusive=False):
+	"""Hold an advisory lock on a task file (on <task_file>.lock, which is never replaced): a shared one while it
+	is read, an exclusive one while it is changed."""
+
+	if fcntl is None:
+		yield
+		return
+	with open(task_file + '.lock', 'a') as fh:
+		fcntl.flock(fh, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+		yield  # closing the file releases the lock
+
+
+def file_state(path):
+	"""Return what changes when a file is written to or replaced, or None if it doesn't exist."""
+
+	try:
+		stat = os.stat(path)
+	except OSError:
+		return None
+	return stat.st_ino, stat.st_size, stat.st_mtime
+
+
+def read_records(journal_file, offset=0):
+	"""Yield the records in a journal file. A record cut short by a crash ends the journal.
+
+	:param offset: where in the file to start reading, which has to be the start of a record
+	"""
+
+	if not os.path.exists(journal_file):
+		return
+	with open(journal_file, 'rb') as fh:
+		fh.seek(offset)
+		unpickler = util.unpickler(fh, find_class)
+		while True:
+			try:
+				yield unpickler.load()
+			except EOFError:
+				return
+			except (pickle.UnpicklingError, ValueError, IndexError, KeyError, AttributeError):
+				print('Ignoring a damaged record at the end of {}'.format(journal_file))
+				return
+
+
+def replace(src, dst):
+	"""Rename src to dst, overwriting dst."""
+
+	if os.name == 'nt' and os.path.exists(dst):
+		os.remove(dst)
+	os.rename(src, dst)
+
+
+class JournalStore:
+	"""Store a TaskList as a pickled snapshot plus a journal of the changes made since the snapshot.
+
+	Each add/modify/delete is appended to <task_file>.journal as one small record numbered with a sequence
+	number. Loading replays the journal over the snapshot. Once the journal grows past the threshold it is
+	renamed to <task_file>.journal.old and a background thread folds it into a new snapshot. The snapshot
+	remembers the last sequence number it contains, so replaying a journal twice is harmless.
+
+	Several processes can use the same task file. The files are read under a shared lock and changed under an
+	exclusive one. If any of the files has changed since the task list was loaded (or last committed) another
+	process has saved in the meantime: the commit reads the task file again and merges its changes into it
+	(see TaskList.merge()) instead of writing over the other process's.
+	"""
+
+	def __init__(self, task_file, threshold=COMPACT_THRESHOLD):
+		self.task_file = task_file
+		self.journal_file = task_file + '.journal'
+		self.rotated_file = task_file + '.journal.old'
+		self.threshold = threshold
+		self.seq = 0
+		self.stale = False  # the snapshot was written by an older version and should be rewritten
+		self.files = None  # the state of the snapshot, journal and journal.old after the last load or commit
+		self._compactor = None
+
+	def exists(self):
+		"""Return True if there is anything to load."""
+
+		return any(os.path.exists(path) for path in (self.task_file, self.journal_file, self.rotated_file))
+
+	def load(self):
+		"""Load the task list.
+
+		:return: a TaskList containing the snapshot with all of the journalled changes applied.
+		"""
+
+		with locked(self.task_file):
+			tasklist, self.seq, version = self._read(self.rotated_file, self.journal_file)
+			self.files = self._files()
+		self.stale = version < TaskList.SNAPSHOT_VERSION
+		return tasklist
+
+	def commit(self, tasklist):
+		"""Append the unsaved changes of tasklist to the journal. Nothing is written if there are none, except
+		that a snapshot written by an older version is rewritten once, so it isn't upgraded on every load.
+
+		If another process has saved since the task list was loaded, tasklist is brought up to date with what
+		it saved before the changes are merged in.
+
+		:param tasklist: the TaskList returned by load()
+		"""
+
+		changes = tasklist.pop_changes()
+		if not changes:
+			if self.stale:
+				self.stale = False
+				self._upgrade(tasklist)
+			return
+
+		with locked(self.task_file, exclusive=True):
+			if self._files() != self.files:
+				latest, self.seq, version = self._read(self.rotated_file, self.journal_file)
+				changes = latest.merge(changes)
+				tasklist.replace_with(latest)
+
+			with open(self.journal_file, 'ab') as fh:
+				for change in changes:
+					self.seq += 1
+					pickle.dump((self.seq,) + change, fh, pickle.HIGHEST_PROTOCOL)
+			self.files = self._files()
+			size = os.path.getsize(self.journal_file)
+
+		if self.stale or size > self.threshold:
+			self.stale = False
+			self.compact()
+
+	def follow(self, tasklist):
+		"""Bring a task list returned by load() up to date with what other processes have saved since, by reading
+		only the end of the journal.
+
+		:return: the changes made to the task list, or None if it has to be loaded again because the journal has
+		         been folded into a new snapshot
+		"""
+
+		with locked(self.task_file):
+			files = self._files()
+			if files == self.files:
+				return []
+			loaded, self.files = self.files, files
+			snapshot, journal, rotated = loaded
+			if (files[0], files[2]) != (snapshot, rotated) or files[1] is None or \
+					(journal is not None and files[1][0] != journal[0]):
+				return None
+			changes = []
+			for record in read_records(self.journal_file, journal[1] if journal else 0):
+				if record[0] > self.seq:
+					tasklist.apply(record[1:])
+					self.seq = record[0]
+					changes.append(record[1:])
+		return changes
+
+	def close(self):
+		"""Nothing is kept open between load() and commit(), so there is nothing to close. For the same interface
+		as the other stores."""
+
+	def compact(self, wait=False):
+		"""Fold the journal into a new snapshot.
+
+		:param wait: block until the snapshot has been written
+		"""
+
+		if self._compactor and self._compactor.is_alive():
+			if wait:
+				self._compactor.join()
+			return
+
+		# A journal.old left behind by an interrupted compaction (or one being folded by another process) is
+		# folded first; the live journal is rotated on a later commit.
+		with locked(self.task_file, exclusive=True):
+			if not os.path.exists(self.rotated_file):
+				if not os.path.exists(self.journal_file):
+					return
+				unchanged = self._files() == self.files
+				replace(self.journal_file, self.rotated_file)
+				if unchanged:
+					# nobody else has saved since our last commit, so there is nothing to merge next time
+					self.files = self._files()
+
+		self._compactor = threading.Thread(target=self._write_snapshot)
+		self._compactor.start()
+		if wait:
+			self._compactor.join()
+
+	def _upgrade(self, tasklist):
+		"""Write the task list as it was loaded (upgraded by TaskList.__setstate__) over a snapshot written by an
+		older version. The journal is left alone: the snapshot's sequence number covers its records. Nothing is
+		written if another process has saved since the task list was loaded."""
+
+		temp_file = '{}.{}.tmp'.format(self.task_file, os.getpid())
+		with locked(self.task_file, exclusive=True):
+			if self._files() != self.files:
+				return
+			util.save({'version': TaskList.SNAPSHOT_VERSION, 'seq': self.seq, 'tasklist': tasklist}, temp_file)
+			replace(temp_file, self.task_file)
+			self.files = self._files()
+
+	def _write_snapshot(self):
+		"""Write snapshot + journal.old to a new snapshot, then discard journal.old."""
+
+		with locked(self.task_file):
+			files = self._files()
+			if files[2] is None:
+				return  # another process has folded it
+			tasklist, seq, version = self._read(self.rotated_file)
+
+		# written without the lock, so commits aren't held up, and only put in place if no other process has
+		# put its own snapshot in place in the meantime
+		temp_file = '{}.{}.{}.tmp'.format(self.task_file, os.getpid(), threading.current_thread().ident)
+		util.save({'version': TaskList.SNAPSHOT_VERSION, 'seq': seq, 'tasklist': tasklist}, temp_file)
+		with locked(self.task_file, exclusive=True):
+			current = self._files()
+			if (current[0], current[2]) == (files[0], files[2]):
+				unchanged = current == self.files
+				replace(temp_file, self.task_file)
+				os.remove(self.rotated_file)
+				if unchanged:
+					self.files = self._files()
+			else:
+				os.remove(temp_file)
+
+	def _files(self):
+		"""Return the state of the snapshot, the journal and journal.old. Every change to the task file changes
+		it, so if it is the same as when the tasks were loaded nobody else has saved in the meantime."""
+
+		return tuple(file_state(path) for path in (self.task_file, self.journal_file, self.rotated_file))
+
+	def _read(self, *journals):
+		"""Read the snapshot and replay the given journals over it.
+
+		:return: the TaskList, the sequence number of the last change applied to it and the snapshot version
+		"""
+
+		snapshot = None
+		if os.path.exists(self.task_file):
+			snapshot = util.load(self.task_file, find_class)
+
+		if isinstance(snapshot, dict):
+			tasklist, seq, version = snapshot['tasklist'], snapshot['seq'], snapshot.get('version', 1)
+		elif snapshot is None:
+			tasklist, seq, version = TaskList(), 0, TaskList.SNAPSHOT_VERSION
+		else:
+			# files written before the journal existed hold the bare list of tasks
+			tasklist, seq, version = TaskList(snapshot), 0, 0
+
+		for journal_file in journals:
+			for record in read_records(journal_file):
+				if record[0] > seq:
+					tasklist.apply(record[1:])
+					seq = record[0]
+
+		return tasklist, seq, version
@@ -8,17 +8,31 @@
 __author__ = 'Robin Siebler'
 __date__ = '5/6/15'
 
-import arrow
+import archive
+import errno
+import itertools
 import platform
-import util
-
-from tasklist import Task, TaskList
-from collections import OrderedDict
+import query
+import relative_dates
+import renderer
+import storage
+import sys
+import time
+import transfer
+
+from tasklist import Task, TaskList, format_tags, fuzzy_search, sort_by_priority
+
+# colorama only has to wrap stdout when the escape codes end up on a Windows console
+if platform.system() == 'Windows' and sys.stdout.isatty():
+	from colorama import init
+	init()
 
-from colorama import init, Fore, Back, Style
+TEMPLATE = '{0:^3} {1:20} {2:^3} {3:20} {4:15} {5:20}'
+COMPLETED_TEMPLATE = renderer.STYLES['completed'] + TEMPLATE + renderer.COMPLETED_RESET
+FUZZY_TOP = 20  # the number of best matches search --fuzzy displays
+RULE = TEMPLATE.format('---', '--------------------', '---', '--------------------', '---------------',
+                       '--------------------')
 
-if platform.system() == 'Windows':
-	init()
 
 # TODO: Colors that work on the Mac don't work very well on Windows and vice versa
 # TODO: Add an ini file so the user can specify the colors to use. Point to the colorma
@@ -29,289 +43,233 @@ class Functions:
 		"""Initialize the task list."""
 
 		self.tasklist = TaskList()
-		self.legend = '\nLegend: Not Due  ' + Fore.CYAN + Style.BRIGHT + 'Upcoming  ' + Fore.BLUE + \
-		              Style.BRIGHT + 'Due  ' + Fore.RED + Style.BRIGHT + 'Overdue  ' + Fore.WHITE + Style.BRIGHT + \
-		              Back.WHITE + 'Completed' + Fore.RESET + Style.NORMAL + Back.RESET
+		self.store = None
+		self.task_file = None
+		self.legend = '\nLegend: Not Due  ' + renderer.STYLES['upcoming'] + 'Upcoming  ' + renderer.STYLES['due'] + \
+		              'Due  ' + renderer.STYLES['overdue'] + 'Overdue  ' + renderer.STYLES['completed'] + 'Completed' + \
+		              renderer.COMPLETED_RESET
 
-	def show_tasks(self, tasks=None, date_format=None):
+	def show_tasks(self, tasks=None, date_format=None, offset=None, limit=None, pager=False, completed=False):
 		"""Display the tasks (in ID order)
 
 		:param tasks: tasks object
+		:param int offset: the number of tasks to skip
+		:param int limit: the number of tasks to display
+		:param bool pager: send the output to $PAGER
+		:param bool completed: only display the completed tasks, including the archived ones
 		"""
 
+		if completed:
+			tasks = sorted([task for task in self.tasklist if task.completed] + self._archived(),
+			               key=lambda task: task.id)
+			if not tasks:
+				print('\nThere are no completed tasks to display!\n')
+				return
 		if not tasks:
-			tasks = self.tasklist.tasks
+			tasks = self.tasklist
 
 		if len(tasks) > 0:
-
-			template = '{0:^3} {1:20} {2:^3} {3:20} {4:15} {5:20}'
-			print template.format('\nID', 'Description', ' Pri', 'Due', 'Created', 'Tags')
-			print template.format('---', '--------------------', '---', '--------------------', '---------------',
-			                      '--------------------')
-			for task in tasks:
-				if task.priority == 'L':
-					priority = Fore.YELLOW + Style.BRIGHT + task.priority.center(3) + Fore.RESET + Style.NORMAL
-				elif task.priority == 'M':
-					priority = Fore.BLUE + Style.BRIGHT + task.priority.center(3) + Fore.RESET + Style.NORMAL
-				elif task.priority == 'H':
-					priority = Fore.RED + Style.BRIGHT + task.priority.center(3) + Fore.RESET + Style.NORMAL
-				else:
-					priority = ''
-
-				if task.due_date is None:
-					due_date = ''
-				else:
-					if date_format:
-						due_date = task.due_date.rsplit(' ', 1)[0].ljust(20)
-					else:
-						due_date = (arrow.get(task.due_date, task.due_date_format).humanize()).ljust(20)
-
-					if not task.completed:
-						today = arrow.now()
-						diff = arrow.get(task.due_date, task.due_date_format) - today
-						if diff.days >= 1 and diff.seconds > 0:
-							due_date = Fore.CYAN + Style.BRIGHT + due_date + Fore.RESET + Style.NORMAL
-						elif diff.days >= 0:
-							due_date = Fore.BLUE + Style.BRIGHT + due_date + Fore.RESET + Style.NORMAL
-						elif diff.days <= 0:
-							due_date = Fore.RED + Style.BRIGHT + due_date + Fore.RESET + Style.NORMAL
-
-				if date_format:
-					age = (str(task.creation_date).split()[0]).ljust(15)  # drop the time zone
-				else:
-					age = (arrow.get(task.creation_date, 'MM/DD/YYYY h:mm:ss A ZZ').humanize()).ljust(15)
-
-				if task.note:
-					desc = task.task + ' *'
-				else:
-					desc = task.task
-
-				if task.completed:
-					if task.priority:
-						priority = task.priority
-					else:
-						priority = ''
-					task_id = Fore.WHITE + Style.BRIGHT + Back.WHITE + str(task.id).center(3)
-					tags = str(task.tags) + Fore.RESET + Style.NORMAL + Back.RESET
-					print template.format(task_id, desc, priority, due_date, age, tags)
-				else:
-					print template.format(task.id, desc, priority, due_date, age, task.tags)
-
-			print self.legend
+			if isinstance(tasks, list):
+				tasks = renderer.page(iter(tasks), offset, limit)
+			else:
+				tasks = tasks.page(offset, limit)
+			with renderer.Output(pager) as out:
+				out.write(TEMPLATE.format('\nID', 'Description', ' Pri', 'Due', 'Created', 'Tags'))
+				out.write(RULE)
+				out.write_lines(self._id_rows(tasks, date_format))
+				out.write(self.legend)
 		else:
 			print('\nThere are no tasks to display!\n')
 
-	def show_tasks_by_priority(self, tasks=None, date_format=None):
+	def show_tasks_by_priority(self, tasks=None, date_format=None, top=None, offset=None, limit=None, pager=False):
 		"""Display the tasks (in Priority order)
 
 		:param tasks: tasks object
+		:param int top: only display this many tasks from the top of the list
+		:param int offset: the number of tasks to skip
+		:param int limit: the number of tasks to display
+		:param bool pager: send the output to $PAGER
 		"""
 
-		low_dict_o = OrderedDict()
-		med_dict_o = OrderedDict()
-		high_dict_o = OrderedDict()
-		no_dict_o = OrderedDict()
-		completed_dict_o = OrderedDict()
-
-		low_dict = {}
-		med_dict = {}
-		high_dict = {}
-		no_dict = {}
-		completed_dict = {}
+		if not tasks:
+			tasks = self.tasklist
+		if len(tasks) == 0:
+			print('\nThere are no tasks to display!\n')
+			return
 
-		temp_dict = {}
+		if limit is not None:
+			# rows past the end of the page never need to be sorted
+			end = (offset or 0) + limit
+			top = end if top is None else min(top, end)
+		if isinstance(tasks, list):
+			tasks = sort_by_priority(tasks, top)
+		else:
+			tasks = tasks.by_priority(top)
 
-		if not tasks:
-			tasks = self.tasklist.tasks
+		with renderer.Output(pager) as out:
+			out.write(TEMPLATE.format('\nPri', 'Description', 'ID', 'Due', 'Created', 'Tags'))
+			out.write(RULE)
+			out.write_lines(self._priority_rows(renderer.page(iter(tasks), offset, limit), date_format))
+			out.write(self.legend)
 
-		if len(tasks) > 0:
-			for task in tasks:
-				if task.due_date is None:
-					due_date = ''
-				else:
-					if date_format:
-						due_date = task.due_date.rsplit(' ', 1)[0].ljust(20)
-					else:
-						due_date = (arrow.get(task.due_date, task.due_date_format).humanize()).ljust(20)
+	def show_task(self, task_id):
+		"""Display the specified task, including its notes, if any.
 
-				age = (str(task.creation_date).split()[0]).ljust(15)  # drop the time zone
+		:param str task_id: the task_id of the task.
+		"""
 
-				if task.note:
-					desc = task.task + ' *'
+		task_id = self._validate_task_id(task_id)
+		if task_id:
+			task = self.tasklist.find_task(task_id)
+			if task:
+				if task.priority in renderer.STYLES:
+					priority = renderer.paint(task.priority, ' ' + task.priority + ' ')
 				else:
-					desc = task.task
+					priority = ''
+				template = '{0:^3} {1:^3} {2:20} {3:40}'
+				with renderer.Output() as out:
+					out.write(template.format('\nID', ' Pri', 'Description', 'Note'))
+					out.write(template.format('---', '---', '--------------------',
+					                          '----------------------------------------'))
+					out.write(template.format(task.id, priority, task.task, task.note))
+
+	def _id_rows(self, tasks, date_format):
+		"""Generate the rows of the ID view."""
+
+		now = time.time()
+		for batch in relative_dates.batches(tasks):
+			due_dates = self._due_dates(batch, date_format, now)
+			if date_format:
+				ages = [str(task.creation_date).split()[0] for task in batch]  # drop the time zone
+			else:
+				ages = relative_dates.humanize([task.created_epoch for task in batch], now,
+				                               [task.created_zone and task.created_zone[1] for task in batch])
 
+			for task, due_date, age in itertools.izip(batch, due_dates, ages):
+				age = age.ljust(15)
 				if task.completed:
-					completed_dict[task.id] = task.priority, due_date, age, desc, task.tags
-				elif task.priority == 'L':
-					low_dict[task.id] = [task.priority, due_date, age, desc, task.tags]
-				elif task.priority == 'M':
-					med_dict[task.id] = [task.priority, due_date, age, desc, task.tags]
-				elif task.priority == 'H':
-					high_dict[task.id] = [task.priority, due_date, age, desc, task.tags]
+					task_id = renderer.STYLES['completed'] + str(task.id).center(3)
+					tags = format_tags(task.tags) + renderer.COMPLETED_RESET
+					yield TEMPLATE.format(task_id, self._description(task), task.priority or '', due_date, age, tags)
 				else:
-					no_dict[task.id] = [task.priority, due_date, age, desc, task.tags]
+					yield TEMPLATE.format(task.id, self._description(task), self._priority(task), due_date, age,
+					                      format_tags(task.tags))
 
-		else:
-			print('\nThere are no tasks to display!\n')
-			return
-
-		for key, value in sorted(no_dict.items(), key=lambda e: e[1][1]):
-			if value[1] is not '':
-				no_dict_o[key] = value
-			else:
-				temp_dict[key] = value
-
-		for key in temp_dict:
-			no_dict_o[key] = temp_dict[key]
-
-		temp_dict.clear()
+	def _priority_rows(self, tasks, date_format):
+		"""Generate the rows of the priority view."""
 
-		for key, value in sorted(low_dict.items(), key=lambda e: e[1][1]):
-			if value[1] is not '':
-				low_dict_o[key] = value
-			else:
-				temp_dict[key] = value
+		now = time.time()
+		for batch in relative_dates.batches(tasks):
+			for task, due_date in itertools.izip(batch, self._due_dates(batch, date_format, now)):
+				age = (str(task.creation_date).split()[0]).ljust(15)  # drop the time zone
 
-		for key, value in temp_dict.items():
-			low_dict_o[key] = value
+				if task.completed:
+					yield COMPLETED_TEMPLATE.format(task.priority or '', self._description(task), task.id, due_date,
+					                                age, format_tags(task.tags))
+				else:
+					yield TEMPLATE.format(self._priority(task), self._description(task), task.id, due_date, age,
+					                      format_tags(task.tags))
 
-		temp_dict.clear()
+	def _priority(self, task):
+		if task.priority in renderer.STYLES:
+			return renderer.paint(task.priority, task.priority.center(3))
+		return ''
 
-		for key, value in sorted(med_dict.items(), key=lambda e: e[1][1]):
-			if value[1] is not '':
-				med_dict_o[key] = value
-			else:
-				temp_dict[key] = value
+	def _description(self, task):
+		if task.note:
+			return task.task + ' *'
+		return task.task
 
-		for key, value in temp_dict.items():
-			med_dict_o[key] = value
+	def _due_dates(self, tasks, date_format, now):
+		"""Return the due date column of each task, colored by how soon it is due unless it is completed.
 
-		temp_dict.clear()
+		The statuses and the relative dates of all of the tasks are worked out together, against the same now.
+		"""
 
-		for key, value in sorted(high_dict.items(), key=lambda e: e[1][1]):
-			if value[1] is not '':
-				high_dict_o[key] = value
+		epochs = [task.due_epoch for task in tasks]
+		if date_format:
+			due_dates = [None if epoch is None else task.due_date.rsplit(' ', 1)[0] for task, epoch in
+			             itertools.izip(tasks, epochs)]
+		else:
+			due_dates = relative_dates.humanize(epochs, now, [task.due_zone and task.due_zone[1] for task in tasks])
+
+		columns = []
+		for task, due_date, status in itertools.izip(tasks, due_dates, relative_dates.due_statuses(epochs, now)):
+			if due_date is None:
+				columns.append('')
+			elif task.completed:
+				columns.append(due_date.ljust(20))
 			else:
-				temp_dict[key] = value
+				columns.append(renderer.paint(relative_dates.STATUS_STYLES[status], due_date.ljust(20)))
+		return columns
 
-		for key, value in sorted(temp_dict.items(), key=lambda e: e[1][1]):
-			high_dict_o[key] = value
+	def search_tasks(self, search_string, archived=False, fuzzy=False, top=None):
+		"""Search the task list for a task whose contents contains the user provided search string.
 
-		temp_dict.clear()
+		:param str search_string:    the string to search for.
+		:param bool archived:        search the archived tasks too
+		:param bool fuzzy:           display the tasks most like the search string instead, the best match first
+		:param int top:              the number of tasks a fuzzy search displays (FUZZY_TOP if not given)
+		"""
 
-		for key, value in sorted(completed_dict.items(), key=lambda e: e[1][1]):
-			if value[1] is not '':
-				completed_dict_o[key] = value
+		if fuzzy:
+			tasks = [task for score, task in fuzzy_search(self.tasklist, search_string, top or FUZZY_TOP)]
+			if tasks:
+				self.show_tasks(tasks)
 			else:
-				temp_dict[key] = value
-
-		for key, value in temp_dict.items():
-			completed_dict_o[key] = value
-
-		temp_dict.clear()
+				print('\nThere were no tasks like "{}".\n'.format(search_string))
+			return
 
-		del low_dict
-		del med_dict
-		del high_dict
-		del no_dict
-		del completed_dict
+		tasks = self.tasklist.search(search_string.lower())
+		if archived:
+			tasks = sorted(tasks + [task for task in self._archived() if task.match(search_string.lower())],
+			               key=lambda task: task.id)
+		if tasks:
+			self.show_tasks(tasks)
+		else:
+			print('\nThere were no tasks containing "{}".\n'.format(search_string))
 
-		today = arrow.now()
+	def show_tagged_tasks(self, tags, match_any=False):
+		"""Display the tasks that have all of the given tags, or any of them.
 
-# TODO: Figure out why the key is a tuple instead of a list
+		:param list tags:       the tags to look for
+		:param bool match_any:  show the tasks that have any of the tags instead of all of them
+		"""
 
-		for dict in [low_dict_o, med_dict_o, high_dict_o, no_dict_o]:
-			for key, value in dict.items():
-				dict[key] = list(dict[key])  # hack - how is this key a tuple!?!
-				if value[0] == 'L':
-					dict[key][0] = Fore.YELLOW + Style.BRIGHT + value[0].center(3) + Fore.RESET + Style.NORMAL
-				elif value[0] == 'M':
-					dict[key][0] = Fore.BLUE + Style.BRIGHT + value[0].center(3) + Fore.RESET + Style.NORMAL
-				elif value[0] == 'H':
-					dict[key][0] =  Fore.RED + Style.BRIGHT + value[0].center(3) + Fore.RESET + Style.NORMAL
-				else:
-					dict[key][0] = ''
-
-				task = self.tasklist.find_task(key)
-				if task.due_date:
-					diff = arrow.get(task.due_date, task.due_date_format) - today
-					if diff.days >= 1 and diff.seconds > 0:
-						dict[key][1] = Fore.CYAN + Style.BRIGHT + value[1] + Fore.RESET + Style.NORMAL
-					elif diff.days >= 0:
-						dict[key][1] = Fore.BLUE + Style.BRIGHT + value[1] + Fore.RESET + Style.NORMAL
-					elif diff.days <= 0:
-						dict[key][1] = Fore.RED + Style.BRIGHT + value[1] + Fore.RESET + Style.NORMAL
-
-		template = '{0:^3} {1:20} {2:^3} {3:20} {4:15} {5:20}'
-		print template.format('\nPri', 'Description', 'ID', 'Due', 'Created', 'Tags')
-		print template.format('---', '--------------------', '---', '--------------------', '---------------',
-		                      '--------------------')
-
-		if len(high_dict_o) > 0:
-			for key in high_dict_o:
-				print template.format(high_dict_o[key][0], high_dict_o[key][3], key, high_dict_o[key][1],
-				                      high_dict_o[key][2], high_dict_o[key][4])
-		if len(med_dict_o) > 0:
-			for key in med_dict_o:
-				print template.format(med_dict_o[key][0], med_dict_o[key][3], key, med_dict_o[key][1],
-				                      med_dict_o[key][2], med_dict_o[key][4])
-		if len(low_dict_o) > 0:
-			for key in low_dict_o:
-				print template.format(low_dict_o[key][0], low_dict_o[key][3], key, low_dict_o[key][1],
-				                      low_dict_o[key][2], low_dict_o[key][4])
-		if len(no_dict_o) > 0:
-			for key in no_dict_o:
-				print template.format(no_dict_o[key][0], no_dict_o[key][3], key, no_dict_o[key][1],
-				                      no_dict_o[key][2], no_dict_o[key][4])
-
-		completed_template = Fore.WHITE + Style.BRIGHT + Back.WHITE + '{0:^3} {1:20} {2:^3} {3:20} {4:15} {5:20}' + \
-		                     Fore.RESET + Style.NORMAL + Back.RESET
-		if len(completed_dict_o) > 0:
-			for key in completed_dict_o:
-				if completed_dict_o[key][0]:
-					priority = completed_dict_o[key][0]
-				else:
-					priority = ''
-				print completed_template.format(priority, completed_dict_o[key][3], key, completed_dict_o[key][1],
-				                                completed_dict_o[key][2], completed_dict_o[key][4])
-		print self.legend
+		tasks = self.tasklist.find_by_tags(' '.join(tags), match_all=not match_any)
+		if tasks:
+			self.show_tasks(tasks)
+		else:
+			print('\nThere were no tasks tagged "{}".\n'.format(('" or "' if match_any else '" and "').join(tags)))
 
-	def show_task(self, task_id):
-		"""Display the specified task, including its notes, if any.
+	def query_tasks(self, expression, explain=False):
+		"""Display the tasks that match a query expression, e.g. pri:H and due<7d and not done (see query.py).
 
-		:param str task_id: the task_id of the task.
+		:param str expression:  the query expression
+		:param bool explain:    print which index was used to find the tasks and how many tasks each step found
 		"""
 
-		task_id = self._validate_task_id(task_id)
-		if task_id:
-			task = self.tasklist.find_task(task_id)
-			if task:
-				if task.priority == 'L':
-					priority = Fore.YELLOW + Style.BRIGHT + ' ' + task.priority + ' ' + Fore.RESET + Style.NORMAL
-				elif task.priority == 'M':
-					priority = Fore.BLUE + Style.BRIGHT + ' ' + task.priority + ' ' + Fore.RESET + Style.NORMAL
-				elif task.priority == 'H':
-					priority = Fore.RED + Style.BRIGHT + ' ' + task.priority + ' ' + Fore.RESET + Style.NORMAL
-				else:
-					priority = ''
-				template = '{0:^3} {1:^3} {2:20} {3:40}'
-				print template.format('\nID', ' Pri', 'Description', 'Note')
-				print template.format('---', '---', '--------------------',
-				                      '----------------------------------------')
-				print template.format(task.id, priority, task.task, task.note)
+		plan = query.Plan(query.parse(expression), self.tasklist)
+		tasks = list(plan.tasks())
+		if explain:
+			print('\n' + '\n'.join(plan.explain(len(tasks))))
+		if tasks:
+			self.show_tasks(tasks)
+		else:
+			print('\nThere were no tasks matching "{}".\n'.format(expression))
 
-	def search_tasks(self, search_string):
-		"""Search the task list for a task whose contents contains the user provided search string.
+	def show_due_tasks(self, low=None, high=None, date_format=None):
+		"""Display the tasks that are not completed and are due in a range of time, the soonest first.
 
-		:param str search_string:    the string to search for.
+		:param int low:     a Unix timestamp, or None for no lower limit
+		:param int high:    a Unix timestamp (not included), or None for no upper limit
 		"""
 
-		tasks = self.tasklist.search(search_string.lower())
+		tasks = [task for task in self.tasklist.due_between(low, high) if not task.completed]
 		if tasks:
-			self.show_tasks(tasks)
+			self.show_tasks(tasks, date_format=date_format)
 		else:
-			print('\nThere were no tasks containing "{}".\n'.format(search_string))
+			print('\nThere are no tasks due then.\n')
 
 	def add_task(self, task, priority=None, due_date=None, tags=None, note=None):
 		"""Add a new task."""
@@ -324,7 +282,6 @@ class Functions:
 		task_id = self._validate_task_id(task_id)
 		if task_id:
 			self.tasklist.delete_task(task_id)
-			self.tasklist.renumber_tasks()
 			print('Task ' + task_id + ' was deleted.')
 
 	def modify_task(self, task_id, task_=None, completed=False, priority=None, due_date=None, note=None, tags=None, time=None):
@@ -336,41 +293,98 @@ class Functions:
 			if task:
 				print 'Modifying task ' + str(task_id) + ': ' + task.task
 				if task_:
-					task.task = task_
+					self.tasklist.modify_task(task_id, task=task_)
 				elif priority:
-					task.priority = priority
+					self.tasklist.modify_task(task_id, priority=priority)
 				elif due_date:
 					if isinstance(due_date, list):
-						task.due_date = due_date[0]
-						task.due_date_format = due_date[1]
+						self.tasklist.modify_task(task_id, due_date=due_date[0], due_date_format=due_date[1])
 					else:
-						task.due_date = due_date
+						self.tasklist.modify_task(task_id, due_date=due_date)
 				elif note:
-					task.note = note
+					self.tasklist.modify_task(task_id, note=note)
 				elif tags:
-					task.tags = tags
+					self.tasklist.modify_task(task_id, tags=tags)
 				elif time:
 					time_str = time.split(' ')[0]
 					time_hour, time_minute = time_str.split(':')
 					if 'PM' in time:
 						time_hour = int(time_hour) + 12
+					import arrow
 					due_date = arrow.get(task.due_date, task.due_date_format)
 					due_date = due_date.replace(hour=time_hour, minute=int(time_minute))
-					task.due_date = due_date.format(task.due_date_format)
+					self.tasklist.modify_task(task_id, due_date=due_date.format(task.due_date_format))
 				elif completed:
-					task.completed = True
+					self.tasklist.modify_task(task_id, completed=True)
 				print 'Modified task ' + str(task_id)
 
+	def export_tasks(self, fmt='jsonl'):
+		"""Write all of the tasks to stdout, one at a time. How long it took goes to stderr.
+
+		:param str fmt: jsonl or csv
+		"""
+
+		start = time.time()
+		try:
+			count = transfer.write(transfer.export_records(self.tasklist), sys.stdout, fmt)
+			sys.stdout.flush()
+		except IOError as e:
+			if e.errno != errno.EPIPE:
+				raise
+			return  # the reader has seen enough
+		sys.stderr.write(_throughput('Exported', count, time.time() - start) + '\n')
+
+	def import_tasks(self, in_file, task_file, fmt='jsonl'):
+		"""Add the tasks in a file, saving them as they are added.
+
+		:param in_file:   the file to read the tasks from
+		:param task_file: the task file to save them to
+		:param str fmt:   jsonl or csv
+		"""
+
+		start = time.time()
+		imported, skipped = transfer.import_tasks(self.tasklist, lambda: self.save_tasks(task_file),
+		                                          transfer.read(in_file, fmt))
+		print(_throughput('Imported', imported, time.time() - start))
+		if skipped:
+			print('Skipped {} lines that were not valid tasks.'.format(skipped))
+
+	def archive_tasks(self, older_than=0, quiet=False):
+		"""Move the completed tasks into the archive, where only show --completed and search --all look.
+
+		:param int older_than: only archive the tasks that are at least this many days old
+		:param bool quiet:     don't say how many tasks were archived
+		"""
+
+		tasks = archive.archivable(self.tasklist, older_than)
+		if tasks:
+			archive.Archive(self.task_file).append(tasks)
+			for task in tasks:
+				self.tasklist.delete_task(task.id)
+		if not quiet:
+			print('Archived {} completed tasks.'.format(len(tasks)))
+
 	def load_tasks(self, task_file):
 		"""Load the task file and retrieve the tasks."""
 
-		self.tasklist.tasks = util.load(task_file)
-		Task.last_id = len(self.tasklist.tasks)
+		self.task_file = task_file
+		self.store = storage.open_store(task_file)
+		self.tasklist = self.store.load()
+		Task.last_id = self.tasklist.last_id  # ids are never given out twice, even if the task was deleted
 
 	def save_tasks(self, task_file):
-		"""Save the task file."""
+		"""Save the changes made to the tasks. Nothing is written if the tasks were only displayed."""
+
+		if self.store is None:
+			self.load_tasks(task_file)
+		if self.tasklist.modified() and archive.Archive(task_file).check_due():
+			self.archive_tasks(archive.ARCHIVE_DAYS, quiet=True)
+		self.store.commit(self.tasklist)
+
+	def _archived(self):
+		"""Return the archived tasks, which are only read by the commands that ask for them."""
 
-		util.save(self.tasklist.tasks, task_file)
+		return archive.Archive(self.task_file).load(self.tasklist)
 
 	def _validate_task_id(self, task_id):
 		"""Validate a task id.
@@ -378,8 +392,15 @@ class Functions:
 		:return: None if an invalid ID was provided, otherwise a string containing the valid task id.
 		"""
 
-		if task_id.isdigit() and int(task_id) <= len(self.tasklist.tasks):
+		if task_id.isdigit() and self.tasklist.find_task(task_id) is not None:
 			return task_id
 		else:
 			print('{} is not an existing task!'.format(task_id))
 			return None
+
+
+def _throughput(action, count, seconds):
+	"""Describe how many tasks were handled and how fast."""
+
+	return '{} {} tasks in {:.2f} seconds ({:.0f} tasks/second)'.format(action, count, seconds,
+	                                                                    count / seconds if seconds else 0)
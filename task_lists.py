@@ -0,0 +1,125 @@
+# ------------------------------------------
+# Name:     task_lists
+# Purpose:  Named task lists, each kept in its own task file, and the views across all of them: the lists are
+#           loaded in parallel by a pool of processes and their sorted tasks merged with heapq.merge.
+#
+# Author:   Robin Siebler
+# Created:  10/18/26
+# ------------------------------------------
+__author__ = 'Robin Siebler'
+__date__ = '10/18/26'
+
+import heapq
+import itertools
+import multiprocessing
+import os
+import re
+
+import archive
+import renderer
+import storage
+from tasklist import fuzzy_search, priority_key
+
+DEFAULT = 'default'  # the list kept in the task file itself (~/tasks.tsk)
+ALL = 'all'  # every list, for the views that can show them together
+NAME = re.compile(r'^[\w-]+$')
+VIEWS = ('show', 'completed', 'priority', 'search', 'fuzzy')
+
+
+def list_file(task_file, name):
+	"""Return the task file of a list: tasks-ops.tsk for the list ops next to tasks.tsk.
+
+	:param task_file: the task file of the default list
+	"""
+
+	if name in (None, DEFAULT):
+		return task_file
+	base, extension = os.path.splitext(task_file)
+	return '{}-{}{}'.format(base, name, extension)
+
+
+def list_names(task_file):
+	"""Return the names of the lists that have a task file (or a journal) next to task_file, sorted.
+
+	:param task_file: the task file of the default list
+	"""
+
+	directory = os.path.dirname(task_file) or '.'
+	base, extension = os.path.splitext(os.path.basename(task_file))
+	pattern = re.compile(r'^{}(?:-([\w-]+))?{}(?:\.journal(?:\.old)?)?$'.format(re.escape(base),
+	                                                                          re.escape(extension)))
+	names = set()
+	for file_name in os.listdir(directory):
+		match = pattern.match(file_name)
+		if match:
+			names.add(match.group(1) or DEFAULT)
+	return sorted(name for name in names if storage.exists(list_file(task_file, name)))
+
+
+def load_view(job):
+	"""Load one list and return its tasks in the order of a view, each one decorated with its sort key and the
+	number of the list (so that tasks with the same key never get compared). Run by the pool's processes.
+
+	:param job: the number of the list, its name, its task file, the view and the view's argument: the number of
+	            tasks for priority (None for all of them), the search string and whether to search the archive
+	            too for search, and the search string and the number of tasks for fuzzy
+	"""
+
+	number, name, task_file, view, argument = job
+	tasklist = storage.open_store(task_file).load()
+	if view == 'priority':
+		tasks = [(priority_key(task), number, task) for task in tasklist.by_priority(argument)]
+	elif view == 'fuzzy':
+		tasks = [((-score, task.id), number, task) for score, task in fuzzy_search(tasklist, *argument)]
+	else:
+		if view == 'completed':
+			tasks = [task for task in tasklist if task.completed] + archive.Archive(task_file).load(tasklist)
+		elif view == 'search':
+			search_string, archived = argument
+			search_string = search_string.lower()
+			tasks = tasklist.search(search_string)
+			if archived:
+				tasks += [task for task in archive.Archive(task_file).load(tasklist) if task.match(search_string)]
+		else:
+			tasks = tasklist
+		tasks = sorted((task.id, number, task) for task in tasks)
+	for key, number, task in tasks:
+		task.task = '{}: {}'.format(name, task.task)  # nothing is saved, so this only changes what is shown
+	return tasks
+
+
+class MergedLists:
+	"""The tasks of several lists in the order of a view, standing in for a TaskList in Functions' views:
+	page() for the ID order views and by_priority() for the priority view."""
+
+	def __init__(self, task_file, names, view, argument=None):
+		"""Load the lists, in parallel if there is more than one.
+
+		:param task_file: the task file of the default list
+		:param names:     the names of the lists
+		:param view:      one of VIEWS
+		:param argument:  the argument of the view, see load_view()
+		"""
+
+		jobs = [(number, name, list_file(task_file, name), view, argument) for number, name in enumerate(names)]
+		if len(jobs) > 1:
+			pool = multiprocessing.Pool(min(len(jobs), multiprocessing.cpu_count()))
+			try:
+				self.streams = pool.map(load_view, jobs)
+			finally:
+				pool.close()
+				pool.join()
+		else:
+			self.streams = [load_view(job) for job in jobs]
+
+	def __len__(self):
+		return sum(len(stream) for stream in self.streams)
+
+	def __iter__(self):
+		return (entry[-1] for entry in heapq.merge(*self.streams))
+
+	def page(self, offset=None, limit=None):
+		return renderer.page(iter(self), offset, limit)
+
+	def by_priority(self, top=None):
+		return itertools.islice(self, top)
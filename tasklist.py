@@ -8,10 +8,269 @@
 __author__ = 'Robin Siebler'
 __date__ = '7/14/13'
 
-import arrow
+import copy
+import heapq
+import itertools
+import re
+import sys
+import time
 
+from indexes import WORD, DueIndex, FieldIndex, FuzzyIndex, TagIndex, TokenIndex
 
-class Task:
+PRIORITY_RANK = {'H': 0, 'M': 1, 'L': 2}  # the order of the priorities in the priority view
+# the priority of each priority code (Task.priority_code), which is also its rank in the priority view
+PRIORITIES = tuple(sorted(PRIORITY_RANK, key=PRIORITY_RANK.get)) + (None,)
+NO_PRIORITY = len(PRIORITY_RANK)
+CREATION_DATE_FORMAT = 'MM/DD/YYYY h:mm:ss A ZZ'
+
+# the due dates (M/D/YY, MM-DD-YYYY, MM.DD.YY, ...) and times (h:mm AM/PM) a user can give
+DATE_PATTERN = re.compile(r'^(1[0-2]|0?[1-9])(?P<Sep>(/|-|.))(3[01]|[12][0-9]|0?[1-9])(?P=Sep)(?:[0-9]{2})?[0-9]{2}$')
+TIME_PATTERN = re.compile(r'^ *(1[0-2]|[1-9]):[0-5][0-9] *(a|p|A|P)(m|M) *$')
+
+
+def timestamp(date, date_format):
+	"""Parse a date string into a Unix timestamp.
+
+	:return: the timestamp, or None if there is no date
+	"""
+
+	if date:
+		import arrow
+		return arrow.get(date, date_format).timestamp
+	return None
+
+
+def parse_due_date(due_date, due_time=None):
+	"""Parse a due date given by the user.
+
+	:param due_date: a date that matches DATE_PATTERN
+	:param due_time: a time that matches TIME_PATTERN, or None for 11:59 PM
+	:return: an Arrow object for the due date and the format to store it in
+	"""
+
+	import arrow
+
+	# figure out what format the user provided...
+	if '/' in due_date:
+		date_sep = '/'
+	elif '-' in due_date:
+		date_sep = '-'
+	elif '.' in due_date:
+		date_sep = '.'
+	date = due_date.split(date_sep)
+
+	if len(date[0]) == 1:
+		month_format = 'M'
+	else:
+		month_format = 'MM'
+
+	if len(date[1]) == 1:
+		day_format = 'D'
+	else:
+		day_format = 'DD'
+
+	if len(date[2]) == 2:
+		year_format = 'YY'
+	else:
+		year_format = 'YYYY'
+
+	# get the time zone
+	# offset = time.strftime('%z', time.localtime()) <--- This doesn't work on windows
+	offset = ("-" if time.timezone > 0 else "+") + time.strftime("%H:%M", time.gmtime(abs(time.timezone)))
+	# parse the date
+	date_format = date_sep.join([month_format, day_format, year_format])
+	date_format = date_format + ' h:mm A Z'
+	if due_time:
+		# parse the date to make sure it is in the correct format:
+		dtime = due_time[:-2].strip()
+		period = due_time[-2:]
+		dtime = dtime + ' ' + period + ' ' + str(offset)
+		date = due_date + ' ' + dtime
+	else:
+		date = due_date + ' 11:59 PM ' + offset
+	return arrow.get(date, date_format), date_format
+
+
+NO_DUE_DATE = float('inf')  # sorts tasks without a due date after the ones that have one
+
+
+def priority_key(task):
+	"""Sort key for the priority view: open tasks by priority and then by due date, completed tasks last.
+
+	:param task: a Task object
+	:return: a tuple of (completed, priority rank, due timestamp, id)
+	"""
+
+	due = task.due_epoch
+	if due is None:
+		due = NO_DUE_DATE
+	if task.completed:
+		return True, 0, due, task.id
+	return False, task.priority_code, due, task.id
+
+
+def identity_key(task):
+	"""Return what tells a task apart from the others when its id can't be relied on: when it was created and
+	what it says."""
+
+	return task.created_epoch, task.task
+
+
+def sort_by_priority(tasks, top=None):
+	"""Sort tasks into the order of the priority view.
+
+	:param tasks: an iterable of Task objects
+	:param top:   only return this many tasks from the top of the order, without sorting the rest
+	:return: task list
+	"""
+
+	if top is None:
+		return sorted(tasks, key=priority_key)
+	return heapq.nsmallest(top, tasks, key=priority_key)
+
+
+def fuzzy_search(tasks, search_string, top=None):
+	"""Return the tasks most like a search string and their scores, the best match first (see
+	TaskList.fuzzy_search()).
+
+	:param tasks: a TaskList, or any other iterable of Task objects, which is indexed just for this search
+	"""
+
+	if not isinstance(tasks, TaskList):
+		tasks = TaskList(list(tasks))
+	return tasks.fuzzy_search(search_string, top)
+
+
+def parse_tags(tags):
+	"""Turn the tags given by the user into a set of lowercase tags.
+
+	:param tags: a string of tags separated by spaces and/or commas, or an already parsed set of tags
+	:return: a frozenset of tags
+	"""
+
+	if isinstance(tags, (set, frozenset)):
+		return frozenset(tags)
+	return frozenset(re.split(r'[\s,]+', tags.lower().strip(' ,'))) - frozenset(['']) if tags else frozenset()
+
+
+def format_tags(tags):
+	"""Turn a set of tags into a string for display."""
+
+	return ' '.join(sorted(tags))
+
+
+UTC_OFFSET = re.compile(r'([+-])(\d\d):?(\d\d)$')
+DATE_TOKEN = re.compile(r'YYYY|YY|MM|M|DD|D|h|mm|ss|A|ZZ|Z')
+
+_zones = {}  # every (date format, UTC offset) pair in use, so the tasks that share one share a single tuple
+
+
+def _zone(date_format, offset):
+	"""Return the shared (date format, UTC offset in seconds) tuple."""
+
+	zone = date_format, offset
+	return _zones.setdefault(zone, zone)
+
+
+def _utc_offset(date):
+	"""Return the UTC offset (in seconds) at the end of a date string, such as -0800 or -07:00."""
+
+	match = UTC_OFFSET.search(date)
+	if not match:
+		return 0
+	sign, hours, minutes = match.groups()
+	offset = int(hours) * 60 * 60 + int(minutes) * 60
+	return -offset if sign == '-' else offset
+
+
+def _parse_date(date, date_format, epoch=None):
+	"""Return the timestamp and zone of a date string, or None and None if there is no date.
+
+	:param epoch: the timestamp of the date, if it is already known
+	"""
+
+	if not date:
+		return None, None
+	if epoch is None:
+		epoch = timestamp(date, date_format)
+	return epoch, _zone(date_format, _utc_offset(date))
+
+
+def format_date(epoch, zone):
+	"""Turn a timestamp back into the date string it was parsed from, the way arrow would format it.
+
+	Only the tokens used by CREATION_DATE_FORMAT and parse_due_date() are understood.
+
+	:param epoch: a Unix timestamp
+	:param zone:  the (date format, UTC offset) tuple of the date
+	"""
+
+	date_format, offset = zone
+	date = time.gmtime(epoch + offset)
+	hours, minutes = divmod(abs(offset) // 60, 60)
+	sign = '-' if offset < 0 else '+'
+	values = {
+		'YYYY': '{:04d}'.format(date.tm_year),
+		'YY': '{:04d}'.format(date.tm_year)[2:],
+		'MM': '{:02d}'.format(date.tm_mon),
+		'M': str(date.tm_mon),
+		'DD': '{:02d}'.format(date.tm_mday),
+		'D': str(date.tm_mday),
+		'h': str(date.tm_hour % 12 or 12),
+		'mm': '{:02d}'.format(date.tm_min),
+		'ss': '{:02d}'.format(date.tm_sec),
+		'A': 'AM' if date.tm_hour < 12 else 'PM',
+		'ZZ': '{}{:02d}:{:02d}'.format(sign, hours, minutes),
+		'Z': '{}{:02d}{:02d}'.format(sign, hours, minutes),
+	}
+	return DATE_TOKEN.sub(lambda token: values[token.group()], date_format)
+
+
+def find_class(module, name):
+	"""Look up a global for the unpickler.
+
+	Tasks pickled while Task was an old-style class are made by calling the class with no arguments and then
+	filled in with Task.__setstate__(), so Task is swapped for a function that makes an empty Task.
+	"""
+
+	if module == 'tasklist' and name == 'Task':
+		return _empty_task
+	__import__(module)
+	return getattr(sys.modules[module], name)
+
+
+def _empty_task():
+	return Task.__new__(Task)
+
+
+def _task(task_id, task, priority_code, tags, note, completed, created_epoch, created_zone, due_epoch, due_zone):
+	"""Unpickle a Task (see Task.__reduce__)."""
+
+	self = Task.__new__(Task)
+	self.id = task_id
+	self.task = task
+	self.priority_code = priority_code
+	self.tags = frozenset(tags)
+	self.note = note
+	self.completed = completed
+	self.created_epoch = created_epoch
+	self.created_zone = created_zone and _zone(*created_zone)
+	self.due_epoch = due_epoch
+	self.due_zone = due_zone and _zone(*due_zone)
+	return self
+
+
+class Task(object):
+	"""A task.
+
+	Every task has the same few slots instead of an instance dict. The priority is kept as its code (its index
+	in PRIORITIES) and the dates as timestamps plus a (date format, UTC offset) tuple shared with the other
+	tasks that use the same one; priority, creation_date, due_date and due_date_format turn them back into the
+	strings they were made from when they are asked for.
+	"""
+
+	__slots__ = ('id', 'task', 'priority_code', 'tags', 'note', 'completed', 'created_epoch', 'created_zone',
+	             'due_epoch', 'due_zone')
 	last_id = 0
 
 	def __init__(self, task, priority, due_date, tags, note):
@@ -25,19 +284,96 @@ class Task:
 
 		self.task = task
 		self.priority = priority
-		self.tags = tags
+		self.tags = parse_tags(tags)
 		self.note = note
 		self.completed = False
-		self.creation_date = arrow.now().format('MM/DD/YYYY h:mm:ss A ZZ')
+		import arrow
+		now = arrow.now()
+		self.created_epoch = now.timestamp
+		self.created_zone = _zone(CREATION_DATE_FORMAT, int(now.utcoffset().total_seconds()))
 		if due_date:
-			self.due_date = due_date[0]
-			self.due_date_format = due_date[1]
+			self.set_due_date(due_date[0], due_date[1])
 		else:
-			self.due_date = None
+			self.set_due_date(None, None)
 		Task.last_id += 1
 		self.id = Task.last_id
 		print 'Created task ' + str(self.id)
 
+	@classmethod
+	def restore(cls, **fields):
+		"""Recreate a stored task without giving it a new id.
+
+		:param fields: the attributes of the task as strings, the way they were kept before Task had slots:
+		               creation_date, due_date and due_date_format, with created_epoch and due_epoch if they
+		               are known
+		:return: a Task object
+		"""
+
+		task = cls.__new__(cls)
+		task.__setstate__(fields)
+		return task
+
+	def __setstate__(self, state):
+		# the __dict__ of a task pickled before Task had slots, or the fields given to restore()
+		self.id = state['id']
+		self.task = state['task']
+		self.priority = state.get('priority')
+		self.tags = parse_tags(state.get('tags'))  # saved as a single string before tags were a set
+		self.note = state.get('note')
+		self.completed = bool(state.get('completed'))
+		self.created_epoch, self.created_zone = _parse_date(state.get('creation_date'), CREATION_DATE_FORMAT,
+		                                                    state.get('created_epoch'))
+		self.set_due_date(state.get('due_date'), state.get('due_date_format'), state.get('due_epoch'))
+
+	def __reduce__(self):
+		return _task, (self.id, self.task, self.priority_code, tuple(self.tags), self.note, self.completed,
+		               self.created_epoch, self.created_zone, self.due_epoch, self.due_zone)
+
+	@property
+	def priority(self):
+		return PRIORITIES[self.priority_code]
+
+	@priority.setter
+	def priority(self, priority):
+		self.priority_code = PRIORITY_RANK.get(priority, NO_PRIORITY)
+
+	@property
+	def creation_date(self):
+		if self.created_zone is None:
+			return None
+		return format_date(self.created_epoch, self.created_zone)
+
+	@property
+	def due_date(self):
+		if self.due_zone is None:
+			return None
+		return format_date(self.due_epoch, self.due_zone)
+
+	@property
+	def due_date_format(self):
+		if self.due_zone is None:
+			return None
+		return self.due_zone[0]
+
+	def set_due_date(self, due_date, due_date_format, due_epoch=None):
+		"""Change the due date.
+
+		:param due_date:        the due date as a string, or None for no due date
+		:param due_date_format: the format of the string
+		:param due_epoch:       the timestamp of the due date, if it is already known
+		"""
+
+		self.due_epoch, self.due_zone = _parse_date(due_date, due_date_format, due_epoch)
+
+	def update(self, **fields):
+		"""Change the given attributes. A new due_date is read with the new due_date_format, if there is one."""
+
+		for name, value in fields.items():
+			if name not in ('due_date', 'due_date_format'):
+				setattr(self, name, value)
+		if 'due_date' in fields:
+			self.set_due_date(fields['due_date'], fields.get('due_date_format', self.due_date_format))
+
 	def match(self, search_string):
 		"""Return a list of tasks where search_string is found in either the task or tags.
 
@@ -50,15 +386,71 @@ class Task:
 		if self.note:
 			result2 = search_string in self.note.lower()
 		if self.tags:
-			result3 = search_string in self.tags.lower()
+			result3 = search_string in format_tags(self.tags)
 
 		return result1 or result2 or result3
 
 
 class TaskList:
-	def __init__(self):
+	"""The tasks, in ID order.
+
+	Task ids are never reused: last_id (the highest id ever given out) is saved with the tasks, and a deleted
+	task leaves None behind in tasks instead of being taken out of the list, so a delete doesn't have to move
+	the tasks after it. The Nones are swept out once there are more of them than tasks, and whenever the list
+	is saved to a snapshot.
+	"""
+
+	SNAPSHOT_VERSION = 7  # bump when a snapshot written by an older version has to be rebuilt
+	COMPACT_MIN = 64  # the deleted tasks are never swept out of a list while there are fewer than this
+	INDEXES = ('token_index', 'tag_index', 'priority_index', 'completed_index', 'due_index',
+	           'fuzzy_index')  # saved with the tasks
+	FIELD_WEIGHTS = (('titles', 3), ('tags', 2))  # what a fuzzy match counts for, a match in a note counts 1
+
+	def __init__(self, tasks=None):
+
+		self.tasks = tasks or []
+		self.deleted = 0  # the number of Nones in tasks
+		self.last_id = max(task.id for task in self.tasks) if self.tasks else 0
+		self.changes = []  # journal records that have not been saved yet
+		self._reindex()
+		self._build_indexes()
+
+	def __getstate__(self):
+		state = self.__dict__.copy()
+		del state['changes']
+		del state['_positions']
+		if self.deleted:
+			state['tasks'], state['deleted'] = list(self), 0
+		return state
+
+	def __setstate__(self, state):
+		self.__dict__.update(state)
+		self.changes = []
+		if 'deleted' not in state:
+			# snapshots saved before task ids were kept for good
+			self.deleted = 0
+			self.last_id = max(task.id for task in self.tasks) if self.tasks else 0
+		self._reindex()
+		if any(name not in state for name in self.INDEXES):
+			self._build_indexes()
+
+	def __len__(self):
+		return len(self._positions)
+
+	def __iter__(self):
+		if self.deleted:
+			return itertools.ifilter(None, self.tasks)
+		return iter(self.tasks)
 
-		self.tasks = []
+	def page(self, offset=None, limit=None):
+		"""Return the tasks in ID order, skipping offset tasks and stopping after limit tasks.
+
+		:param offset: the number of tasks to skip
+		:param limit:  the number of tasks to return
+		"""
+
+		start = offset or 0
+		return itertools.islice(iter(self), start, None if limit is None else start + limit)
 
 	def add_task(self, task, priority='', due_date=None, tags=None, note=None):
 		"""Add a new task to the task list.
@@ -69,7 +461,9 @@ class TaskList:
 		:param note:        a lengthier description of the task
 		"""
 
-		self.tasks.append(Task(task, priority, due_date, tags, note))
+		task = Task(task, priority, due_date, tags, note)
+		self._insert(task)
+		self.changes.append(('add', copy.copy(task)))  # as it is now, not as it is when it gets saved
 
 	def delete_task(self, task_id):
 		"""Delete the given task.
@@ -77,9 +471,36 @@ class TaskList:
 		:param task_id: id of the task to delete
 		"""
 
+		position = self._position(task_id)
+		if position is not None:
+			task = self.tasks[position]
+			self.tasks[position] = None
+			del self._positions[task.id]
+			self.deleted += 1
+			for index in self._indexes():
+				index.remove(task)
+			self.changes.append(('delete', task.id, identity_key(task)))
+			if self.deleted > max(len(self._positions), self.COMPACT_MIN):
+				self._compact()
+
+	def modify_task(self, task_id, **fields):
+		"""Update the given fields of a task.
+
+		:param task_id: id of the task to modify
+		:param fields:  the attributes to change and their new values
+		"""
+
 		task = self.find_task(task_id)
 		if task:
-			self.tasks.remove(task)
+			if 'tags' in fields:
+				fields = dict(fields, tags=parse_tags(fields['tags']))
+			key = identity_key(task)
+			for index in self._indexes():
+				index.remove(task)
+			task.update(**fields)
+			for index in self._indexes():
+				index.add(task)
+			self.changes.append(('modify', task.id, fields, key))
 
 	def search(self, search_string):
 		"""Return all task that match the given search string
@@ -88,29 +509,265 @@ class TaskList:
 		:return: task list
 		"""
 
-		return [task for task in self.tasks if task.match(search_string)]
+		candidates = self.token_index.candidates(search_string)
+		if candidates is None:
+			return [task for task in self if task.match(search_string)]
+
+		ids, exact = candidates
+		tasks = [self.tasks[self._positions[task_id]] for task_id in sorted(ids)]
+		if exact:
+			return tasks
+		return [task for task in tasks if task.match(search_string)]
+
+	def fuzzy_search(self, search_string, top=None):
+		"""Return the tasks most like a search string, the best match first, looking past misspellings.
+
+		Each word of the search string is matched with the words in the tasks that share enough of its trigrams
+		(see FuzzyIndex). A task scores how alike its best match for each word is, times FIELD_WEIGHTS for
+		where the match is, so that the tasks that match more of the words, more closely, in their descriptions
+		come first.
+
+		:param top: only return this many tasks
+		:return: a list of (score, Task) pairs
+		"""
+
+		scores = {}
+		for word in set(WORD.findall(search_string.lower())):
+			best = {}  # task id -> its best match for this word
+			for similar, similarity in self.fuzzy_index.similar(word).iteritems():
+				for task_id in self.token_index.postings.get(similar, ()):
+					if best.get(task_id, 0) < similarity:
+						best[task_id] = similarity
+				for name, weight in self.FIELD_WEIGHTS:
+					score = similarity * weight
+					for task_id in getattr(self.fuzzy_index, name).get(similar, ()):
+						if best[task_id] < score:
+							best[task_id] = score
+			for task_id, score in best.iteritems():
+				scores[task_id] = scores.get(task_id, 0) + score
+
+		key = lambda item: (-item[1], item[0])
+		if top is None:
+			ranked = sorted(scores.iteritems(), key=key)
+		else:
+			ranked = heapq.nsmallest(top, scores.iteritems(), key=key)
+		return [(score, self.tasks[self._positions[task_id]]) for task_id, score in ranked]
+
+	def insert_tasks(self, tasks):
+		"""Add tasks that were made elsewhere (imported ones), keeping their ids.
+
+		:param tasks: an iterable of Task objects
+		"""
+
+		for task in tasks:
+			self._insert(task)
+			self.changes.append(('add', copy.copy(task)))
+
+	def find_by_tags(self, tags, match_all=True):
+		"""Return the tasks that have all (or any) of the given tags.
+
+		:param tags:      the tags to look for
+		:param match_all: if True the tasks need every tag, otherwise any one of them
+		:return: task list
+		"""
+
+		return [self.tasks[self._positions[task_id]]
+		        for task_id in sorted(self.tag_index.find(parse_tags(tags), match_all))]
+
+	def by_priority(self, top=None):
+		"""Return the tasks in the order of the priority view.
+
+		:param top: only return this many tasks from the top of the order
+		:return: task list
+		"""
+
+		return sort_by_priority(self, top)
+
+	def candidates(self, field, value):
+		"""Look up the tasks that might match a query term in an index (see query.py).
+
+		:param field: priority (value: a list of priority codes), completed (True or False), tag (a tag),
+		              text (a lowercase search string) or due (a (low, high) range of timestamps, see due_between())
+		:return: a set of the ids of the tasks that might match, or None if there is no index for it
+		"""
+
+		if field == 'priority':
+			return self.priority_index.find(value)
+		if field == 'completed':
+			return self.completed_index.find([value])
+		if field == 'tag':
+			return self.tag_index.find([value])
+		if field == 'text':
+			candidates = self.token_index.candidates(value)
+			return None if candidates is None else candidates[0]
+		if field == 'due':
+			return set(self.due_index.find(*value))
+		return None
+
+	def due_between(self, low=None, high=None):
+		"""Return the tasks due at or after low and before high, in due date order.
+
+		:param low:  a Unix timestamp, or None for no lower limit
+		:param high: a Unix timestamp, or None for no upper limit
+		:return: task list
+		"""
+
+		return [self.tasks[self._positions[task_id]] for task_id in self.due_index.find(low, high)]
 
 	def find_task(self, task_id):
 		"""Find a task by task.id
 
-		:param task_id: The task.id for the task to find.
+		:param task_id: The task.id for the task to find, as an int or a string.
 		:return: a task object if found, otherwise None
 		"""
-		for task in self.tasks:
-			if str(task.id) == str(task_id):
-				return task
-		return None
+
+		position = self._position(task_id)
+		if position is None:
+			return None
+		return self.tasks[position]
 
 	def renumber_tasks(self):
-		"""Renumber all of the tasks. Useful when a task is deleted."""
+		"""Number the tasks from 1 again, giving out the ids of the deleted tasks again.
+
+		Deleting a task no longer does this; it is kept to replay the journals written when it did.
+		"""
+
+		self._compact()
+		if self.tasks:
+			new_ids = {}
+			for new_id, task in enumerate(self.tasks, 1):
+				new_ids[task.id] = new_id
+				task.id = new_id
+			self._reindex()
+			for index in self._indexes():
+				index.renumber(new_ids)
+			self.changes.append(('renumber',))
+		self.last_id = Task.last_id = len(self.tasks)  # new tasks carry on from the last task
+
+	def apply(self, change):
+		"""Replay a change recorded by one of the methods above, without recording it again.
+
+		:param change: a tuple of the operation name followed by its arguments
+		"""
+
+		pending = len(self.changes)
+		op = change[0]
+		if op == 'add':
+			self._insert(change[1])
+		elif op == 'delete':
+			self.delete_task(change[1])
+		elif op == 'modify':
+			self.modify_task(change[1], **change[2])
+		elif op == 'renumber':
+			self.renumber_tasks()
+		del self.changes[pending:]
+
+	def merge(self, changes):
+		"""Make the changes made to an older copy of the task list, which another process has changed since.
+
+		The tasks are found by identity_key() rather than by id, since a process running an older version may
+		have renumbered them. Added tasks get the next unused ids; a change to a task that has been deleted is
+		dropped.
+
+		:param changes: the changes returned by pop_changes() on the older copy
+		:return: the changes as they were made to this task list
+		"""
+
+		for change in changes:
+			op = change[0]
+			if op == 'add':
+				task = copy.copy(change[1])
+				task.id = self.last_id + 1
+				self.insert_tasks([task])
+			elif op == 'renumber':
+				self.renumber_tasks()
+			else:
+				task = self._find_same(change[1], change[-1])
+				if task and op == 'delete':
+					self.delete_task(task.id)
+				elif task:
+					self.modify_task(task.id, **change[2])
+		Task.last_id = self.last_id
+		return self.pop_changes()
+
+	def replace_with(self, tasklist):
+		"""Take over the tasks, indexes and unsaved changes of another TaskList."""
+
+		self.__dict__.update(tasklist.__dict__)
+
+	def modified(self):
+		"""Return True if there are changes that have not been saved yet."""
+
+		return bool(self.changes)
+
+	def pop_changes(self):
+		"""Return the unsaved changes and forget them."""
+
+		changes, self.changes = self.changes, []
+		return changes
+
+	def _find_same(self, task_id, key):
+		"""Return the task that was task_id when it had the given identity_key(), or None if it is gone.
+
+		It has to have been made at the same time and either say the same thing or still have the same id, so
+		a task made in the same second as others (by a batch or an import) is not mistaken for one of them.
+		"""
+
+		position = self._positions.get(task_id)
+		task = None if position is None else self.tasks[position]
+		if task and identity_key(task) == key:
+			return task
+		created_epoch, text = key
+		candidates = [task for task in self
+		              if task.created_epoch == created_epoch and (task.task == text or task.id == task_id)]
+		candidates.sort(key=lambda task: (task.task != text, task.id != task_id))
+		return candidates[0] if candidates else None
+
+	def _insert(self, task):
+		self._positions[task.id] = len(self.tasks)
+		self.tasks.append(task)
+		if task.id > self.last_id:
+			self.last_id = task.id
+		for index in self._indexes():
+			index.add(task)
+
+	def _position(self, task_id):
+		"""Return where the task with the given id (an int or a string) is in tasks, or None if there is none."""
+
+		try:
+			return self._positions.get(int(task_id))
+		except ValueError:
+			return None
+
+	def _compact(self):
+		"""Sweep the deleted tasks out of tasks."""
+
+		if self.deleted:
+			self.tasks = list(self)
+			self.deleted = 0
+			self._reindex()
+
+	def _reindex(self):
+		"""Rebuild the id -> position in tasks index."""
+
+		self._positions = dict((task.id, position) for position, task in enumerate(self.tasks) if task is not None)
+
+	def _build_indexes(self):
+		"""Build the indexes that are saved with the task list."""
 
-		if len(self.tasks) > 0:
-			global last_id
-			last_id = 1
+		self.token_index = TokenIndex()
+		self.tag_index = TagIndex()
+		self.priority_index = FieldIndex('priority_code')
+		self.completed_index = FieldIndex('completed')
+		self.due_index = DueIndex(self)
+		self.fuzzy_index = FuzzyIndex()
+		indexes = [index for index in self._indexes() if index is not self.due_index]
+		for task in self:
+			for index in indexes:
+				index.add(task)
 
-			for task in self.tasks:
-				task.id = last_id
-				last_id += 1
+	def _indexes(self):
+		return [getattr(self, name) for name in self.INDEXES]
 
 
 if __name__ == '__main__':
@@ -8,20 +8,56 @@
 # ------------------------------------------
 
 """
-Usage: tasks.py priority [-a]
-	   tasks.py delete <Task_ID>
-	   tasks.py display <Task_ID>
-	   tasks.py search <Search_String>
-	   tasks.py modify <Task_ID> ([<Task>] | [-c] | [-p <Priority>] | [-d=<Due_Date> --time=<Time_Due>] | [-n <Note>] | [-t <Tags>])
-	   tasks.py [<Task>] [-a] ([-p <Priority>] [-d=<Due_Date> --time=<Time_Due>] [-n <Note>] [-t <Tags>])
+Usage: tasks.py show [-a] [--completed] [--offset=<N>] [--limit=<N>] [--pager] [--list=<Name>]
+	   tasks.py priority [-a] [--top=<N>] [--offset=<N>] [--limit=<N>] [--pager] [--list=<Name>]
+	   tasks.py delete <Task_ID> [--list=<Name>]
+	   tasks.py display <Task_ID> [--list=<Name>]
+	   tasks.py search <Search_String> [--all | --fuzzy [--top=<N>]] [--list=<Name>]
+	   tasks.py query <Expression> [--explain] [--list=<Name>]
+	   tasks.py due (--within=<Duration> | --overdue | --between <Start> <End>) [-a] [--list=<Name>]
+	   tasks.py tag <Tag>... [--any | --all] [--list=<Name>]
+	   tasks.py serve [--stop] [--list=<Name>]
+	   tasks.py remind [--ahead=<Duration>] [--exec=<Command>] [--list=<Name>]
+	   tasks.py batch <File> [--list=<Name>]
+	   tasks.py archive [--older-than=<Days>] [--list=<Name>]
+	   tasks.py export [--format=<Format>] [--list=<Name>]
+	   tasks.py import <File> [--format=<Format>] [--list=<Name>]
+	   tasks.py modify <Task_ID> ([<Task>] | [-c] | [-p <Priority>] | [-d=<Due_Date> --time=<Time_Due>] | [-n <Note>] | [-t <Tags>]) [--list=<Name>]
+	   tasks.py [<Task>] [-a] ([-p <Priority>] [-d=<Due_Date> --time=<Time_Due>] [-n <Note>] [-t <Tags>]) [--list=<Name>]
 
 	Commands:
-		delete <Task_ID>        Delete a Task
+		archive                 Move the completed Tasks into the archive (~/tasks.archive), where only show
+		                        --completed and search --all look for them. Completed Tasks are archived once
+		                        they are 30 days old anyway, counting from the due date (or the creation date).
+		batch <File>            Run the commands in a file (- for stdin), one per line, without the "tasks.py".
+		                        Every line is checked before any of them is run.
+		delete <Task_ID>        Delete a Task. Task IDs never change: the other Tasks keep theirs, and the ID of
+		                        a deleted Task is not given to another one.
 		display <Task_ID>       Display the note for a Task. This allows you to add more info to a task
+		due                     Display the Tasks that are not completed and are due in the next <Duration> (a
+		                        number of h, d or w, e.g. 3d), are overdue, or are due between two dates (each
+		                        one M/D/YY like -d, or a duration from now), the soonest first
+		export                  Write all of the Tasks to stdout as JSON lines (the default) or CSV
+		import <File>           Add the Tasks in a JSON lines or CSV file (- for stdin) written by export or by
+		                        hand: only "task" is required, "due_date" and "time" are given like -d and --time.
+		                        The Tasks get new IDs after the existing ones.
 		modify <Task_ID>        The Task to modify followed by the updated information
 		priority                Display the Tasks in priority order
+		query <Expression>      Display the Tasks that match an expression like "pri:H and due<7d and not done".
+		                        Terms: pri:H,M (or pri:none), done, tag:<Tag>, due<7d (<, <=, >, >= a number of
+		                        h, d or w from now; due:none), text:<Word>, a bare word or a "quoted phrase".
+		                        Join them with and (or just a space), or and not, and group them with ( ).
+		remind                  Print a line for each Task that is not completed when its due date comes, or run
+		                        a command (--exec) for it, until stopped. Changes made by the other commands are
+		                        picked up while it runs.
+		serve                   Keep the Tasks in memory and run the commands given to tasks.py until stopped
+		show                    Display the Tasks in ID order (the same as running tasks.py without a command)
 		search <Search-string>  Search all the tasks for a given work or phrase. If the phrase contains
-								spaces, it must be enclosed in double quotes.
+								spaces, it must be enclosed in double quotes. With --all, search the archive too.
+		                        With --fuzzy, display the Tasks most like it instead, misspellings and all, the
+		                        best match first: a match in the description counts for more than one in the
+		                        tags, and one in the tags for more than one in the note.
+		tag <Tag>...            Display the Tasks that have all of the given tags (or any of them, with --any)
 
     Arguments:
         Task                    The task to add (Only 20 chars will be displayed)
@@ -29,34 +65,71 @@ Usage: tasks.py priority [-a]
     Options:
         -h --help               Show this screen.
         -a                      Display absolute dates
+        --ahead <Duration>      Remind of each Task this long (e.g. 1h) before it is due
+        --all                   tag: Display the Tasks that have all of the given tags (the default)
+                                search: Search the archived Tasks too
+        --any                   Display the Tasks that have any of the given tags
+        --between               Display the Tasks due from the start of <Start> to the end of <End>
         -c                      Mark a task as completed
+        --completed             Display the completed Tasks, archived ones included
+        --explain               Print which index the query used and how many Tasks each step found
         -d <Due_Date>           Date the task is due (Ex: M/D/YY, MM-DD-YYYY, MM.DD.YY)
+        --exec <Command>        A shell command to run for each reminder, with the Task in the TASK_ID, TASK,
+                                TASK_DUE and TASK_PRIORITY environment variables
+        --format <Format>       jsonl or csv. import uses csv for a .csv file unless it is given
+        --fuzzy                 search: Rank the Tasks by how much they look like the search string
+        --limit <N>             Only display N Tasks
+        --list <Name>           The task list to use, kept in ~/tasks-<Name>.tsk (default: ~/tasks.tsk). show,
+                                priority and search take --list=all to look at every list at once
         -n <Note>               A lengthier description of the task
+        --older-than <Days>     Only archive the Tasks that are at least this many days old
+        --overdue               Display the Tasks whose due date has passed
+        --offset <N>            Skip the first N Tasks
         -p <Priority>           Priority - L, M, H (Low, Medium or High)
-        -t <Tags>               Words you want to associate with this task
+        --pager                 Send the output to $PAGER (less -R if it isn't set)
+        --stop                  Stop the running serve command, saving its changes
+        -t <Tags>               Words you want to associate with this task, separated by spaces or commas
         --time <Time_Due>       Time the Task is due in the format h:mm AM/PM
+        --top <N>               Only display the N most urgent Tasks (search --fuzzy: the N best matches,
+                                20 by default)
+        --within <Duration>     Display the Tasks due in the next <Duration>
 
     Note: The Task, the Note and any Tags need to be in double quotes if they contain spaces.
+
+    Each task list has its own task file, archive and IDs, and a command given a list never reads the others.
+
+    Set TASKS_BACKEND=sqlite to keep the tasks in ~/tasks.db instead of ~/tasks.tsk. The first time it is
+    used, the tasks in ~/tasks.tsk are copied into the database. Set TASKS_BACKEND=columnar to keep them in
+    ~/tasks.tcol, a file of columns that opens without reading the tasks, for very long task lists.
+
+    Add --profile to any command (or set TASKS_TRACE=1) to print how long each phase of it took, the peak
+    memory and how many dates were parsed and Tasks looked up, to stderr. With --profile=<File> (or
+    TASKS_TRACE=<File>) the cProfile stats are saved to File as well, to read with python -m pstats.
+
+    While "tasks.py serve" is running, the other commands are sent to it instead of loading and saving the task
+    file themselves. It saves the changes once it has not been sent a command for a second.
 """
 
 __author__ = 'Robin Siebler'
 __date__ = '5/6/15'
 
+import instrument  # first, so that --profile can time the other imports
+
+import imp
 import os
 import platform
+import shlex
 import sys
 import time
 
-try:
-	import arrow
-except ImportError:
-	print 'The module "arrow" is required.  Install it by running "pip install arrow".'
-	sys.exit(-5)
-try:
-	import colorama
-except ImportError:
-	print 'The module "colorama" is required.  Install it by running "pip install colorama".'
-	sys.exit(-5)
+# arrow and colorama are only imported by the commands that use them; make sure they are there without
+# paying for importing them
+for module in ['arrow', 'colorama']:
+	try:
+		imp.find_module(module)
+	except ImportError:
+		print 'The module "' + module + '" is required.  Install it by running "pip install ' + module + '".'
+		sys.exit(-5)
 
 try:
 	from docopt import docopt
@@ -64,13 +137,17 @@ except ImportError:
 	print 'The module "docopt" is required.  Install it by running "pip install docopt".'
 	sys.exit(-5)
 
-try:
-	from pyparsing import Regex, ParseException
-except ImportError:
-	print 'The module "pyparsing" is required.  Install it by running "pip install pyparsing".'
-	sys.exit(-5)
+import daemon
+import query
+import renderer
+import storage
+import task_lists
+import transfer
+from task_functions import FUZZY_TOP, Functions
+from tasklist import DATE_PATTERN, TIME_PATTERN, parse_due_date
 
-from task_functions import Functions
+# the task file for each storage backend, selected with the TASKS_BACKEND environment variable
+TASK_FILES = {'pickle': 'tasks.tsk', 'sqlite': 'tasks.db', 'columnar': 'tasks.tcol'}
 
 
 def validate_args(docopt_args):
@@ -83,60 +160,52 @@ def validate_args(docopt_args):
 			print '\nThe priority given is not valid.\n'
 			sys.exit(-4)
 
+	# validate the numbers of tasks to display/skip
+	for option in ['--top', '--limit', '--offset', '--older-than']:
+		if docopt_args.get(option):
+			if not docopt_args[option].isdigit() or (option in ['--top', '--limit'] and int(docopt_args[option]) == 0):
+				print '\n' + option + ' must be a positive number.\n'
+				sys.exit(-6)
+			docopt_args[option] = int(docopt_args[option])
+
+	if docopt_args.get('--format') and docopt_args['--format'] not in transfer.FORMATS:
+		print '\n--format must be one of: ' + ', '.join(transfer.FORMATS) + '\n'
+		sys.exit(-9)
+
+	if docopt_args.get('<Expression>') is not None:
+		try:
+			query.parse(docopt_args['<Expression>'])
+		except query.QueryError as e:
+			print '\n' + str(e) + '\n'
+			sys.exit(-10)
+
+	# validate the durations of the due and remind commands
+	for option in ['--within', '--ahead', '<Start>', '<End>']:
+		value = docopt_args.get(option)
+		if value and not (option.startswith('<') and DATE_PATTERN.match(value)):
+			try:
+				query.duration(value)
+			except query.QueryError:
+				kind = 'date or duration' if option.startswith('<') else 'duration'
+				print '\n' + value + ' is not a valid ' + kind + '\n'
+				sys.exit(-3)
+
+	# validate the list name
+	if docopt_args.get('--list') and not task_lists.NAME.match(docopt_args['--list']):
+		print '\n' + docopt_args['--list'] + ' is not a valid list name: use letters, digits, _ and -\n'
+		sys.exit(-11)
+
 	# validate date
 	if docopt_args['-d']:
-		pattern = Regex('^(1[0-2]|0?[1-9])(?P<Sep>(/|-|.))(3[01]|[12][0-9]|0?[1-9])(?P=Sep)(?:[0-9]{2})?[0-9]{2}$')
-		try:
-			pattern.parseString(docopt_args['-d'])
-		except ParseException:
+		if not DATE_PATTERN.match(docopt_args['-d']):
 			print '\n' + docopt_args['-d'] + ' is not a valid date\n'
 			sys.exit(-3)
 		else:
-			# figure out what format the user provided...
-			if '/' in docopt_args['-d']:
-				date_sep = '/'
-			elif '-' in docopt_args['-d']:
-				date_sep = '-'
-			elif '.' in docopt_args['-d']:
-				date_sep = '.'
-			date = docopt_args['-d'].split(date_sep)
-
-			if len(date[0]) == 1:
-				month_format = 'M'
-			else:
-				month_format = 'MM'
-
-			if len(date[1]) == 1:
-				day_format = 'D'
-			else:
-				day_format = 'DD'
-
-			if len(date[2]) == 2:
-				year_format = 'YY'
-			else:
-				year_format = 'YYYY'
-
-			# get the time zone
-			# offset = time.strftime('%z', time.localtime()) <--- This doesn't work on windows
-			offset = ("-" if time.timezone > 0 else "+") + time.strftime("%H:%M", time.gmtime(abs(time.timezone)))
-			# parse the date
-			date_format = date_sep.join([month_format, day_format, year_format])
-			date_format = date_format + ' h:mm A Z'
-			if '--time' in docopt_args and docopt_args['--time']:
-				pattern = Regex('^ *(1[0-2]|[1-9]):[0-5][0-9] *(a|p|A|P)(m|M) *$')
-				try:
-					pattern.parseString(docopt_args['--time'])
-				except ParseException:
-					print '\nInvalid time format. Dropping Due Time.\n'
-				else:
-					# parse the date to make sure it is in the correct format:
-					dtime = docopt_args['--time'][:-2].strip()
-					period = docopt_args['--time'][-2:]
-					dtime = dtime + ' ' + period + ' ' + str(offset)
-					date = docopt_args['-d'] + ' ' + dtime
-			else:
-				date = docopt_args['-d'] + ' 11:59 PM ' + offset
-			date = arrow.get(date, date_format)
+			due_time = docopt_args.get('--time')
+			if due_time and not TIME_PATTERN.match(due_time):
+				print '\nInvalid time format. Dropping Due Time.\n'
+				due_time = None
+			date, date_format = parse_due_date(docopt_args['-d'], due_time)
 
 			# validate due date occurs in the future
 			if date.date() < date.date().today():
@@ -147,27 +216,220 @@ def validate_args(docopt_args):
 	return docopt_args
 
 
-def main(docopt_args):
-	docopt_args = validate_args(docopt_args)
+def due_range(docopt_args, now=None):
+	"""Return the range of due timestamps (from, up to but not including) asked for by the due command."""
 
-	tasks = Functions()
+	now = int(now or time.time())
+	if docopt_args['--overdue']:
+		return None, now
+	if docopt_args['--within']:
+		return now, now + query.duration(docopt_args['--within'])
+
+	def limit(value, end):
+		if not DATE_PATTERN.match(value):
+			return now + query.duration(value)
+		if end:
+			# a due date given without a time is due at 11:59 PM, so the day ends a minute after that
+			return parse_due_date(value)[0].timestamp + 60
+		return parse_due_date(value, '12:00 AM')[0].timestamp
+
+	return limit(docopt_args['<Start>'], False), limit(docopt_args['<End>'], True)
+
+
+def get_task_file(list_name=None):
+	"""Return the path of the task file of a list (the default one if list_name is None) for the storage backend
+	selected with TASKS_BACKEND."""
+
+	backend = os.environ.get('TASKS_BACKEND', 'pickle')
+	if backend not in TASK_FILES:
+		print '\nTASKS_BACKEND must be one of: ' + ', '.join(sorted(TASK_FILES)) + '\n'
+		sys.exit(-2)
 
 	if platform.system() == 'Windows':
 		home_path = os.path.join(os.path.expandvars('%HOMEDRIVE%'), os.path.expandvars('%HOMEPATH%'))
-		task_file = os.path.join(home_path, 'tasks.tsk')
+		return task_lists.list_file(os.path.join(home_path, TASK_FILES[backend]), list_name)
 	elif platform.system() == 'Darwin' or platform.system() == 'Linux':
-		task_file = os.path.join(os.path.expanduser('~'), 'tasks.tsk')
+		return task_lists.list_file(os.path.join(os.path.expanduser('~'), TASK_FILES[backend]), list_name)
 	else:
 		print 'What OS are we on?'
 		sys.exit(-2)
 
-	task_file_exists = os.path.exists(task_file)
 
-	if not task_file_exists and docopt_args['<Task>'] is None:
+def read_batch(batch_file):
+	"""Read and validate the commands in a batch file.
+
+	:param batch_file: the file to read, or - for stdin
+	:return: a list of the validated arguments of each command
+	"""
+
+	if batch_file == '-':
+		lines = sys.stdin.readlines()
+	else:
+		with open(batch_file) as fh:
+			lines = fh.readlines()
+
+	commands = []
+	errors = 0
+	for line_number, line in enumerate(lines, 1):
+		try:
+			argv = shlex.split(line, comments=True)
+			if not argv:
+				continue
+			docopt_args = docopt(__doc__, argv, help=False)
+			if docopt_args['batch'] or docopt_args['serve'] or docopt_args['remind'] or docopt_args['--list']:
+				raise ValueError
+			commands.append(validate_args(docopt_args))
+		except (SystemExit, ValueError):  # docopt and validate_args exit on invalid arguments
+			print 'Line ' + str(line_number) + ' is not a valid command: ' + line.strip()
+			errors += 1
+
+	if errors:
+		print '\nNothing was changed.\n'
+		sys.exit(-8)
+	return commands
+
+
+def get_commands(docopt_args):
+	"""Return the validated arguments of each command to run: the commands in the batch file for batch,
+	otherwise the command given on the command line."""
+
+	if docopt_args['batch']:
+		return read_batch(docopt_args['<File>'])
+	return [validate_args(docopt_args)]
+
+
+def main(docopt_args):
+	with instrument.phase('validate_args'):
+		commands = get_commands(docopt_args)
+
+	task_file = get_task_file(docopt_args['--list'])
+
+	if not storage.exists(task_file) and all(command['<Task>'] is None and not command['import'] for command in commands):
 		print '\nThe file ' + task_file + ' does not exist. There are no tasks to display.\n'
 		sys.exit(-1)
-	elif task_file_exists:
+
+	tasks = Functions()
+	with instrument.phase('load'):
 		tasks.load_tasks(task_file)
+	with instrument.phase('command'):
+		run_commands(tasks, commands)
+	with instrument.phase('save'):
+		tasks.save_tasks(task_file)
+
+
+def serve(docopt_args):
+	"""Run the daemon, or stop the one that is running."""
+
+	task_file = get_task_file(docopt_args['--list'])
+	if docopt_args['--stop']:
+		if daemon.send(task_file, daemon.STOP) is None:
+			print '\ntasks.py serve is not running.\n'
+			sys.exit(-7)
+		return
+	if daemon.running(task_file):
+		print '\ntasks.py serve is already running.\n'
+		sys.exit(-7)
+
+	tasks = Functions()
+	tasks.load_tasks(task_file)
+	print 'Serving ' + task_file + ' on ' + daemon.socket_file(task_file)
+	daemon.Daemon(task_file, tasks, handle_request).serve()
+
+
+def remind_tasks(docopt_args):
+	"""Give the reminders of the Tasks until interrupted."""
+
+	import remind
+
+	validate_args(docopt_args)
+	task_file = get_task_file(docopt_args['--list'])
+	if not storage.exists(task_file):
+		print '\nThe file ' + task_file + ' does not exist. There are no tasks to remind of.\n'
+		sys.exit(-1)
+
+	hook = remind.command_hook(docopt_args['--exec']) if docopt_args['--exec'] else remind.print_reminder
+	ahead = query.duration(docopt_args['--ahead']) if docopt_args['--ahead'] else 0
+	print 'Reminding of the tasks in ' + task_file + ' (press Ctrl+C to stop)'
+	sys.stdout.flush()
+	try:
+		remind.remind(task_file, hook, ahead)
+	except KeyboardInterrupt:
+		pass
+
+
+def show_all_lists(docopt_args):
+	"""Run show, priority or search on every task list."""
+
+	docopt_args = validate_args(docopt_args)
+	if docopt_args['<Task>'] is not None or not (docopt_args['show'] or docopt_args['priority'] or
+	                                              docopt_args['search'] or not any_command(docopt_args)):
+		print '\nOnly show, priority and search can be run on all of the lists.\n'
+		sys.exit(-11)
+
+	task_file = get_task_file()
+	names = task_lists.list_names(task_file)
+	if not names:
+		print '\nThere are no task lists in ' + os.path.dirname(task_file) + '. There are no tasks to display.\n'
+		sys.exit(-1)
+
+	tasks = Functions()
+	if docopt_args['priority']:
+		# each list only has to send the tasks that can make it onto the page
+		top = docopt_args['--top']
+		if docopt_args['--limit']:
+			end = (docopt_args['--offset'] or 0) + docopt_args['--limit']
+			top = end if top is None else min(top, end)
+		tasks.show_tasks_by_priority(task_lists.MergedLists(task_file, names, 'priority', top),
+		                             date_format=docopt_args['-a'], top=docopt_args['--top'],
+		                             offset=docopt_args['--offset'], limit=docopt_args['--limit'],
+		                             pager=docopt_args['--pager'])
+	elif docopt_args['search']:
+		search_string = docopt_args['<Search_String>']
+		if docopt_args['--fuzzy']:
+			# each list sends its best matches, and the best of those are displayed
+			top = docopt_args['--top'] or FUZZY_TOP
+			found = task_lists.MergedLists(task_file, names, 'fuzzy', (search_string, top))
+			if len(found):
+				tasks.show_tasks(found, limit=top)
+			else:
+				print '\nThere were no tasks like "' + search_string + '".\n'
+			return
+		found = task_lists.MergedLists(task_file, names, 'search', (search_string, docopt_args['--all']))
+		if len(found):
+			tasks.show_tasks(found)
+		else:
+			print '\nThere were no tasks containing "' + search_string + '".\n'
+	else:
+		view = 'completed' if docopt_args['--completed'] else 'show'
+		tasks.show_tasks(task_lists.MergedLists(task_file, names, view), date_format=docopt_args['-a'],
+		                 offset=docopt_args['--offset'], limit=docopt_args['--limit'], pager=docopt_args['--pager'])
+
+
+def any_command(docopt_args):
+	"""Return True if a command was given (tasks.py on its own, or with just -a, shows the tasks)."""
+
+	return any(value for name, value in docopt_args.items() if name[0].isalpha())
+
+
+def handle_request(tasks, argv):
+	"""Run a command sent to the daemon."""
+
+	run_commands(tasks, get_commands(docopt(__doc__, argv)))
+
+
+def run_commands(tasks, commands):
+	"""Run one or more commands."""
+
+	for docopt_args in commands:
+		run_command(tasks, docopt_args)
+
+
+def run_command(tasks, docopt_args):
+	"""Run the command given on the command line.
+
+	:param tasks:       a Functions object with the task file loaded
+	:param docopt_args: the validated arguments
+	"""
 
 	if docopt_args['modify']:
 		if docopt_args['<Task>']:
@@ -222,17 +484,75 @@ def main(docopt_args):
 	elif docopt_args['display']:
 		tasks.show_task(docopt_args['<Task_ID>'])
 	elif docopt_args['priority']:
-		tasks.show_tasks_by_priority(date_format=docopt_args['-a'])
+		tasks.show_tasks_by_priority(date_format=docopt_args['-a'], top=docopt_args['--top'],
+		                             offset=docopt_args['--offset'], limit=docopt_args['--limit'],
+		                             pager=docopt_args['--pager'])
+	elif docopt_args['show']:
+		tasks.show_tasks(date_format=docopt_args['-a'], offset=docopt_args['--offset'], limit=docopt_args['--limit'],
+		                 pager=docopt_args['--pager'], completed=docopt_args['--completed'])
 	elif docopt_args['search']:
-		tasks.search_tasks(docopt_args['<Search_String>'])
+		tasks.search_tasks(docopt_args['<Search_String>'], archived=docopt_args['--all'], fuzzy=docopt_args['--fuzzy'],
+		                   top=docopt_args['--top'])
+	elif docopt_args['query']:
+		tasks.query_tasks(docopt_args['<Expression>'], explain=docopt_args['--explain'])
+	elif docopt_args['due']:
+		tasks.show_due_tasks(*due_range(docopt_args), date_format=docopt_args['-a'])
+	elif docopt_args['archive']:
+		tasks.archive_tasks(docopt_args['--older-than'] or 0)
+	elif docopt_args['tag']:
+		tasks.show_tagged_tasks(docopt_args['<Tag>'], match_any=docopt_args['--any'])
+	elif docopt_args['export']:
+		tasks.export_tasks(transfer.file_format('', docopt_args['--format']))
+	elif docopt_args['import']:
+		import_file = docopt_args['<File>']
+		fmt = transfer.file_format(import_file, docopt_args['--format'])
+		if import_file == '-':
+			tasks.import_tasks(sys.stdin, tasks.task_file, fmt)
+		else:
+			with open(import_file, 'rb') as fh:
+				tasks.import_tasks(fh, tasks.task_file, fmt)
 	elif docopt_args['-a']:
 		tasks.show_tasks(date_format=docopt_args['-a'])
 	else:
 		tasks.show_tasks()
 
-	tasks.save_tasks(task_file)
-
 
 if __name__ == '__main__':
-	args = docopt(__doc__)
-	main(args)
\ No newline at end of file
+	argv, profile = instrument.profile_setting(sys.argv[1:], os.environ.get('TASKS_TRACE'))
+	if profile is not None:
+		instrument.enable(profile)
+	try:
+		with instrument.phase('parse arguments'):
+			args = docopt(__doc__, argv)
+		if args['serve']:
+			serve(args)
+		elif args['remind']:
+			remind_tasks(args)
+		elif args['--list'] == task_lists.ALL:
+			show_all_lists(args)
+		else:
+			stdin = None
+			if args['batch'] or args['import']:
+				# the daemon has its own working directory and stdin
+				if args['<File>'] == '-':
+					stdin = sys.stdin  # sent to the daemon as it reads it
+				else:
+					argv = ['batch' if args['batch'] else 'import', os.path.abspath(args['<File>'])]
+					if args['--format']:
+						argv.append('--format=' + args['--format'])
+			with instrument.phase('daemon'):
+				if args['export']:
+					# written straight to stdout rather than held in the daemon's reply, once it has saved
+					daemon.send(get_task_file(args['--list']), daemon.SAVE)
+					reply = None
+				else:
+					reply = daemon.send(get_task_file(args['--list']), argv, stdin)
+			if reply is None:
+				main(args)
+			else:
+				status, output = reply
+				with renderer.Output(args['--pager']) as out:
+					out.write_lines(output.splitlines())
+				sys.exit(status)
+	finally:
+		instrument.report()
@@ -0,0 +1,100 @@
+#------------------------------------------
+# Name:     test_archive
+# Purpose:  Tests for archiving completed tasks
+#
+# Author:   Robin Siebler
+# Created:  10/18/26
+#------------------------------------------
+__author__ = 'Robin Siebler'
+__date__ = '10/18/26'
+
+import os
+import time
+
+import pytest
+
+import archive
+from task_functions import Functions
+from tasklist import CREATION_DATE_FORMAT, Task, format_date
+
+
+def old_task(task_id, name, days, completed=True):
+	created = int(time.time()) - days * archive.DAY
+	return Task.restore(id=task_id, task=name, completed=completed, created_epoch=created,
+	                    creation_date=format_date(created, (CREATION_DATE_FORMAT, 0)))
+
+
+def test_archive_tasks(tmpdir, capsys):
+	"""Test that archived tasks leave the task list but are still found by search --all and show --completed."""
+
+	task_file = str(tmpdir.join('tasks.tsk'))
+	functions = Functions()
+	functions.load_tasks(task_file)
+	functions.tasklist.insert_tasks([old_task(1, 'Buy milk', 10), old_task(2, 'Buy eggs', 10, completed=False),
+	                                 old_task(3, 'Buy bread', 2)])
+	functions.archive_tasks(older_than=5)
+	functions.save_tasks(task_file)
+
+	functions = Functions()
+	functions.load_tasks(task_file)
+	assert [task.id for task in functions.tasklist] == [2, 3]
+	assert [task.task for task in archive.Archive(task_file).load()] == ['Buy milk']
+	found = lambda: [line.split('Buy ')[1].split()[0] for line in capsys.readouterr()[0].splitlines() if 'Buy ' in line]
+	capsys.readouterr()
+	functions.search_tasks('buy')
+	assert found() == ['eggs', 'bread']
+	functions.search_tasks('buy', archived=True)
+	assert found() == ['milk', 'eggs', 'bread']
+	functions.show_tasks(completed=True)
+	assert found() == ['milk', 'bread']
+
+
+def test_automatic_archiving(tmpdir):
+	"""Test that saving archives the old completed tasks once a day, and that a task left in both the archive
+	and the task list by a crash is only counted once."""
+
+	task_file = str(tmpdir.join('tasks.tsk'))
+	functions = Functions()
+	functions.load_tasks(task_file)
+	functions.tasklist.insert_tasks([old_task(1, 'Old', 40), old_task(2, 'New', 1)])
+	functions.save_tasks(task_file)
+	assert [task.task for task in functions.tasklist] == ['New']
+
+	functions.tasklist.insert_tasks([old_task(3, 'Also old', 40)])
+	functions.save_tasks(task_file)  # not again on the same day
+	assert [task.task for task in functions.tasklist] == ['New', 'Also old']
+
+	stored = archive.Archive(task_file)
+	stored.append([old_task(2, 'New', 1)])
+	assert [task.task for task in stored.load(functions.tasklist)] == ['Old']
+	os.utime(stored.path, (0, 0))
+	functions.tasklist.insert_tasks([old_task(4, 'Newer', 0)])
+	functions.save_tasks(task_file)
+	assert [task.task for task in stored.load(functions.tasklist)] == ['Old', 'Also old']
+
+
+@pytest.mark.parametrize('name', ['tasks.tsk', 'tasks.db', 'tasks.tcol'])
+def test_displaying_never_archives(tmpdir, name):
+	"""Test that the automatic archiving only runs when the tasks were changed, and that it leaves the archive
+	alone otherwise."""
+
+	task_file = str(tmpdir.join(name))
+	functions = Functions()
+	functions.load_tasks(task_file)
+	functions.tasklist.insert_tasks([old_task(1, 'Old', 40)])
+	functions.store.commit(functions.tasklist)
+	stored = archive.Archive(task_file)
+
+	functions = Functions()
+	functions.load_tasks(task_file)
+	functions.show_tasks()
+	functions.save_tasks(task_file)
+	assert not stored.exists() and [task.task for task in functions.tasklist] == ['Old']
+
+	functions.add_task('New')
+	functions.save_tasks(task_file)
+	assert [task.task for task in stored.load()] == ['Old']
+	os.utime(stored.path, (0, 0))
+	functions.show_tasks()
+	functions.save_tasks(task_file)
+	assert os.path.getmtime(stored.path) == 0
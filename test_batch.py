@@ -0,0 +1,46 @@
+#------------------------------------------
+# Name:     test_batch
+# Purpose:  Tests for running a batch of commands
+#
+# Author:   Robin Siebler
+# Created:  10/18/26
+#------------------------------------------
+__author__ = 'Robin Siebler'
+__date__ = '10/18/26'
+
+import pytest
+
+import tasks
+from task_functions import Functions
+from tasklist import Task
+
+
+def test_batch_keeps_the_ids(tmpdir):
+	"""Test that a batch deletes the tasks it names and that the other tasks keep their ids."""
+
+	task_file = str(tmpdir.join('tasks.tsk'))
+	Task.last_id = 0
+	functions = Functions()
+	functions.load_tasks(task_file)
+	for name in ['Sleep', 'Eat', 'Work', 'Play']:
+		functions.add_task(name)
+
+	batch_file = tmpdir.join('batch.txt')
+	batch_file.write('delete 1\n# Work is still task 3 here\ndelete 3\nmodify 4 -p H\n"Read"\n')
+	tasks.run_commands(functions, tasks.read_batch(str(batch_file)))
+	functions.save_tasks(task_file)
+
+	functions = Functions()
+	functions.load_tasks(task_file)
+	assert [(task.id, task.task, task.priority) for task in functions.tasklist] == \
+	       [(2, 'Eat', None), (4, 'Play', 'H'), (5, 'Read', None)]
+
+
+def test_batch_is_checked_before_it_runs(tmpdir):
+	"""Test that one invalid line stops the whole batch."""
+
+	batch_file = tmpdir.join('batch.txt')
+	batch_file.write('"Sleep"\nmodify 1 -p X\n')
+	with pytest.raises(SystemExit) as e:
+		tasks.read_batch(str(batch_file))
+	assert e.value.code == -8
@@ -0,0 +1,116 @@
+#------------------------------------------
+# Name:     test_columnar
+# Purpose:  Tests for keeping the tasks in a column file
+#
+# Author:   Robin Siebler
+# Created:  10/18/26
+#------------------------------------------
+__author__ = 'Robin Siebler'
+__date__ = '10/18/26'
+
+import pytest
+
+import storage
+from tasklist import Task
+
+fields = lambda task: (task.id, task.task, task.priority, task.due_date, task.due_epoch, task.tags, task.note,
+                       task.completed, task.creation_date, task.created_epoch)
+
+
+def make_store(tmpdir):
+	"""Save three tasks with the pickle backend and return them, migrated to a column file."""
+
+	Task.last_id = 0
+	store = storage.JournalStore(str(tmpdir.join('tasks.tsk')))
+	tasklist = store.load()
+	tasklist.add_task('Sleep', 'L', ['5/23/2015 11:59 PM -0800', 'M/DD/YYYY h:mm A Z'], note='in a bed')
+	tasklist.add_task('Eat', 'H', tags='food')
+	tasklist.add_task('Work', None, ['5/22/2015 11:59 PM -0800', 'M/DD/YYYY h:mm A Z'], tags='food, job')
+	tasklist.modify_task(2, completed=True)
+	store.commit(tasklist)
+	return tasklist, storage.open_store(str(tmpdir.join('tasks.tcol')))
+
+
+def test_migration(tmpdir):
+	"""Test that the column file holds the same tasks as the pickle, and finds and sorts them the same way."""
+
+	tasklist, store = make_store(tmpdir)
+	columnar = store.load()
+	assert len(columnar) == 3
+	assert [fields(task) for task in columnar] == [fields(task) for task in tasklist]
+	assert [task.id for task in columnar.by_priority()] == [task.id for task in tasklist.by_priority()]
+	assert [task.id for task in columnar.by_priority(top=1)] == [1]
+	assert [task.id for task in columnar.search('bed')] == [1]
+	assert [task.id for task in columnar.find_by_tags('food job')] == [3]
+	assert [task.id for task in columnar.find_by_tags('food job', match_all=False)] == [2, 3]
+	assert [task.id for task in columnar.page(offset=1, limit=1)] == [2]
+	assert fields(columnar.find_task('3')) == fields(tasklist.find_task(3))
+	assert columnar.find_task(4) is None
+
+
+def test_changes(tmpdir):
+	"""Test that changes are seen before they are committed, and that the committed file has them."""
+
+	tasklist, store = make_store(tmpdir)
+	columnar = store.load()
+	columnar.delete_task(1)
+	columnar.modify_task(3, priority='H', tags='job')
+	columnar.add_task('Play', 'M', tags='fun')
+	assert [task.id for task in columnar.find_by_tags('food')] == [2]
+	columnar.renumber_tasks()
+	assert [(task.id, task.task) for task in columnar] == [(1, 'Eat'), (2, 'Work'), (3, 'Play')]
+	assert columnar.find_task(2).priority == 'H'
+	columnar.delete_task(1)
+	columnar.renumber_tasks()
+	expected = [fields(task) for task in columnar]
+
+	store.commit(columnar)
+	assert [fields(task) for task in columnar] == expected
+	columnar = storage.open_store(store.column_file).load()
+	assert [fields(task) for task in columnar] == expected
+	assert [(task.id, task.task, task.tags) for task in columnar.by_priority()] == \
+	       [(1, 'Work', set(['job'])), (2, 'Play', set(['fun']))]
+	assert [task.id for task in columnar.search('pla')] == [2]
+
+
+def test_concurrent_changes_are_merged(tmpdir):
+	"""Test that a commit made after another process saved keeps both sets of changes, even when the other
+	process renumbered the tasks."""
+
+	tasklist, store = make_store(tmpdir)
+	store.commit(store.load())  # migrated
+	first, second = storage.open_store(store.column_file), storage.open_store(store.column_file)
+	first_tasks, second_tasks = first.load(), second.load()
+	first_tasks.delete_task(1)
+	first_tasks.renumber_tasks()
+	first_tasks.add_task('Play')
+	first.commit(first_tasks)
+
+	second_tasks.modify_task(3, priority='H')
+	second_tasks.delete_task(2)
+	second_tasks.renumber_tasks()
+	second_tasks.add_task('Read')
+	second.commit(second_tasks)
+
+	expected = [(1, 'Work', 'H'), (2, 'Play', None), (3, 'Read', None)]
+	assert [(task.id, task.task, task.priority) for task in second_tasks] == expected
+	assert [(task.id, task.task, task.priority) for task in storage.open_store(store.column_file).load()] == expected
+	assert not tmpdir.listdir(lambda path: path.ext == '.tmp')
+
+
+def test_nul_is_rejected(tmpdir):
+	"""Test that a task can't get a NUL character, which ends each field in the file, and that the tasks after it
+	are still read back right."""
+
+	tasklist, store = make_store(tmpdir)
+	columnar = store.load()
+	with pytest.raises(ValueError):
+		columnar.add_task('Sle\0ep')
+	with pytest.raises(ValueError):
+		columnar.modify_task(1, note='in a\0bed')
+	with pytest.raises(ValueError):
+		columnar.modify_task(1, tags='a\0b')
+	columnar.add_task('Play', tags='fun')
+	store.commit(columnar)
+	assert [(task.task, task.note, task.tags) for task in storage.open_store(store.column_file).load()][-2:] == \
+	       [('Work', None, set(['food', 'job'])), ('Play', None, set(['fun']))]
@@ -0,0 +1,90 @@
+#------------------------------------------
+# Name:     test_daemon
+# Purpose:  Tests for running commands through tasks.py serve
+#
+# Author:   Robin Siebler
+# Created:  10/18/26
+#------------------------------------------
+__author__ = 'Robin Siebler'
+__date__ = '10/18/26'
+
+import os
+import socket
+import StringIO
+import subprocess
+import sys
+import time
+
+import pytest
+
+import daemon
+import storage
+
+TASKS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tasks.py')
+
+
+@pytest.mark.skipif(not hasattr(socket, 'AF_UNIX'), reason='needs Unix domain sockets')
+def test_commands_go_through_the_daemon(tmpdir):
+	"""Test that commands are run by the daemon and that its changes are saved when it stops."""
+
+	env = dict(os.environ, HOME=str(tmpdir), TASKS_BACKEND='pickle')
+	task_file = str(tmpdir.join('tasks.tsk'))
+	tasks = lambda *args: subprocess.check_output([sys.executable, TASKS] + list(args), env=env)
+
+	server = subprocess.Popen([sys.executable, TASKS, 'serve'], env=env, stdout=subprocess.PIPE)
+	try:
+		for _ in range(100):
+			if daemon.running(task_file):
+				break
+			time.sleep(0.05)
+		assert 'Created task 1' in tasks('Sleep', '-t', 'home')
+		assert 'Created task 2' in tasks('Eat', '-t', 'home')
+		assert 'Eat' in tasks('tag', 'home')
+	finally:
+		tasks('serve', '--stop')
+		server.wait()
+
+	assert not os.path.exists(daemon.socket_file(task_file))
+	assert [task.task for task in storage.JournalStore(task_file).load()] == ['Sleep', 'Eat']
+
+
+@pytest.mark.skipif(not hasattr(socket, 'AF_UNIX'), reason='needs Unix domain sockets')
+def test_stdin_goes_through_the_daemon(tmpdir):
+	"""Test that import - and batch - get their input through the daemon, and that export sees the changes the
+	daemon has not saved yet."""
+
+	env = dict(os.environ, HOME=str(tmpdir), TASKS_BACKEND='pickle')
+	task_file = str(tmpdir.join('tasks.tsk'))
+
+	def tasks(stdin, *args):
+		process = subprocess.Popen([sys.executable, TASKS] + list(args), env=env, stdin=subprocess.PIPE,
+		                           stdout=subprocess.PIPE)
+		return process.communicate(stdin)[0]
+
+	server = subprocess.Popen([sys.executable, TASKS, 'serve'], env=env, stdout=subprocess.PIPE)
+	try:
+		for _ in range(100):
+			if daemon.running(task_file):
+				break
+			time.sleep(0.05)
+		rows = ''.join('{{"task": "Task {}"}}\n'.format(number) for number in range(1, 5001))
+		assert 'Imported 5000 tasks' in tasks(rows, 'import', '-')
+		assert 'Created task 5001' in tasks('Sleep -t home\n', 'batch', '-')
+		tasks('', 'modify', '1', '-p', 'H')
+		exported = tasks('', 'export').splitlines()
+		assert len(exported) == 5001 and '"priority": "H"' in exported[0]
+	finally:
+		tasks('', 'serve', '--stop')
+		server.wait()
+
+	assert len(storage.JournalStore(task_file).load()) == 5001
+
+
+def test_unread_input_is_skipped():
+	"""Test that the input a command leaves unread is read anyway, since the client sends all of it before it
+	reads the reply."""
+
+	server = daemon.Daemon('tasks.tsk', None, lambda tasks, argv: sys.stdout.write(sys.stdin.readline()))
+	stdin = StringIO.StringIO('first\n' + 'rest\n' * 100000)
+	assert server.run(['batch', '-'], stdin) == (0, 'first\n')
+	assert stdin.read() == ''
@@ -0,0 +1,49 @@
+#------------------------------------------
+# Name:     test_instrument
+# Purpose:  Tests for tasks.py --profile and TASKS_TRACE
+#
+# Author:   Robin Siebler
+# Created:  10/18/26
+#------------------------------------------
+__author__ = 'Robin Siebler'
+__date__ = '10/18/26'
+
+import os
+import pstats
+import subprocess
+import sys
+
+import instrument
+
+TASKS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tasks.py')
+
+
+def test_profile_setting():
+	"""Test that --profile is taken out of the arguments and that it and TASKS_TRACE turn profiling on."""
+
+	assert instrument.profile_setting(['show', '-a']) == (['show', '-a'], None)
+	assert instrument.profile_setting(['show', '--profile']) == (['show'], '')
+	assert instrument.profile_setting(['--profile=stats.prof', 'show']) == (['show'], 'stats.prof')
+	assert instrument.profile_setting(['show'], '0') == (['show'], None)
+	assert instrument.profile_setting(['show'], '1') == (['show'], '')
+	assert instrument.profile_setting(['show'], 'stats.prof') == (['show'], 'stats.prof')
+	assert instrument.phase('load') is instrument.NO_PHASE
+
+
+def test_profile_report(tmpdir):
+	"""Test that a profiled command prints its phases and call counts to stderr and saves the cProfile stats."""
+
+	env = dict(os.environ, HOME=str(tmpdir), TASKS_BACKEND='pickle')
+	env.pop('TASKS_TRACE', None)
+	subprocess.check_output([sys.executable, TASKS, 'Pay bills', '-d', '1/2/30'], env=env)
+	stats_file = str(tmpdir.join('stats.prof'))
+	process = subprocess.Popen([sys.executable, TASKS, 'modify', '1', '-p', 'H', '--profile=' + stats_file], env=env,
+	                           stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+	output, report = process.communicate()
+	assert process.returncode == 0
+	assert 'Modified task 1' in output and 'phase' not in output
+	phases = [line.split()[0] for line in report.splitlines()[2:] if line and not line.startswith(('calls', 'cProfile'))]
+	assert phases == ['imports', 'parse', 'daemon', 'validate_args', 'load', 'command', 'save', 'total']
+	calls = dict(call.split() for call in report.splitlines()[-2][len('calls: '):].split(', '))
+	assert calls['arrow.get'] == '0' and int(calls['find_task']) > 0  # the due date was parsed when it was added
+	assert pstats.Stats(stats_file).total_calls > 0
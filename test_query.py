@@ -0,0 +1,85 @@
+#------------------------------------------
+# Name:     test_query
+# Purpose:  Tests for the query expressions and their plans
+#
+# Author:   Robin Siebler
+# Created:  10/18/26
+#------------------------------------------
+__author__ = 'Robin Siebler'
+__date__ = '10/18/26'
+
+import pytest
+
+import query
+from tasklist import Task, TaskList
+
+NOW = 1800000000
+DAY = 24 * 60 * 60
+DUE_FORMAT = 'M/D/YY h:mm A Z'
+
+
+def make_tasklist():
+	Task.last_id = 0
+	tasklist = TaskList()
+	tasks = [('Fix server', 'H', 'ops', NOW + 2 * DAY, False), ('Buy milk', None, 'home', None, False),
+	         ('Deploy app', 'H', 'ops release', NOW + 30 * DAY, False), ('Old ops', 'M', 'ops', NOW - DAY, True),
+	         ('Fix the sink', 'L', 'home', NOW + DAY, False)]
+	# the due timestamps are given, so that no dates have to be parsed
+	tasklist.insert_tasks(Task.restore(id=task_id, task=name, priority=priority, tags=tags, completed=completed,
+	                                   due_date=due and 'due', due_date_format=DUE_FORMAT, due_epoch=due)
+	                      for task_id, (name, priority, tags, due, completed) in enumerate(tasks, 1))
+	return tasklist
+
+
+def found(tasklist, expression):
+	return [task.id for task in query.Plan(query.parse(expression, NOW), tasklist).tasks()]
+
+
+@pytest.mark.parametrize('expression, ids', [
+	('pri:H and due<7d and not done and tag:ops', [1]),
+	('pri:h,m', [1, 3, 4]),
+	('pri:none', [2]),
+	('done', [4]),
+	('not done tag:home', [2, 5]),
+	('fix', [1, 5]),
+	('"the sink" or milk', [2, 5]),
+	('tag:ops and not (done or pri:H)', []),
+	('due>=2d', [1, 3]),
+	('due<0d', [4]),
+	('due:none or text:deploy', [2, 3]),
+	('NOT done AND (tag:release OR pri:L)', [3, 5]),
+])
+def test_query(expression, ids):
+	"""Test that a query finds the same tasks as checking every task against it."""
+
+	tasklist = make_tasklist()
+	parsed = query.parse(expression, NOW)
+	assert [task.id for task in tasklist if parsed.match(task)] == ids
+	assert found(tasklist, expression) == ids
+
+
+@pytest.mark.parametrize('expression', ['', 'pri:X', '(tag:ops', 'tag:ops)', 'done and', 'due<7y', 'owner:me', '""',
+                                        '"milk', '"', 'pri:H and "buy milk'])
+def test_invalid_query(expression):
+	with pytest.raises(query.QueryError):
+		query.parse(expression)
+
+
+def test_plan():
+	"""Test that the plan uses the index with the fewest candidates and that the indexes follow the changes."""
+
+	tasklist = make_tasklist()
+	plan = query.Plan(query.parse('not done and pri:H and tag:ops and due<7d', NOW), tasklist)
+	assert [(str(term), ids) for term, ids in plan.lookups] == [
+		('not done', set([1, 2, 3, 5])), ('pri:H', set([1, 3])), ('tag:ops', set([1, 3, 4])), ('due<7d', set([1, 4, 5]))]
+	assert plan.chosen == 1
+	explain = plan.explain(1)
+	assert explain[-1] == 'Plan: look up the 2 candidates of pri:H, filter with the query: 1 found'
+	assert '(chosen)' in explain[3]
+	assert 'no index' in query.Plan(query.parse('not tag:ops and due:none'), tasklist).explain(0)[2]
+
+	tasklist.modify_task(3, priority='L')
+	tasklist.delete_task(1)
+	assert found(tasklist, 'pri:H') == []
+	assert found(tasklist, 'pri:L') == [3, 5]
+	assert query.Plan(query.parse('not tag:ops'), tasklist).chosen is None
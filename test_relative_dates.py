@@ -0,0 +1,80 @@
+#------------------------------------------
+# Name:     test_relative_dates
+# Purpose:  Tests for working out the due statuses and relative dates of many tasks at once
+#
+# Author:   Robin Siebler
+# Created:  10/18/26
+#------------------------------------------
+__author__ = 'Robin Siebler'
+__date__ = '10/18/26'
+
+import calendar
+import random
+import time
+
+import arrow
+import pytest
+from dateutil import tz
+
+import relative_dates
+from relative_dates import DUE, NO_DUE_DATE, OVERDUE, UPCOMING
+
+NOW = 1792324800.25  # 10/18/26, with a fraction of a second like time.time()
+# the edges of arrow's buckets on both sides of now, and random dates from seconds to years away
+EDGES = [0, 9, 10, 44, 45, 89, 90, 2699, 2700, 5399, 5400, 79199, 79200, 129599, 129600, 2159999, 2160000, 3887999,
+         3888000, 29807999, 29808000, 47260799, 47260800, 10 ** 9]
+rand = random.Random(0)
+# the dates 12 hours either side of the start of each UTC month in the year around now, which are in another
+# month in most other time zones
+MONTH_EDGES = [calendar.timegm((2026 + (month - 1) // 12, (month - 1) % 12 + 1, 1, 0, 0, 0)) + hours * 3600
+               for month in range(0, 26) for hours in (-12, 12)]
+EPOCHS = ([None] + [int(NOW) + edge for edge in EDGES] + [int(NOW) - edge for edge in EDGES] + MONTH_EDGES +
+          [int(NOW + rand.uniform(-scale, scale)) for scale in (1e4, 1e6, 1e8) for _ in range(1000)])
+
+
+@pytest.fixture(params=['python', 'numpy'])
+def implementation(request, monkeypatch):
+	"""Run a test with the pure Python code, then with NumPy if it is installed."""
+
+	if request.param == 'numpy':
+		pytest.importorskip('numpy')
+		monkeypatch.setattr(relative_dates, 'NUMPY_MIN_ROWS', 0)
+	else:
+		monkeypatch.setattr(relative_dates, '_numpy', False)
+	return request.param
+
+
+@pytest.mark.parametrize('offset', [0, -8 * 3600, 5 * 3600 + 1800])
+def test_humanize_matches_arrow(implementation, offset):
+	"""Test that the relative dates are exactly the ones arrow's humanize() gives for dates given in a time zone,
+	whose calendar months are counted in that time zone."""
+
+	zone = tz.tzoffset(None, offset)
+	now = arrow.Arrow.utcfromtimestamp(NOW).to(zone)
+	expected = [None if epoch is None else arrow.Arrow.utcfromtimestamp(epoch).to(zone).humanize(now)
+	            for epoch in EPOCHS]
+	assert relative_dates.humanize(EPOCHS, NOW, [offset] * len(EPOCHS)) == expected
+
+
+@pytest.mark.parametrize('zone', ['America/Los_Angeles', 'Asia/Kolkata'])
+def test_humanize_in_local_time(implementation, zone, monkeypatch):
+	"""Test that without the time zones of the dates, their calendar months are counted in local time."""
+
+	monkeypatch.setenv('TZ', zone)
+	time.tzset()
+	try:
+		now = arrow.Arrow.fromtimestamp(NOW, tz.tzlocal())
+		expected = [None if epoch is None else arrow.Arrow.fromtimestamp(epoch, tz.tzlocal()).humanize(now)
+		            for epoch in EPOCHS]
+		assert relative_dates.humanize(EPOCHS, NOW) == expected
+	finally:
+		monkeypatch.undo()
+		time.tzset()
+
+
+def test_due_statuses(implementation):
+	"""Test that a due date is Upcoming until it is a day away, Due until it passes and then Overdue."""
+
+	day = relative_dates.DAY
+	epochs = [None, int(NOW) + day + 1, int(NOW) + day, int(NOW), int(NOW) - 1]
+	assert relative_dates.due_statuses(epochs, NOW) == [NO_DUE_DATE, UPCOMING, DUE, DUE, OVERDUE]
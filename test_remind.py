@@ -0,0 +1,89 @@
+#------------------------------------------
+# Name:     test_remind
+# Purpose:  Tests for tasks.py remind
+#
+# Author:   Robin Siebler
+# Created:  10/18/26
+#------------------------------------------
+__author__ = 'Robin Siebler'
+__date__ = '10/18/26'
+
+import sqlite3
+import threading
+import time
+
+import pytest
+
+import remind
+import storage
+from tasklist import Task
+
+
+def due_task(task_id, due, completed=False):
+	return Task.restore(id=task_id, task='Task {}'.format(task_id), completed=completed, due_date=due and 'due',
+	                    due_date_format='M/D/YY', due_epoch=due)
+
+
+def test_reminders():
+	"""Test that the heap gives the reminders in due date order and follows changes to the tasks."""
+
+	reminders = remind.Reminders([due_task(1, 300), due_task(2, 100), due_task(3, None), due_task(4, 200, True),
+	                              due_task(5, 50), due_task(6, 400)], now=60, ahead=10)
+	assert len(reminders) == 3 and reminders.next_time() == 90  # task 5 was due before now
+	reminders.update(2, due_task(2, 500), now=60)  # moved
+	reminders.update(6, None, now=60)  # deleted
+	reminders.update(7, due_task(7, 150), now=60)  # added
+	assert reminders.pop_due(200) == [7]
+	assert reminders.pop_due(1000) == [1, 2]
+	assert reminders.next_time() is None
+
+
+@pytest.mark.parametrize('name', ['tasks.tsk', 'tasks.db'])
+def test_remind(tmpdir, name):
+	"""Test that the reminders are given on time and that changes made while it runs are picked up."""
+
+	task_file = str(tmpdir.join(name))
+	start = int(time.time()) + 1
+	store = storage.open_store(task_file)
+	tasklist = store.load()
+	tasklist.insert_tasks([due_task(1, start + 1), due_task(2, start + 2), due_task(3, start + 2)])
+	store.commit(tasklist)
+
+	reminded = []
+	hook = lambda task: reminded.append((task.id, time.time() - task.due_epoch))
+	thread = threading.Thread(target=remind.remind, args=(task_file, hook),
+	                          kwargs=dict(poll_interval=0.1, until=start + 3.5))
+	thread.start()
+	time.sleep(0.5)
+	tasklist.modify_task(2, due_date=None)
+	tasklist.delete_task(3)
+	tasklist.insert_tasks([due_task(4, start + 3)])
+	store.commit(tasklist)
+	thread.join()
+
+	assert [task_id for task_id, late in reminded] == [1, 4]
+	assert all(0 <= late < 0.5 for task_id, late in reminded)
+
+
+@pytest.mark.parametrize('name', ['tasks.db', 'tasks.tcol'])
+def test_reload_closes_the_old_tasks(tmpdir, name):
+	"""Test that following a backend that has to be loaded again closes what the last load opened."""
+
+	task_file = str(tmpdir.join(name))
+	store = storage.open_store(task_file)
+	tasklist = store.load()
+	tasklist.insert_tasks([due_task(1, 100)])
+	store.commit(tasklist)
+
+	watcher = remind.Watcher(task_file)
+	if name.endswith('.db'):
+		use_old, closed = lambda db=watcher.store.db: db.execute('SELECT 1'), sqlite3.ProgrammingError
+	else:
+		use_old, closed = lambda mm=watcher.store.columns.mm: mm[0], ValueError
+	time.sleep(0.01)  # so the file's modification time changes
+	tasklist.insert_tasks([due_task(2, 200)])
+	store.commit(tasklist)
+	assert watcher.changes() is None
+	assert [task.id for task in watcher.tasklist] == [1, 2]
+	with pytest.raises(closed):
+		use_old()
@@ -0,0 +1,32 @@
+#------------------------------------------
+# Name:     test_renderer
+# Purpose:  Tests for the buffered table output
+#
+# Author:   Robin Siebler
+# Created:  10/18/26
+#------------------------------------------
+__author__ = 'Robin Siebler'
+__date__ = '10/18/26'
+
+import itertools
+
+import renderer
+
+
+def test_page():
+	"""Test that paging only pulls the rows it needs from the iterator."""
+
+	rows = itertools.count()
+	assert list(renderer.page(rows, 5, 3)) == [5, 6, 7]
+	assert next(rows) == 8
+	assert list(renderer.page(iter(range(4)), 2)) == [2, 3]
+	assert list(renderer.page(iter(range(4)), limit=2)) == [0, 1]
+
+
+def test_output_chunks(capsys):
+	"""Test that lines come out in chunks and are all written by the time the output is closed."""
+
+	with renderer.Output(chunk_size=2) as out:
+		out.write_lines(['a', 'b', 'c'])
+		assert capsys.readouterr()[0] == 'a\nb\n'
+	assert capsys.readouterr()[0] == 'c\n'
@@ -0,0 +1,32 @@
+#------------------------------------------
+# Name:     test_startup
+# Purpose:  Keep the CLI quick to start
+#
+# Author:   Robin Siebler
+# Created:  10/18/26
+#------------------------------------------
+__author__ = 'Robin Siebler'
+__date__ = '10/18/26'
+
+import os
+import subprocess
+import sys
+
+IMPORT_BUDGET = 0.25  # seconds for a cold "import tasks", several times what it takes on a slow machine
+
+MEASURE = '''
+import sys, time
+start = time.time()
+import tasks
+print time.time() - start
+print ' '.join(sorted(name for name in ('arrow', 'dateutil', 'pyparsing') if name in sys.modules))
+'''
+
+
+def test_import_is_cheap():
+	"""Test that importing the CLI leaves the heavy modules to the commands that need them."""
+
+	output = subprocess.check_output([sys.executable, '-c', MEASURE], cwd=os.path.dirname(os.path.abspath(__file__)))
+	seconds, heavy = (output.splitlines() + [''])[:2]
+	assert heavy == ''
+	assert float(seconds) < IMPORT_BUDGET
@@ -0,0 +1,298 @@
+#------------------------------------------
+# Name:     test_storage
+# Purpose:  Tests for the snapshot + journal task storage
+#
+# Author:   Robin Siebler
+# Created:  10/18/26
+#------------------------------------------
+__author__ = 'Robin Siebler'
+__date__ = '10/18/26'
+
+import multiprocessing
+import os
+
+import pytest
+
+import storage
+import util
+from tasklist import Task, TaskList, fuzzy_search
+
+
+def test_journal_replay(tmpdir):
+	"""Test that changes written to the journal are there on the next load."""
+
+	task_file = str(tmpdir.join('tasks.tsk'))
+	Task.last_id = 0
+	store = storage.JournalStore(task_file)
+	tasklist = store.load()
+	tasklist.add_task('Sleep', 'H')
+	tasklist.add_task('Eat')
+	tasklist.modify_task(tasklist.tasks[1].id, note='Pizza')
+	tasklist.delete_task(tasklist.tasks[0].id)
+	tasklist.renumber_tasks()
+	store.commit(tasklist)
+
+	tasklist = storage.JournalStore(task_file).load()
+	assert [(task.id, task.task, task.note) for task in tasklist.tasks] == [(1, 'Eat', 'Pizza')]
+
+
+def test_journal_keeps_tasks_as_added(tmpdir):
+	"""Test that an added task is journalled as it was when it was added, so renumbering it before the commit
+	doesn't give it its new id twice."""
+
+	task_file = str(tmpdir.join('tasks.tsk'))
+	Task.last_id = 0
+	store = storage.JournalStore(task_file)
+	tasklist = store.load()
+	for name in ['Sleep', 'Eat', 'Work']:
+		tasklist.add_task(name)
+	tasklist.delete_task(1)
+	tasklist.renumber_tasks()
+	store.commit(tasklist)
+
+	tasklist = storage.JournalStore(task_file).load()
+	assert [(task.id, task.task) for task in tasklist] == [(1, 'Eat'), (2, 'Work')]
+
+
+def test_read_only_commit_writes_nothing(tmpdir):
+	"""Test that saving without changes does not touch the disk."""
+
+	task_file = str(tmpdir.join('tasks.tsk'))
+	store = storage.JournalStore(task_file)
+	tasklist = store.load()
+	tasklist.add_task('Sleep')
+	store.commit(tasklist)
+	mtime = os.path.getmtime(store.journal_file)
+	size = os.path.getsize(store.journal_file)
+
+	store = storage.JournalStore(task_file)
+	tasklist = store.load()
+	tasklist.search('sleep')
+	store.commit(tasklist)
+	assert os.path.getmtime(store.journal_file) == mtime
+	assert os.path.getsize(store.journal_file) == size
+
+
+def test_compaction(tmpdir):
+	"""Test that a compacted journal ends up in the snapshot and that a stale journal is not replayed twice."""
+
+	task_file = str(tmpdir.join('tasks.tsk'))
+	store = storage.JournalStore(task_file, threshold=1 << 20)
+	tasklist = store.load()
+	tasklist.add_task('Sleep')
+	store.commit(tasklist)
+	with open(store.journal_file, 'rb') as fh:
+		journal = fh.read()
+
+	store.compact(wait=True)
+	assert not os.path.exists(store.journal_file)
+	assert not os.path.exists(store.rotated_file)
+
+	# simulate a crash between writing the snapshot and removing the old journal
+	with open(store.rotated_file, 'wb') as fh:
+		fh.write(journal)
+	tasklist = storage.JournalStore(task_file).load()
+	assert [task.task for task in tasklist.tasks] == ['Sleep']
+
+
+@pytest.mark.parametrize('name', ['tasks.tsk', 'tasks.db', 'tasks.tcol'])
+def test_deleted_ids_are_not_reused(tmpdir, name):
+	"""Test that every backend keeps the highest id it gave out, even after the task that had it is deleted."""
+
+	task_file = str(tmpdir.join(name))
+	Task.last_id = 0
+	store = storage.open_store(task_file)
+	tasklist = store.load()
+	for name in ['Sleep', 'Eat', 'Work']:
+		tasklist.add_task(name)
+	tasklist.delete_task(3)
+	tasklist.delete_task(1)
+	store.commit(tasklist)
+	if isinstance(store, storage.JournalStore):
+		store.compact(wait=True)
+
+	store = storage.open_store(task_file)
+	tasklist = store.load()
+	assert tasklist.last_id == 3
+	Task.last_id = tasklist.last_id
+	tasklist.add_task('Play')
+	store.commit(tasklist)
+	assert [(task.id, task.task) for task in storage.open_store(task_file).load()] == [(2, 'Eat'), (4, 'Play')]
+
+
+@pytest.mark.parametrize('name', ['tasks.tsk', 'tasks.db', 'tasks.tcol'])
+def test_due_between(tmpdir, name):
+	"""Test that every backend finds the tasks due in a range, soonest first, after changes and reloading."""
+
+	task_file = str(tmpdir.join(name))
+	Task.last_id = 0
+	store = storage.open_store(task_file)
+	tasklist = store.load()
+	for task_id, due in enumerate([300, None, 100, 200, 400], 1):
+		tasklist.insert_tasks([Task.restore(id=task_id, task='Task', due_date=due and 'due', due_date_format='M/D/YY',
+		                                    due_epoch=due)])
+	store.commit(tasklist)
+
+	tasklist = storage.open_store(task_file).load()
+	assert [task.id for task in tasklist.due_between(100, 400)] == [3, 4, 1]
+	tasklist.delete_task(4)
+	tasklist.modify_task(5, due_date=None)
+	tasklist.modify_task(2, due_date='1/2/70 12:00 AM +0000', due_date_format='M/D/YY h:mm A Z')
+	assert [task.id for task in tasklist.due_between()] == [3, 1, 2]
+	assert [task.id for task in tasklist.due_between(high=24 * 60 * 60)] == [3, 1]
+
+
+@pytest.mark.parametrize('name', ['tasks.tsk', 'tasks.db', 'tasks.tcol'])
+def test_fuzzy_search(tmpdir, name):
+	"""Test that every backend ranks the tasks most like a misspelled search string first."""
+
+	task_file = str(tmpdir.join(name))
+	store = storage.open_store(task_file)
+	tasklist = store.load()
+	tasklist.insert_tasks([Task.restore(id=1, task='Buy milk', note='the server room fridge'),
+	                       Task.restore(id=2, task='Restart the server'), Task.restore(id=3, task='Call Bob')])
+	store.commit(tasklist)
+
+	tasklist = storage.open_store(task_file).load()
+	assert [task.id for score, task in fuzzy_search(tasklist, 'servr')] == [2, 1]
+	assert [task.id for score, task in fuzzy_search(tasklist, 'servr', top=1)] == [2]
+
+
+def test_legacy_task_file(tmpdir):
+	"""Test that a task file holding a bare list of tasks still loads."""
+
+	task_file = str(tmpdir.join('tasks.tsk'))
+	Task.last_id = 0
+	util.save([Task('Sleep', 'L', None, None, None)], task_file, 0)
+
+	tasklist = storage.JournalStore(task_file).load()
+	assert isinstance(tasklist, TaskList)
+	assert [task.task for task in tasklist.tasks] == ['Sleep']
+
+
+def test_old_snapshot_is_upgraded_once(tmpdir, monkeypatch):
+	"""Test that a snapshot written before an index existed is rewritten the first time it is loaded, even by a
+	command that changes nothing, so the index isn't rebuilt on every load."""
+
+	task_file = str(tmpdir.join('tasks.tsk'))
+	Task.last_id = 0
+	tasklist = TaskList([Task('Sleep', 'L', None, None, None)])
+	del tasklist.__dict__[TaskList.INDEXES[-1]]
+	util.save({'version': TaskList.SNAPSHOT_VERSION - 1, 'seq': 0, 'tasklist': tasklist}, task_file)
+
+	rebuilds = []
+	build_indexes = TaskList._build_indexes
+	monkeypatch.setattr(TaskList, '_build_indexes', lambda self: rebuilds.append(1) or build_indexes(self))
+	for _ in range(3):
+		store = storage.JournalStore(task_file)
+		tasklist = store.load()
+		store.commit(tasklist)
+		assert [task.task for task in tasklist] == ['Sleep']
+	assert len(rebuilds) == 1
+	assert util.load(task_file)['version'] == TaskList.SNAPSHOT_VERSION
+
+
+def test_sqlite_migration(tmpdir):
+	"""Test that the SQLite backend picks up the pickled tasks and keeps the priority view order."""
+
+	task_file = str(tmpdir.join('tasks.tsk'))
+	Task.last_id = 0
+	store = storage.JournalStore(task_file)
+	tasklist = store.load()
+	tasklist.add_task('Sleep', 'L', ['5/23/2015 11:59 PM -0800', 'M/DD/YYYY h:mm A Z'])
+	tasklist.add_task('Eat', 'H', tags='food')
+	tasklist.add_task('Work', 'L', ['5/22/2015 11:59 PM -0800', 'M/DD/YYYY h:mm A Z'], tags='food, job')
+	store.commit(tasklist)
+
+	store = storage.open_store(str(tmpdir.join('tasks.db')))
+	sqlite_tasklist = store.load()
+	assert len(sqlite_tasklist) == 3
+	assert [task.task for task in sqlite_tasklist.by_priority()] == [task.task for task in tasklist.by_priority()]
+	assert [task.task for task in sqlite_tasklist.find_by_tags('food job')] == ['Work']
+
+	sqlite_tasklist.delete_task(1)
+	sqlite_tasklist.renumber_tasks()
+	store.commit(sqlite_tasklist)
+	sqlite_tasklist = storage.open_store(store.db_file).load()
+	assert [(task.id, task.task) for task in sqlite_tasklist] == [(1, 'Eat'), (2, 'Work')]
+	assert [task.id for task in sqlite_tasklist.find_by_tags('food', match_all=False)] == [1, 2]
+
+
+# [Task(...)] pickled while Task was an old-style class with an instance dict
+OLD_STYLE_TASKS = ('\x80\x02]q\x01(ctasklist\nTask\nq\x02oq\x03}q\x04(U\x08due_dateq\x05U\x185/23/2015 11:59 PM -0800q\x06'
+                   'U\x04taskq\x07U\x05Sleepq\x08U\x04tagsq\tc__builtin__\nset\nq\n]q\x0bU\x04homeq\x0ca\x85Rq\rU\t'
+                   'completedq\x0e\x89U\rcreation_dateq\x0fU\x1c05/20/2015 9:00:00 AM -07:00q\x10U\x04noteq\x11NU\x0f'
+                   'due_date_formatq\x12U\x12M/DD/YYYY h:mm A Zq\x13U\x02idq\x14K\x01U\x08priorityq\x15U\x01Huba.')
+
+
+def test_old_style_tasks(tmpdir):
+	"""Test that tasks pickled before Task had slots load with the same fields."""
+
+	task_file = tmpdir.join('tasks.tsk')
+	task_file.write(OLD_STYLE_TASKS, 'wb')
+
+	task = storage.JournalStore(str(task_file)).load().find_task(1)
+	assert (task.task, task.priority, task.priority_code, task.tags) == ('Sleep', 'H', 0, set(['home']))
+	assert (task.due_date, task.due_date_format, task.due_epoch) == \
+	       ('5/23/2015 11:59 PM -0800', 'M/DD/YYYY h:mm A Z', 1432454340)
+	assert (task.creation_date, task.created_epoch) == ('05/20/2015 9:00:00 AM -07:00', 1432137600)
+
+
+def test_concurrent_changes_are_merged(tmpdir):
+	"""Test that a commit made after another process saved keeps both sets of changes, even when the other
+	process renumbered the tasks."""
+
+	task_file = str(tmpdir.join('tasks.tsk'))
+	Task.last_id = 0
+	store = storage.JournalStore(task_file)
+	tasklist = store.load()
+	for name in ['Sleep', 'Eat', 'Work']:
+		tasklist.add_task(name)
+	store.commit(tasklist)
+
+	first, second = storage.JournalStore(task_file), storage.JournalStore(task_file)
+	first_tasks, second_tasks = first.load(), second.load()
+	first_tasks.delete_task(1)
+	first_tasks.renumber_tasks()
+	first_tasks.add_task('Play')
+	first.commit(first_tasks)
+
+	second_tasks.modify_task(3, priority='H')
+	second_tasks.delete_task(2)
+	second_tasks.renumber_tasks()
+	second_tasks.add_task('Read')
+	second.commit(second_tasks)
+
+	expected = [(1, 'Work', 'H'), (2, 'Play', None), (3, 'Read', None)]
+	assert [(task.id, task.task, task.priority) for task in second_tasks] == expected
+	assert [(task.id, task.task, task.priority) for task in storage.JournalStore(task_file).load()] == expected
+
+
+def add_tasks(task_file, writer, count):
+	"""Add tasks the way tasks.py does: load, add one task and commit, count times."""
+
+	store = storage.JournalStore(task_file, threshold=2048)
+	for number in range(count):
+		tasklist = store.load()
+		Task.last_id = tasklist.last_id
+		tasklist.add_task('Writer {} task {}'.format(writer, number))
+		store.commit(tasklist)
+	store.compact(wait=True)
+
+
+def test_parallel_writers(tmpdir):
+	"""Test that no task is lost when several processes add tasks to the same file at once."""
+
+	task_file = str(tmpdir.join('tasks.tsk'))
+	writers = [multiprocessing.Process(target=add_tasks, args=(task_file, writer, 20)) for writer in range(4)]
+	for writer in writers:
+		writer.start()
+	for writer in writers:
+		writer.join()
+	assert [writer.exitcode for writer in writers] == [0] * 4
+
+	tasklist = storage.JournalStore(task_file).load()
+	assert sorted(task.task for task in tasklist) == \
+	       sorted('Writer {} task {}'.format(writer, number) for writer in range(4) for number in range(20))
+	assert [task.id for task in tasklist] == range(1, 81)
+	assert not tmpdir.listdir(lambda path: path.ext == '.tmp')
@@ -0,0 +1,64 @@
+#------------------------------------------
+# Name:     test_task_lists
+# Purpose:  Tests for the named task lists and the views across them
+#
+# Author:   Robin Siebler
+# Created:  10/18/26
+#------------------------------------------
+__author__ = 'Robin Siebler'
+__date__ = '10/18/26'
+
+import os
+import subprocess
+import sys
+
+import storage
+import task_lists
+from tasklist import Task
+
+TASKS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tasks.py')
+
+
+def make_list(task_file, tasks):
+	store = storage.open_store(task_file)
+	tasklist = store.load()
+	tasklist.insert_tasks(Task.restore(id=task_id, task=name, priority=priority)
+	                      for task_id, (name, priority) in enumerate(tasks, 1))
+	store.commit(tasklist)
+
+
+def test_merged_lists(tmpdir):
+	"""Test that the lists are found and that their tasks are merged in the order of each view."""
+
+	task_file = str(tmpdir.join('tasks.tsk'))
+	make_list(task_file, [('Buy milk', None), ('Fix the sink', 'M')])
+	make_list(task_lists.list_file(task_file, 'ops'), [('Fix server', 'H'), ('Page oncall', 'L'), ('Patch', 'M')])
+	make_list(task_lists.list_file(task_file, 'docs'), [('Release notes', 'H')])
+	tmpdir.join('tasks-notes.txt').write('not a list')
+
+	assert task_lists.list_file(task_file, 'ops') == str(tmpdir.join('tasks-ops.tsk'))
+	names = task_lists.list_names(task_file)
+	assert names == ['default', 'docs', 'ops']
+
+	shown = lambda tasks: [task.task for task in tasks]
+	assert shown(task_lists.MergedLists(task_file, names, 'show')) == [
+		'default: Buy milk', 'docs: Release notes', 'ops: Fix server', 'default: Fix the sink', 'ops: Page oncall',
+		'ops: Patch']
+	merged = task_lists.MergedLists(task_file, names, 'priority', 4)
+	assert len(merged) == 2 + 1 + 3
+	assert shown(merged.by_priority(4)) == ['docs: Release notes', 'ops: Fix server', 'default: Fix the sink',
+	                                        'ops: Patch']
+	assert shown(task_lists.MergedLists(task_file, ['default', 'ops'], 'search', ('fix', False))) == [
+		'ops: Fix server', 'default: Fix the sink']
+
+
+def test_one_list_never_reads_the_others(tmpdir):
+	"""Test that a command given a list works even when the other lists can't be read."""
+
+	env = dict(os.environ, HOME=str(tmpdir), TASKS_BACKEND='pickle')
+	env.pop('TASKS_TRACE', None)
+	tmpdir.join('tasks.tsk').write('garbage')
+	output = subprocess.check_output([sys.executable, TASKS, 'Fix server', '--list', 'ops'], env=env)
+	output += subprocess.check_output([sys.executable, TASKS, 'show', '--list=ops'], env=env)
+	assert 'Created task 1' in output and 'Fix server' in output
+	assert tmpdir.join('tasks.tsk').read() == 'garbage'
@@ -0,0 +1,173 @@
+#------------------------------------------
+# Name:     test_tasklist
+# Purpose:  Tests for the TaskList indexes
+#
+# Author:   Robin Siebler
+# Created:  10/18/26
+#------------------------------------------
+__author__ = 'Robin Siebler'
+__date__ = '10/18/26'
+
+import pickle
+
+import arrow
+from dateutil import tz
+
+from tasklist import CREATION_DATE_FORMAT, Task, TaskList, format_date
+
+
+def make_tasklist(*names):
+	Task.last_id = 0
+	tasklist = TaskList()
+	for name in names:
+		tasklist.add_task(name)
+	return tasklist
+
+
+def test_find_task_index():
+	"""Test that find_task takes int and str ids and follows deletes, renumbering and pickling."""
+
+	tasklist = make_tasklist('Sleep', 'Eat', 'Work')
+	assert tasklist.find_task(2).task == 'Eat'
+	assert tasklist.find_task('2').task == 'Eat'
+	assert tasklist.find_task('two') is None
+
+	tasklist.delete_task('1')
+	assert tasklist.find_task(1) is None
+	tasklist.renumber_tasks()
+	assert tasklist.find_task(1).task == 'Eat'
+	assert tasklist.find_task(3) is None
+
+	tasklist = pickle.loads(pickle.dumps(tasklist, 2))
+	assert tasklist.find_task('2').task == 'Work'
+
+
+def test_deletes_leave_the_other_ids_alone():
+	"""Test that deleted tasks keep their place until there are enough of them to sweep out."""
+
+	tasklist = make_tasklist(*['Task {}'.format(number) for number in range(1, 201)])
+	for task_id in range(1, 201, 2):
+		tasklist.delete_task(task_id)
+	assert len(tasklist) == 100 and len(tasklist.tasks) == 200
+	assert [task.id for task in tasklist.page(10, 3)] == [22, 24, 26]
+	assert tasklist.find_task(200).task == 'Task 200' and tasklist.find_task(199) is None
+	assert [task.id for task in tasklist.search('task 19')] == [190, 192, 194, 196, 198]
+
+	tasklist.delete_task(2)
+	assert len(tasklist.tasks) == 99  # more deleted tasks than tasks: swept out
+	assert tasklist.find_task(200).task == 'Task 200'
+	tasklist.delete_task(4)
+	tasklist = pickle.loads(pickle.dumps(tasklist, 2))
+	assert len(tasklist.tasks) == 98 and tasklist.last_id == 200
+	assert [task.id for task in tasklist.by_priority(2)] == [6, 8]
+
+
+def test_search_matches_task_match():
+	"""Test that searching through the token index finds exactly what Task.match finds."""
+
+	tasklist = make_tasklist('Fix the build', 'Call Bob re: build-server', 'Buy milk', 'Rebuild cache')
+	tasklist.modify_task(3, note='2% milk, not skim')
+	tasklist.modify_task(4, tags='ops, dev-ops')
+	tasklist.delete_task(1)
+	tasklist.renumber_tasks()
+
+	for search_string in ['build', 'uil', 'bob re', ' re: b', 'build-', 'd-s', '2% milk', '% m', 'ops, dev',
+	                      'dev-ops', '-', ' ', '', 'nothing', 'build cache', 'BUILD']:
+		expected = [task.id for task in tasklist.tasks if task.match(search_string)]
+		assert [task.id for task in tasklist.search(search_string)] == expected, search_string
+
+
+def test_find_by_tags():
+	"""Test that tags are whole words and that --all/--any intersect/union them."""
+
+	tasklist = make_tasklist('Deploy', 'Fix CI', 'Write docs')
+	tasklist.modify_task(1, tags='ops, DevOps')
+	tasklist.modify_task(2, tags='dev ops')
+	tasklist.modify_task(3, tags='dev')
+	assert tasklist.find_task(1).tags == set(['ops', 'devops'])
+
+	assert [task.id for task in tasklist.find_by_tags('dev')] == [2, 3]
+	assert [task.id for task in tasklist.find_by_tags('dev ops')] == [2]
+	assert [task.id for task in tasklist.find_by_tags('devops, dev', match_all=False)] == [1, 2, 3]
+	assert tasklist.find_by_tags('dev nothing') == []
+
+	tasklist.delete_task(2)
+	tasklist.renumber_tasks()
+	assert [task.id for task in tasklist.find_by_tags('dev')] == [2]
+
+
+def test_fuzzy_search():
+	"""Test that misspelled words are found, that a match in the description ranks above one in the tags or a
+	note, and that the index follows the changes to the tasks."""
+
+	tasklist = make_tasklist('Buy milk', 'Restart the server', 'Write report', 'Call Bob', 'Cook dinner')
+	tasklist.modify_task(1, note='ask the server room about the fridge')
+	tasklist.modify_task(3, tags='servers')
+	ranked = lambda search_string, top=None: [task.id for score, task in tasklist.fuzzy_search(search_string, top)]
+
+	assert ranked('servr') == [2, 3, 1]
+	assert ranked('servr', top=2) == [2, 3]
+	assert ranked('restart servr') == [2, 3, 1]
+	assert ranked('Bob report')[:2] == [3, 4]
+	assert ranked('xyzzy') == []
+
+	tasklist.delete_task(2)
+	tasklist.modify_task(5, task='Serve dinner')
+	tasklist.renumber_tasks()
+	assert ranked('servr') == [4, 2, 1]
+	assert ranked('restart') == []
+	tasklist = pickle.loads(pickle.dumps(tasklist, 2))
+	assert ranked('dinnr') == [4]
+
+
+def test_legacy_tags():
+	"""Test that a task saved with its tags as a string gets a set of tags when it is loaded."""
+
+	task = Task.restore(id=1, task='Sleep', tags='Home, bed', note=None)
+	assert task.tags == set(['home', 'bed'])
+	assert task.match('bed home')
+
+
+def test_timestamps():
+	"""Test that due/creation timestamps are set on new tasks, follow due date changes and appear on old ones."""
+
+	tasklist = make_tasklist()
+	tasklist.add_task('Sleep', due_date=['5/23/2015 11:59 PM -0800', 'M/DD/YYYY h:mm A Z'])
+	task = tasklist.find_task(1)
+	assert task.due_epoch == 1432454340
+	assert task.created_epoch is not None
+
+	tasklist.modify_task(1, due_date='5/24/2015 11:59 PM -0800')
+	assert task.due_epoch == 1432454340 + 24 * 60 * 60
+
+	task = Task.restore(id=2, task='Eat', tags=set(), note=None, due_date='5/23/2015 11:59 PM -0800',
+	                    due_date_format='M/DD/YYYY h:mm A Z', creation_date='05/20/2015 9:00:00 AM -07:00')
+	assert task.due_epoch == 1432454340
+	assert task.created_epoch == 1432137600
+
+
+def test_by_priority_top():
+	"""Test the priority order and that --top returns the start of it."""
+
+	tasklist = make_tasklist()
+	tasklist.add_task('Later', 'H', ['1/5/2027 11:59 PM -0800', 'M/D/YYYY h:mm A Z'])
+	tasklist.add_task('Sooner', 'H', ['12/5/2026 11:59 PM -0800', 'M/D/YYYY h:mm A Z'])
+	tasklist.add_task('Whenever', 'H')
+	tasklist.add_task('Low', 'L', ['1/1/2020 11:59 PM -0800', 'M/D/YYYY h:mm A Z'])
+	tasklist.add_task('Done', 'H')
+	tasklist.add_task('None')
+	tasklist.modify_task(5, completed=True)
+
+	order = [task.task for task in tasklist.by_priority()]
+	assert order == ['Sooner', 'Later', 'Whenever', 'Low', 'None', 'Done']
+	assert [task.task for task in tasklist.by_priority(top=3)] == order[:3]
+
+
+def test_format_date_matches_arrow():
+	"""Test that dates kept as timestamps come back exactly as arrow formatted them."""
+
+	for epoch in [0, 1432454340, 1432137600, 1798790399, 1767225600 + 12 * 60 * 60]:
+		for offset in [-8 * 60 * 60, -7 * 60 * 60, 0, 5 * 60 * 60 + 30 * 60]:
+			date = arrow.Arrow.fromtimestamp(epoch, tz.tzoffset(None, offset))
+			for date_format in [CREATION_DATE_FORMAT, 'M/D/YY h:mm A Z', 'MM-DD-YYYY h:mm A Z', 'M.DD.YYYY h:mm A Z']:
+				assert format_date(epoch, (date_format, offset)) == date.format(date_format)
@@ -0,0 +1,69 @@
+#------------------------------------------
+# Name:     test_transfer
+# Purpose:  Tests for exporting and importing tasks
+#
+# Author:   Robin Siebler
+# Created:  10/18/26
+#------------------------------------------
+__author__ = 'Robin Siebler'
+__date__ = '10/18/26'
+
+import StringIO
+
+import pytest
+
+import transfer
+from tasklist import Task, TaskList
+
+
+def make_tasklist():
+	Task.last_id = 0
+	tasklist = TaskList()
+	tasklist.add_task('Sleep', 'L', ['5/23/2015 11:59 PM -0800', 'M/DD/YYYY h:mm A Z'], tags='home, bed')
+	tasklist.add_task('Eat', None, note='Pizza, with "extra" cheese')
+	tasklist.modify_task(2, completed=True)
+	return tasklist
+
+
+@pytest.mark.parametrize('fmt', transfer.FORMATS)
+def test_round_trip(fmt):
+	"""Test that exported tasks come back the same when they are imported, in chunks."""
+
+	tasklist = make_tasklist()
+	out = StringIO.StringIO()
+	assert transfer.write(transfer.export_records(tasklist), out, fmt) == 2
+
+	imported = TaskList()
+	commits = []
+	records = transfer.read(StringIO.StringIO(out.getvalue()), fmt)
+	assert transfer.import_tasks(imported, lambda: commits.append(imported.pop_changes()), records,
+	                             chunk_size=1) == (2, 0)
+	assert [len(changes) for changes in commits] == [1, 1]
+	fields = lambda task: (task.task, task.priority, task.due_date, task.due_epoch, task.tags, task.note, task.completed,
+	                       task.creation_date)
+	assert [fields(task) for task in imported] == [fields(task) for task in tasklist]
+	assert [task.id for task in imported] == [3, 4]
+
+
+def test_import_checks_dates():
+	"""Test that hand written due dates are checked like -d and --time, and that bad lines are skipped."""
+
+	Task.last_id = 0
+	lines = ['{"task": "Sleep", "due_date": "5/23/2015", "time": "9:30 PM"}',
+	         '{"task": "Eat", "due_date": "13/23/2015"}',
+	         '{"task": "Work", "due_date": "5/23/2015", "time": "25:00"}',
+	         '{"note": "no task"}']
+	tasklist = TaskList()
+	assert transfer.import_tasks(tasklist, lambda: None, transfer.read(lines, 'jsonl')) == (1, 3)
+	assert tasklist.find_task(1).due_date == '5/23/2015 9:30 PM -0800'
+
+
+def test_import_rejects_nul():
+	"""Test that a line with a NUL character in it, which would break a column file, is skipped."""
+
+	Task.last_id = 0
+	lines = ['{"task": "Sleep\\u0000ing"}', '{"task": "Eat", "note": "a\\u0000b"}',
+	         '{"task": "Eat", "tags": ["a\\u0000"]}', '{"task": "Work"}']
+	tasklist = TaskList()
+	assert transfer.import_tasks(tasklist, lambda: None, transfer.read(lines, 'jsonl')) == (1, 3)
+	assert [task.task for task in tasklist] == ['Work']
@@ -0,0 +1,208 @@
+# ------------------------------------------
+# Name:     transfer
+# Purpose:  Export the tasks to, and import tasks from, JSON lines and CSV files.
+#
+# Author:   Robin Siebler
+# Created:  10/18/26
+# ------------------------------------------
+__author__ = 'Robin Siebler'
+__date__ = '10/18/26'
+
+import csv
+import itertools
+import json
+
+from tasklist import (CREATION_DATE_FORMAT, DATE_PATTERN, PRIORITY_RANK, TIME_PATTERN, Task, format_tags,
+                      parse_due_date, parse_tags, timestamp)
+
+FORMATS = ('jsonl', 'csv')
+FIELDS = ('id', 'task', 'priority', 'due_date', 'due_date_format', 'tags', 'note', 'completed', 'creation_date')
+CHUNK_SIZE = 10000  # imported tasks added (and saved) at a time
+
+
+def file_format(file_name, fmt=None):
+	"""Return the format of a file: the one asked for, otherwise the one its extension names, otherwise jsonl."""
+
+	if fmt:
+		return fmt
+	if file_name.lower().endswith('.csv'):
+		return 'csv'
+	return 'jsonl'
+
+
+def export_records(tasks):
+	"""Yield a dict of the exported fields for each task."""
+
+	for task in tasks:
+		record = dict((name, getattr(task, name, None)) for name in FIELDS)
+		record['tags'] = sorted(task.tags)
+		yield record
+
+
+def write(records, out, fmt):
+	"""Write records to a file as they come.
+
+	:param records: an iterable of dicts with the keys in FIELDS
+	:param out:     the file to write to
+	:param fmt:     jsonl or csv
+	:return: the number of records written
+	"""
+
+	count = 0
+	if fmt == 'csv':
+		writer = csv.DictWriter(out, FIELDS)
+		writer.writeheader()
+		for record in records:
+			record['tags'] = format_tags(record['tags'])
+			writer.writerow(record)
+			count += 1
+	else:
+		for record in records:
+			out.write(json.dumps(record, sort_keys=True) + '\n')
+			count += 1
+	return count
+
+
+def read(lines, fmt):
+	"""Yield the line number and a dict for each record in a file. Blank lines are skipped.
+
+	:param lines: an iterable of the lines of the file
+	:param fmt:   jsonl or csv
+	"""
+
+	if fmt == 'csv':
+		reader = csv.DictReader(lines)
+		for record in reader:
+			yield reader.line_num, record
+	else:
+		for line_number, line in enumerate(lines, 1):
+			if line.strip():
+				try:
+					yield line_number, json.loads(line)
+				except ValueError:
+					yield line_number, None
+
+
+def _text(value):
+	"""Turn a field read from a file into the str the tasks keep, or None if it is empty.
+
+	:raise ValueError: if it contains a NUL character, which a column file uses to end each field
+	"""
+
+	if value is None or value == '':
+		return None
+	if isinstance(value, unicode):
+		value = value.encode('utf-8')
+	value = str(value)
+	if '\0' in value:
+		raise ValueError('a field contains a NUL character')
+	return value
+
+
+def make_task(record, created, dates=None):
+	"""Turn an imported record into a Task with the next free id.
+
+	:param record:  a dict with the keys in FIELDS (only task is required) and an optional time for the due date
+	:param created: the creation date and timestamp for a record without a creation date
+	:param dates:   a dict to keep the due dates already parsed in, for the records that share them
+	:return: a Task object
+	:raise ValueError: if the record is not a valid task
+	"""
+
+	if not isinstance(record, dict):
+		raise ValueError('not a JSON object')
+	fields = {'task': _text(record.get('task'))}
+	if not fields['task']:
+		raise ValueError('the task is missing')
+
+	fields['priority'] = _text(record.get('priority'))
+	if fields['priority']:
+		fields['priority'] = fields['priority'].upper()
+		if fields['priority'] not in PRIORITY_RANK:
+			raise ValueError('the priority is not valid')
+
+	due = _text(record.get('due_date')), _text(record.get('due_date_format')), _text(record.get('time'))
+	fields['due_date'] = fields['due_epoch'] = None
+	if due[0]:
+		if dates is None:
+			dates = {}
+		if due not in dates:
+			dates[due] = _due_date(*due)
+		fields['due_date'], fields['due_date_format'], fields['due_epoch'] = dates[due]
+
+	tags = record.get('tags') or ''
+	if isinstance(tags, list):
+		tags = ' '.join(_text(tag) for tag in tags)
+	fields['tags'] = parse_tags(_text(tags))
+	fields['note'] = _text(record.get('note'))
+
+	completed = record.get('completed')
+	if isinstance(completed, basestring):
+		completed = completed.strip().lower() in ('1', 'true', 'yes', 'x')
+	fields['completed'] = bool(completed)
+
+	fields['creation_date'] = _text(record.get('creation_date'))
+	if fields['creation_date']:
+		fields['created_epoch'] = _timestamp(fields['creation_date'], CREATION_DATE_FORMAT, 'creation date')
+	else:
+		fields['creation_date'], fields['created_epoch'] = created
+
+	Task.last_id += 1
+	fields['id'] = Task.last_id
+	return Task.restore(**fields)
+
+
+def _due_date(due_date, due_date_format, due_time):
+	"""Return the due date, its format and its timestamp."""
+
+	if due_date_format:
+		# exported by tasks.py, stored as is
+		return due_date, due_date_format, _timestamp(due_date, due_date_format, 'due date')
+
+	# written by hand, checked like tasks.py -d and --time
+	if not DATE_PATTERN.match(due_date):
+		raise ValueError(due_date + ' is not a valid date')
+	if due_time and not TIME_PATTERN.match(due_time):
+		raise ValueError(due_time + ' is not a valid time')
+	date, due_date_format = parse_due_date(due_date, due_time)
+	return date.format(due_date_format), due_date_format, date.timestamp
+
+
+def _timestamp(date, date_format, name):
+	try:
+		return timestamp(date, date_format)
+	except Exception:  # arrow raises its own parser errors
+		raise ValueError('the ' + name + ' does not match ' + date_format)
+
+
+def import_tasks(tasklist, commit, records, chunk_size=CHUNK_SIZE):
+	"""Add the tasks from a stream of records, saving them a chunk at a time so memory use stays bounded.
+
+	:param tasklist:   the TaskList (or SQLiteTaskList) to add the tasks to
+	:param commit:     a function that saves the tasks added so far
+	:param records:    an iterable of (line number, record) tuples, as returned by read()
+	:param chunk_size: the number of tasks to add and save at a time
+	:return: the number of tasks imported and the number of records skipped
+	"""
+
+	import arrow
+	now = arrow.now()
+	created = now.format(CREATION_DATE_FORMAT), now.timestamp  # for the tasks that don't say when they were made
+
+	imported = skipped = 0
+	records = iter(records)
+	while True:
+		chunk = list(itertools.islice(records, chunk_size))
+		if not chunk:
+			return imported, skipped
+		tasks = []
+		dates = {}  # only kept for a chunk, so a file full of different dates doesn't fill up memory
+		for line_number, record in chunk:
+			try:
+				tasks.append(make_task(record, created, dates))
+			except ValueError as e:
+				print('Skipped line {}: {}'.format(line_number, e))
+				skipped += 1
+		tasklist.insert_tasks(tasks)
+		commit()
+		imported += len(tasks)
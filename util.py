@@ -8,20 +8,40 @@
 __author__ = 'Robin Siebler'
 __date__ = '7/17/13'
 
-import os, pickle
+import os
 
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
 
-def load(pickle_file):
+
+def unpickler(fh, find_global=None):
+    """Return an Unpickler for a file.
+
+    :param fh: the file to read
+    :param find_global: a function(module, name) that returns the class (or function) a pickle refers to
+    """
+
+    unpickler = pickle.Unpickler(fh)
+    if find_global and pickle.__name__ == 'cPickle':
+        unpickler.find_global = find_global
+    elif find_global:
+        unpickler.find_class = find_global
+    return unpickler
+
+def load(pickle_file, find_global=None):
     """Loads a file that has been pickled and reads its contents.
 
     :param pickle_file: the file that has been pickled
+    :param find_global: a function(module, name) that returns the class (or function) a pickle refers to
     :return: The object in the file, or None if an error occurs
     """
 
     if os.path.exists(pickle_file):
         try:
             with open(pickle_file, 'rb') as fh:
-                obj = pickle.load(fh)
+                obj = unpickler(fh, find_global).load()
                 return obj
         except IOError as e:
             print(str(e))
@@ -32,16 +52,17 @@ def load(pickle_file):
     else:
         print('The file {} does not exist!'.format(pickle_file))
 
-def save(obj, pickle_file):
+def save(obj, pickle_file, protocol=pickle.HIGHEST_PROTOCOL):
     """Save an object into a pickle file.
 
     :param obj: The object to pickle
     :param pickle_file: The name of the file to create.
+    :param protocol: The pickle protocol to use.
     """
 
     try:
         with open(pickle_file, 'wb') as fh:
-            pickle.dump(obj, fh)
+            pickle.dump(obj, fh, protocol)
     except IOError as e:
         print(str(e))
     except pickle.PickleError as e: